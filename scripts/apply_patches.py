@@ -0,0 +1,61 @@
+import sys
+import re
+import json
+import argparse
+
+from lib.patch import PatchError, PatchSet
+
+# Applies a declarative patch file to the source tree in one all-or-nothing pass
+# (see lib/patch.py). A patch file is a JSON list of rules:
+#
+#   [
+#     {"file": "src/pages/Index.tsx", "replace": "mb-6 animate-in", "with": "mb-2 -mt-10 animate-in"},
+#     {"file": "src/pages/TradeCityPage.tsx", "regex": "<Link\\s+to=\"/contact\"", "with": "<a href=\"#services\"",
+#      "flags": "s", "expect": 1},
+#     {"file": "src/components/Footer.tsx", "replace": "Revolut", "with": "Stripe", "optional": true}
+#   ]
+#
+# Every rule must match (exactly `expect` times if given) or nothing is written.
+#
+# Usage:
+#   python scripts/apply_patches.py patches.json --dry-run --diff
+#   python scripts/apply_patches.py patches.json
+
+FLAGS = {"i": re.I, "m": re.M, "s": re.S, "x": re.X}
+
+
+def load_patch_file(path, patches):
+    with open(path, "r", encoding="utf-8") as f:
+        rules = json.load(f)
+    for i, rule in enumerate(rules):
+        kwargs = {"expect": rule.get("expect"), "optional": rule.get("optional", False), "name": rule.get("name")}
+        if "replace" in rule:
+            patches.replace(rule["file"], rule["replace"], rule["with"], **kwargs)
+        elif "regex" in rule:
+            flags = sum(FLAGS[ch] for ch in rule.get("flags", ""))
+            patches.sub(rule["file"], rule["regex"], rule["with"], flags=flags, **kwargs)
+        else:
+            raise ValueError(f"rule {i} in {path} has neither 'replace' nor 'regex'")
+    return patches
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Apply JSON patch rules to the source tree atomically")
+    parser.add_argument("patch_files", nargs="+", help="JSON rule files, applied together")
+    parser.add_argument("--dry-run", action="store_true", help="Report hit counts without writing")
+    parser.add_argument("--diff", action="store_true", help="Print a unified diff of the changes")
+    args = parser.parse_args(argv)
+
+    patches = PatchSet()
+    try:
+        for path in args.patch_files:
+            load_patch_file(path, patches)
+        patches.apply(dry_run=args.dry_run, show_diff=args.diff)
+    except (OSError, ValueError, KeyError, PatchError) as e:
+        print(f"Error: {e}")
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
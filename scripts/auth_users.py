@@ -0,0 +1,214 @@
+import csv
+import sys
+import json
+import time
+import argparse
+import datetime
+from concurrent.futures import ThreadPoolExecutor
+
+from lib import PROFILES, ROOT, SupabaseClient, SupabaseError
+
+# Keeps a local mirror of a project's auth users and reports new signups.
+#
+# GoTrue's /auth/v1/admin/users returns one page at a time, newest signup first.
+#   - First run (or --full): read page 1 for X-Total-Count, then fetch the remaining
+#     pages concurrently.
+#   - Later runs: walk pages from the newest until one reaches users created before
+#     the stored cursor (the newest created_at already mirrored); usually one request.
+#
+# The mirror (id, email, phone, created_at, last_sign_in_at, confirmed, provider) is
+# kept in .cache/auth_users.json per project URL. Incremental runs only add users;
+# --full also refreshes sign-in times and drops deleted users.
+#
+# Usage:
+#   python scripts/auth_users.py --profile prod                  new signups since last run
+#   python scripts/auth_users.py --profile prod --since 24       everyone who signed up in 24h
+#   python scripts/auth_users.py --profile prod --full --export users.csv
+
+CACHE_PATH = ROOT / ".cache" / "auth_users.json"
+EXPORT_FIELDS = ("id", "email", "phone", "created_at", "last_sign_in_at", "confirmed", "provider")
+# Sorts users without a created_at last
+NEVER = datetime.datetime.min.replace(tzinfo=datetime.timezone.utc)
+
+
+def slim(user):
+    return {
+        "id": user["id"],
+        "email": user.get("email") or "",
+        "phone": user.get("phone") or "",
+        "created_at": user.get("created_at") or "",
+        "last_sign_in_at": user.get("last_sign_in_at"),
+        "confirmed": bool(user.get("email_confirmed_at") or user.get("phone_confirmed_at")),
+        "provider": (user.get("app_metadata") or {}).get("provider"),
+    }
+
+
+def parse_time(value):
+    return datetime.datetime.fromisoformat(value.replace("Z", "+00:00"))
+
+
+def created_time(user):
+    # Compared as times: RFC3339Nano drops trailing zeros, so ".12345Z" sorts after ".123451Z" as text
+    return parse_time(user["created_at"]) if user.get("created_at") else NEVER
+
+
+def load_mirror(url):
+    try:
+        with open(CACHE_PATH, "r", encoding="utf-8") as f:
+            return json.load(f).get(url, {})
+    except (OSError, ValueError):
+        return {}
+
+
+def save_mirror(url, mirror):
+    data = {}
+    try:
+        with open(CACHE_PATH, "r", encoding="utf-8") as f:
+            data = json.load(f)
+    except (OSError, ValueError):
+        pass
+    data[url] = mirror
+    CACHE_PATH.parent.mkdir(parents=True, exist_ok=True)
+    tmp = CACHE_PATH.with_suffix(".tmp")
+    with open(tmp, "w", encoding="utf-8") as f:
+        json.dump(data, f, indent=1)
+    tmp.replace(CACHE_PATH)
+
+
+class NotNewestFirst(Exception):
+    pass
+
+
+def scan_new(client, known, cursor, per_page):
+    """Users not in `known`, from the newest page down to the first one older than `cursor`."""
+    new, page, previous, requests = [], 1, None, 0
+    cursor = parse_time(cursor)
+    while True:
+        users, _ = client.auth_users_page(page, per_page)
+        requests += 1
+        for user in users:
+            created = created_time(user)
+            if previous is not None and created > previous:
+                raise NotNewestFirst()
+            previous = created
+            if user["id"] not in known and created >= cursor:
+                new.append(slim(user))
+        if len(users) < per_page or (users and created_time(users[-1]) < cursor):
+            return new, requests
+        page += 1
+
+
+def scan_all(client, per_page, workers):
+    """Every user: page 1 for the total, then the other pages in parallel."""
+    first, total = client.auth_users_page(1, per_page)
+    pages = [first]
+    requests = 1
+    if total is not None:
+        last_page = max(1, -(-total // per_page))
+        with ThreadPoolExecutor(max_workers=workers) as pool:
+            pages += pool.map(lambda page: client.auth_users_page(page, per_page)[0], range(2, last_page + 1))
+        requests += last_page - 1
+    else:
+        page = 1
+        while len(pages[-1]) == per_page:
+            page += 1
+            pages.append(client.auth_users_page(page, per_page)[0])
+            requests += 1
+    # Signups during the scan shift later pages, so the same user can be seen twice
+    users = {}
+    for batch in pages:
+        for user in batch:
+            users[user["id"]] = slim(user)
+    return users, requests
+
+
+def print_users(users, limit):
+    for user in users[:limit]:
+        print(f"  - {user['created_at']}: {user['email'] or user['phone']} (ID: {user['id']})")
+    if len(users) > limit:
+        print(f"  ... {len(users) - limit} more")
+
+
+def export(users, path):
+    rows = sorted(users, key=created_time)
+    with open(path, "w", encoding="utf-8", newline="") as f:
+        if str(path).endswith(".jsonl"):
+            for user in rows:
+                f.write(json.dumps(user) + "\n")
+        else:
+            writer = csv.DictWriter(f, fieldnames=EXPORT_FIELDS)
+            writer.writeheader()
+            writer.writerows(rows)
+    print(f"Exported {len(rows)} users to {path}")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Mirror auth users and report new signups")
+    parser.add_argument("--profile", default="dev", choices=sorted(PROFILES))
+    parser.add_argument("--full", action="store_true", help="Re-read every page instead of only new signups")
+    parser.add_argument("--per-page", type=int, default=500)
+    parser.add_argument("--workers", type=int, default=4, help="Pages fetched in parallel on a full scan")
+    parser.add_argument("--since", type=float, metavar="HOURS", help="List users who signed up in the last HOURS")
+    parser.add_argument("--latest", type=int, default=0, metavar="N",
+                        help="With --since, list the last N users overall when nobody signed up in the window")
+    parser.add_argument("--show", type=int, default=50, help="Users to list")
+    parser.add_argument("--export", metavar="PATH", help="Write the mirror to a .csv or .jsonl file")
+    args = parser.parse_args(argv)
+
+    client = SupabaseClient.from_profile(args.profile, pool_size=args.workers)
+    print(f"--- Auth users on {client.url} ---")
+    mirror = load_mirror(client.url)
+    known = mirror.get("users", {})
+    cursor = mirror.get("cursor")
+
+    started = time.perf_counter()
+    try:
+        new = None
+        if cursor and not args.full:
+            try:
+                new, requests = scan_new(client, known, cursor, args.per_page)
+                users = dict(known)
+                users.update((u["id"], u) for u in new)
+            except NotNewestFirst:
+                print("Users didn't come back newest first; doing a full scan.")
+        if new is None:
+            users, requests = scan_all(client, args.per_page, args.workers)
+            new = [u for u in users.values() if u["id"] not in known] if cursor else []
+    except SupabaseError as e:
+        print(f"Auth Admin Error: {e.status_code} {e.text}")
+        return 1
+    elapsed = time.perf_counter() - started
+
+    mode = "full scan" if not cursor or args.full else "incremental"
+    print(f"{len(users)} users ({mode}, {requests} requests, {elapsed:.2f}s)")
+    if cursor:
+        new.sort(key=created_time, reverse=True)
+        print(f"{len(new)} new since the last run ({cursor}):")
+        print_users(new, args.show)
+    if args.full and cursor:
+        gone = len(set(known) - set(users))
+        if gone:
+            print(f"{gone} users deleted since the last full scan")
+
+    save_mirror(client.url, {
+        "cursor": max(users.values(), key=created_time)["created_at"] if users else cursor or "",
+        "users": users,
+    })
+
+    if args.since is not None:
+        threshold = datetime.datetime.now(datetime.timezone.utc) - datetime.timedelta(hours=args.since)
+        recent = sorted((u for u in users.values() if created_time(u) >= threshold), key=created_time, reverse=True)
+        print(f"\nUsers created in the last {args.since:g}h: {len(recent)}")
+        print_users(recent, args.show)
+        if not recent and args.latest:
+            print(f"\nLast {args.latest} users overall:")
+            latest = sorted(users.values(), key=created_time, reverse=True)[:args.latest]
+            print_users(latest, args.latest)
+
+    if args.export:
+        export(users.values(), args.export)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
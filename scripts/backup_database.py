@@ -1,39 +1,37 @@
 
 import os
+import sys
 import json
+import gzip
+import time
+import argparse
 import datetime
+import threading
 from pathlib import Path
-from supabase import create_client, Client
+from concurrent.futures import ThreadPoolExecutor, as_completed
 
-# Load environment variables (manually since we are in a script)
-def load_env():
-    env = {}
-    try:
-        with open('.env', 'r') as f:
-            for line in f:
-                line = line.strip()
-                if not line or line.startswith('#'):
-                    continue
-                key, value = line.split('=', 1)
-                env[key] = value
-    except Exception:
-        print("Could not load .env file")
-    return env
-
-env = load_env()
-URL = env.get("VITE_SUPABASE_URL")
-# Try Service Role Key first, then fall back to Anon (which won't get protected data)
-# Note: The key in the file was labeled oddly, but we will try it.
-# If it fails, we warn.
-KEY = env.get("SUPABASE_SERVICE_ROLE_KEY") or env.get("VITE_SUPABASE_ANON_KEY")
-
-if not URL or not KEY:
-    print("Error: Missing VITE_SUPABASE_URL or Key in .env")
-    exit(1)
-
-print(f"Connecting to Supabase at {URL}...")
-# Init client
-supabase: Client = create_client(URL, KEY)
+from lib import PROFILES, SupabaseClient, resolve_profile
+
+# Backs up Supabase tables to gzip'd NDJSON (one JSON row per line).
+#
+# - Keyset pagination: each page asks for rows *after* the last key we saw
+#   (ORDER BY id + id > last_id) instead of OFFSET, so page N costs the same as page 1.
+# - Tables are backed up in parallel on a small worker pool.
+# - Rows are streamed to disk page by page, nothing is held in memory.
+# - manifest.json records the cursor and committed byte offset of every table after
+#   each page. Re-running with --resume <dir> truncates any half-written page and
+#   carries on from the last committed cursor.
+# - Incremental mode (--incremental <previous backup dir>) only fetches rows whose
+#   updated_at (or created_at) moved past the previous run's high-water mark, plus the
+#   current id list of each table so deletes can be replayed. Each delta manifest
+#   points at its parent, and restore_backup.py folds base + deltas into a snapshot.
+#
+# Usage:
+#   python scripts/backup_database.py
+#   python scripts/backup_database.py --profile prod
+#   python scripts/backup_database.py --resume ~/Desktop/emergency-tradesmen-db-backup-2025-01-01_120000
+#   python scripts/backup_database.py --incremental ~/Desktop/emergency-tradesmen-db-backup-2025-01-01_120000
+#   python scripts/backup_database.py --url http://127.0.0.1:54321 --key stub --out /tmp/bk   (see postgrest_stub.py)
 
 # Tables to backup
 TABLES = [
@@ -45,38 +43,293 @@ TABLES = [
     "newsletter_subscribers"
 ]
 
-# Create backup dir
-dts = datetime.datetime.now().strftime("%Y-%m-%d_%H%M%S")
-backup_dir = Path.home() / "Desktop" / f"emergency-tradesmen-db-backup-{dts}"
-backup_dir.mkdir(parents=True, exist_ok=True)
+# Columns used for keyset pagination. Every table has a primary key `id` (text or uuid), which is
+# unique and never null, so it is a safe default. Tables can be switched to
+# ("created_at", "id") with --keyset to get the dump in insertion order.
+DEFAULT_KEYSET = ("id",)
+
+# Columns tried (in order) for the incremental high-water mark
+HWM_COLUMNS = ("updated_at", "created_at")
+
+# Deltas re-read this many seconds before the previous high-water mark, to cover
+# client/server clock skew and transactions that committed late. Replaying a row
+# twice is harmless because restore upserts by id.
+DEFAULT_OVERLAP = 300
+
+PAGE_SIZE = 1000
+MANIFEST_NAME = "manifest.json"
+
+
+def utc_now():
+    return datetime.datetime.now(datetime.timezone.utc).isoformat()
+
+
+def parse_ts(value):
+    return datetime.datetime.fromisoformat(str(value).replace("Z", "+00:00"))
+
+
+class Manifest:
+    """Checkpoint file shared by all workers. Every write is atomic (tmp + rename)."""
+
+    def __init__(self, path, data):
+        self.path = path
+        self.data = data
+        self.lock = threading.Lock()
+
+    @classmethod
+    def load(cls, path):
+        with open(path, "r", encoding="utf-8") as f:
+            return cls(path, json.load(f))
+
+    @classmethod
+    def load_or_create(cls, path, **fields):
+        if path.exists():
+            return cls.load(path)
+        data = {
+            "started_at": datetime.datetime.now().isoformat(),
+            "type": "full",
+            "parent": None,
+            "tables": {},
+        }
+        data.update(fields)
+        return cls(path, data)
+
+    def table(self, name):
+        with self.lock:
+            return json.loads(json.dumps(self.data["tables"].get(name) or {}))
+
+    def update_table(self, name, part=None, **fields):
+        with self.lock:
+            entry = self.data["tables"].setdefault(name, {})
+            if part:
+                entry = entry.setdefault(part, {})
+            entry.update(fields)
+            self._write()
+
+    def _write(self):
+        tmp = self.path.with_suffix(".tmp")
+        with open(tmp, "w", encoding="utf-8") as f:
+            json.dump(self.data, f, indent=2, default=str)
+        os.replace(tmp, self.path)
+
+
+def stream_table(client, table, file_path, manifest, part, keyset, page_size,
+                 select="*", extra=(), encode=None, on_page=None):
+    """
+    Pages through `table` with keyset pagination and appends each page to file_path as
+    its own gzip member. Progress lives in manifest.tables[table] (or [table][part]) so
+    an interrupted run resumes from the last committed page.
+    """
+    state = manifest.table(table)
+    if part:
+        state = state.get(part) or {}
+    cursor = state.get("cursor")
+    rows = state.get("rows", 0)
+    pages = state.get("pages", 0)
+    committed = state.get("bytes", 0)
+    encode = encode or (lambda row: json.dumps(row, default=str, ensure_ascii=False))
+
+    # Drop anything written after the last checkpoint (a page that was mid-write
+    # when the previous run died).
+    mode = "r+b" if file_path.exists() else "wb"
+    with open(file_path, mode) as f:
+        f.truncate(committed)
+        f.seek(committed)
+
+        for data in client.pages(table, select, extra, keyset, cursor, page_size):
+            payload = "".join(encode(row) + "\n" for row in data)
+            # One gzip member per page. Concatenated members are a valid gzip stream,
+            # and page boundaries give us clean truncation points for resume.
+            f.write(gzip.compress(payload.encode("utf-8"), compresslevel=6))
+            f.flush()
+            os.fsync(f.fileno())
+
+            rows += len(data)
+            pages += 1
+            cursor = [data[-1].get(k) for k in keyset]
+            committed = f.tell()
+            extra_state = on_page(data) if on_page else {}
+            manifest.update_table(table, part, cursor=cursor, rows=rows, pages=pages,
+                                  bytes=committed, **extra_state)
+    return rows
+
+
+def delta_since(parent_entry, overlap):
+    """Lower bound for a delta: the earlier of the parent's watermark and the moment it
+    started reading the table (rows changed mid-scan may sit behind the watermark)."""
+    bounds = [parse_ts(v) for v in (parent_entry.get("watermark"), parent_entry.get("started_at")) if v]
+    if not bounds:
+        return None
+    return (min(bounds) - datetime.timedelta(seconds=overlap)).isoformat()
 
-print(f"Starting backup to: {backup_dir}")
 
-for table in TABLES:
-    print(f"Backing up table: {table}...", end=" ")
+def backup_table(client, table, backup_dir, manifest, keyset, page_size, parent=None, overlap=DEFAULT_OVERLAP):
+    state = manifest.table(table)
+    if state.get("status") == "done":
+        print(f"[{table}] already complete ({state.get('rows', 0)} rows), skipping")
+        return state.get("rows", 0)
+
+    file_name = f"{table}.ndjson.gz"
+    fields = {"status": "running", "file": file_name}
+    if "started_at" not in state:
+        fields["started_at"] = utc_now()
+
+    parent_entry = (parent.data["tables"].get(table) or {}) if parent else {}
+    since = None
+    if parent is not None and parent_entry.get("status") == "done" and parent_entry.get("hwm_column"):
+        since = state.get("since") or delta_since(parent_entry, overlap)
+
+    if since:
+        hwm_column = parent_entry["hwm_column"]
+        keyset = tuple(state.get("keyset") or (hwm_column, "id"))
+        extra = [(hwm_column, f"gte.{since}")]
+        fields.update(keyset=list(keyset), since=since, hwm_column=hwm_column, full=False,
+                      watermark=state.get("watermark") or parent_entry.get("watermark"))
+    else:
+        # First backup, or the previous one could not track this table: take it whole
+        hwm_column = state.get("hwm_column")
+        keyset = tuple(state.get("keyset") or keyset)
+        extra = []
+        fields.update(keyset=list(keyset), full=True)
+        if parent is not None:
+            print(f"[{table}] no usable high-water mark in the previous backup, taking a full copy")
+    manifest.update_table(table, **fields)
+
+    if state.get("cursor"):
+        print(f"[{table}] resuming after {state.get('rows', 0)} rows")
+
+    watermark = fields.get("watermark") or state.get("watermark")
+
+    def track_watermark(data):
+        nonlocal hwm_column, watermark
+        if hwm_column is None:
+            hwm_column = next((c for c in HWM_COLUMNS if c in data[0]), None)
+            if hwm_column is None:
+                return {}
+        values = [row[hwm_column] for row in data if row.get(hwm_column)]
+        if values:
+            latest = max(values, key=parse_ts)
+            if watermark is None or parse_ts(latest) > parse_ts(watermark):
+                watermark = latest
+        return {"hwm_column": hwm_column, "watermark": watermark}
+
+    rows = stream_table(client, table, backup_dir / file_name, manifest, None, keyset, page_size,
+                        extra=extra, on_page=track_watermark)
+
+    if since:
+        # Deltas can't see deletes, so also record which ids still exist. This is
+        # ~40 bytes per row instead of the full row.
+        ids_state = state.get("ids") or {}
+        if ids_state.get("status") != "done":
+            ids_name = f"{table}.ids.gz"
+            manifest.update_table(table, "ids", status="running", file=ids_name)
+            stream_table(client, table, backup_dir / ids_name, manifest, "ids", ("id",), page_size,
+                         select="id", encode=lambda row: str(row["id"]))
+            manifest.update_table(table, "ids", status="done")
+
+    manifest.update_table(table, status="done", finished_at=datetime.datetime.now().isoformat())
+    label = f"{rows} changed rows since {since}" if since else f"{rows} rows"
+    print(f"[{table}] Success! ({label})")
+    return rows
+
+
+def peak_rss_mb():
     try:
-        # Fetch all rows (pagination might be needed for huge tables, but for <10k rows usually okay in one chunk or we loop)
-        # Supabase API limits to 1000 rows by default. We need to loop.
-        
-        all_data = []
-        start = 0
-        batch_size = 1000
-        while True:
-            response = supabase.table(table).select("*").range(start, start + batch_size - 1).execute()
-            data = response.data
-            all_data.extend(data)
-            
-            if len(data) < batch_size:
-                break
-            start += batch_size
-            
-        print(f"Success! ({len(all_data)} rows)")
-        
-        file_path = backup_dir / f"{table}.json"
-        with open(file_path, "w", encoding="utf-8") as f:
-            json.dump(all_data, f, indent=2, default=str)
-            
-    except Exception as e:
-        print(f"FAILED. Error: {e}")
-
-print("\nBackup complete!")
+        import resource
+    except ImportError:  # Windows
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # ru_maxrss is KB on Linux, bytes on macOS
+    return peak / (1024 * 1024) if sys.platform == "darwin" else peak / 1024
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="Stream Supabase tables to gzip'd NDJSON")
+    parser.add_argument("--out", help="Backup directory (default: Desktop/emergency-tradesmen-db-backup-<timestamp>)")
+    parser.add_argument("--resume", help="Resume an interrupted backup in this directory")
+    parser.add_argument("--incremental", metavar="PARENT",
+                        help="Only fetch rows changed since the backup in this directory (full or delta)")
+    parser.add_argument("--overlap", type=int, default=DEFAULT_OVERLAP,
+                        help="Seconds of overlap before the previous high-water mark")
+    parser.add_argument("--tables", help="Comma separated table list (default: all)")
+    parser.add_argument("--workers", type=int, default=4, help="Tables backed up at once")
+    parser.add_argument("--page-size", type=int, default=PAGE_SIZE)
+    parser.add_argument("--keyset", default=",".join(DEFAULT_KEYSET),
+                        help="Comma separated keyset columns, e.g. created_at,id")
+    parser.add_argument("--profile", default="dev", choices=sorted(PROFILES), help="Project to back up")
+    parser.add_argument("--url", help="Override the profile URL")
+    parser.add_argument("--key", help="Override the API key")
+    return parser.parse_args()
+
+
+def main():
+    args = parse_args()
+    # Service role key first, anon as fallback (which won't get protected data)
+    url, key = resolve_profile(args.profile)
+    url, key = (args.url or url).rstrip("/"), args.key or key
+    client = SupabaseClient(url, key, pool_size=args.workers, name=args.profile)
+
+    if args.resume:
+        backup_dir = Path(args.resume).expanduser()
+        if not (backup_dir / MANIFEST_NAME).exists():
+            print(f"Error: no {MANIFEST_NAME} in {backup_dir}")
+            sys.exit(1)
+    elif args.out:
+        backup_dir = Path(args.out).expanduser()
+    else:
+        dts = datetime.datetime.now().strftime("%Y-%m-%d_%H%M%S")
+        kind = "delta" if args.incremental else "backup"
+        backup_dir = Path.home() / "Desktop" / f"emergency-tradesmen-db-{kind}-{dts}"
+    backup_dir.mkdir(parents=True, exist_ok=True)
+
+    fields = {"url": url, "keyset": args.keyset.split(","), "page_size": args.page_size, "overlap": args.overlap}
+    if args.incremental:
+        parent_dir = Path(args.incremental).expanduser().resolve()
+        if not (parent_dir / MANIFEST_NAME).exists():
+            print(f"Error: no {MANIFEST_NAME} in {parent_dir}")
+            sys.exit(1)
+        fields.update(type="delta", parent=str(parent_dir))
+    manifest = Manifest.load_or_create(backup_dir / MANIFEST_NAME, **fields)
+
+    # A resumed run must keep paging the way it started
+    keyset = tuple(manifest.data["keyset"])
+    page_size = manifest.data["page_size"]
+    overlap = manifest.data.get("overlap", DEFAULT_OVERLAP)
+    parent = Manifest.load(Path(manifest.data["parent"]) / MANIFEST_NAME) if manifest.data.get("parent") else None
+    tables = args.tables.split(",") if args.tables else TABLES
+
+    print(f"Connecting to Supabase at {url}...")
+    label = f"incremental since {manifest.data['parent']}" if parent else "full"
+    print(f"Starting {label} backup to: {backup_dir} ({len(tables)} tables, {args.workers} workers)")
+
+    started = time.perf_counter()
+    total_rows = 0
+    failed = []
+    with ThreadPoolExecutor(max_workers=args.workers) as pool:
+        futures = {
+            pool.submit(backup_table, client, table, backup_dir, manifest, keyset, page_size, parent, overlap): table
+            for table in tables
+        }
+        for future in as_completed(futures):
+            table = futures[future]
+            try:
+                total_rows += future.result()
+            except Exception as e:
+                print(f"[{table}] FAILED. Error: {e}")
+                manifest.update_table(table, status="failed", error=str(e))
+                failed.append(table)
+
+    elapsed = time.perf_counter() - started
+    rss = peak_rss_mb()
+    print(f"\n{total_rows} rows in {elapsed:.1f}s ({total_rows / max(elapsed, 1e-9):.0f} rows/sec)"
+          + (f", peak RSS {rss:.1f} MB" if rss is not None else ""))
+
+    if failed:
+        print(f"Backup incomplete, failed tables: {', '.join(failed)}")
+        print(f"Re-run with --resume \"{backup_dir}\" to continue.")
+        sys.exit(1)
+    print("\nBackup complete!")
+
+
+if __name__ == "__main__":
+    main()
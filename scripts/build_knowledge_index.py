@@ -0,0 +1,71 @@
+import sys
+import json
+import time
+import argparse
+from collections import Counter
+
+from lib.knowledge import INDEX_PATH, KnowledgeIndex, build_index, write_index
+from lib.qacorpus import CORPUS_PATH, load_corpus
+
+# Builds the BM25 index the chatbot's searchKnowledgeBase() ranks answers with, from
+# the Q&A corpus in scripts/data/qa_corpus.json. Written to
+# src/config/knowledge-index.json and committed with the site; rebuild after editing
+# the corpus (--check fails while the committed file is stale). export_qa.py writes
+# the same file along with the corpus's other exports.
+#
+# Usage:
+#   python scripts/build_knowledge_index.py
+#   python scripts/build_knowledge_index.py --query "my fuse box is buzzing"
+#   python scripts/build_knowledge_index.py --check
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Build the chatbot's BM25 knowledge index")
+    parser.add_argument("--query", help="Search the built index instead of building it")
+    parser.add_argument("--limit", type=int, default=3)
+    parser.add_argument("--check", action="store_true", help="Exit 1 if the index is out of date")
+    args = parser.parse_args(argv)
+
+    if args.query is not None:
+        try:
+            index = KnowledgeIndex.load()
+        except (OSError, ValueError) as e:
+            print(f"Error loading {INDEX_PATH}: {e}")
+            return 1
+        started = time.perf_counter()
+        hits = index.search(args.query, args.limit)
+        elapsed = time.perf_counter() - started
+        for score, doc in hits:
+            print(f"  {score:>7.3f}  [{doc['category']}] {doc['q']}\n           {doc['a']}")
+        print(f"{len(hits)} results ({elapsed * 1000:.2f} ms); safety tips from {index.answer(args.query)[0]}")
+        return 0
+
+    try:
+        corpus = load_corpus()
+    except (OSError, ValueError) as e:
+        print(f"Error loading {CORPUS_PATH}: {e}")
+        return 1
+    index = build_index(corpus)
+    docs = index["docs"]
+    if args.check:
+        try:
+            with open(INDEX_PATH, "r", encoding="utf-8") as f:
+                current = json.load(f)
+        except (OSError, ValueError):
+            current = None
+        if current != index:
+            print(f"{INDEX_PATH} is out of date; run scripts/build_knowledge_index.py")
+            return 1
+        print(f"{INDEX_PATH} is up to date ({len(docs)} Q&A)")
+        return 0
+
+    size = write_index(index)
+    by_category = Counter(doc["category"] for doc in docs)
+    print(f"{len(docs)} Q&A ({', '.join(f'{n} {c.lower()}' for c, n in sorted(by_category.items()))}), "
+          f"{len(index['terms'])} terms")
+    print(f"Wrote {INDEX_PATH} ({size / 1024:.0f} KB)")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,122 @@
+import sys
+import time
+import datetime
+import random
+import pathlib
+import argparse
+
+from lib import PROFILES, SupabaseClient, SupabaseError
+from lib.listings import load_listings
+from lib.searchindex import ASSET_PATH, SearchIndex, build_index, fold, merge_docs, write_index
+from lib.snapshot import load_snapshot
+
+# Builds the business search index that searchBusinesses() answers from, instead of
+# running name/trade ilike '%q%' scans against the businesses table.
+#
+# The index covers the static businesses.ts listings and the verified Supabase
+# businesses (merged by id, Supabase wins), and is written to
+# public/search-index.v<N>.json, so it ships with the site (the file is git-ignored;
+# build it before each deploy). When the file is missing the site falls back to the
+# ilike query.
+#
+# The Supabase part is a snapshot as of the build: built_at records when the rows
+# were read, and the site adds businesses updated after it (newly verified, renamed,
+# re-rated) from a live query on updated_at (migration 026). A stale index still
+# finds every business, but the live part grows until the next rebuild.
+#
+# Usage:
+#   python scripts/build_search_index.py --profile prod
+#   python scripts/build_search_index.py --supabase snapshot          from snapshot_businesses.py pull
+#   python scripts/build_search_index.py --query "24 hour lock"       search the built index
+#   python scripts/build_search_index.py --check 500                  compare with a full scan
+
+SUPABASE_COLUMNS = "id,name,trade,city,rating,verified"
+NO_SUPABASE_ROWS = "1970-01-01T00:00:00+00:00"
+
+
+def supabase_rows(args):
+    """(rows, as of): the verified Supabase businesses and the time they were read at."""
+    if args.supabase == "none":
+        # Nothing from Supabase is indexed, so the site's live query must cover every row
+        return [], NO_SUPABASE_ROWS
+    if args.supabase == "snapshot":
+        table = load_snapshot(args.profile)
+        return table.query().where("verified", "is.true").rows(SUPABASE_COLUMNS.split(",")), table.meta["pulled_at"]
+    client = SupabaseClient.from_profile(args.profile)
+    as_of = datetime.datetime.now(datetime.timezone.utc).isoformat(timespec="seconds")
+    return list(client.paginate("businesses", select=SUPABASE_COLUMNS, filters={"verified": "eq.true"})), as_of
+
+
+def check(index, samples, seed=0):
+    """Search random substrings of names and trades and compare with a plain scan."""
+    rng = random.Random(seed)
+    texts = [doc[1] for doc in index.docs] + index.trades
+    failures = 0
+    for _ in range(samples):
+        text = fold(rng.choice(texts))
+        if not text:
+            continue
+        size = rng.randint(1, min(8, len(text)))
+        start = rng.randint(0, len(text) - size)
+        query = text[start:start + size].strip()
+        if not query:
+            continue
+        expected = [doc for n, doc in enumerate(index.docs) if index.matches(n, query)][:20]
+        if index.search(query) != expected:
+            failures += 1
+            print(f"  MISMATCH for {query!r}")
+    return failures
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Build the static business search index")
+    parser.add_argument("--supabase", default="live", choices=("live", "snapshot", "none"),
+                        help="Where verified Supabase businesses come from")
+    parser.add_argument("--profile", default="prod", choices=sorted(PROFILES))
+    parser.add_argument("--out", default=str(ASSET_PATH), help="Where to write the index")
+    parser.add_argument("--query", help="Search the existing index instead of building it")
+    parser.add_argument("--limit", type=int, default=20)
+    parser.add_argument("--check", type=int, metavar="N", help="Verify N random searches against a full scan")
+    args = parser.parse_args(argv)
+    out = pathlib.Path(args.out)
+
+    if args.query is not None or args.check:
+        try:
+            index = SearchIndex.load(out)
+        except (OSError, ValueError) as e:
+            print(f"Error loading {out}: {e}")
+            return 1
+        if args.query is not None:
+            started = time.perf_counter()
+            hits = index.search(args.query, args.limit)
+            elapsed = time.perf_counter() - started
+            for doc_id, name, trade, city, rating, from_supabase in hits:
+                source = "supabase" if from_supabase else "static"
+                print(f"  {rating:>4}  {name} ({index.trades[trade]}, {index.asset['cities'][city]}) [{source}] {doc_id}")
+            print(f"{len(hits)} results ({elapsed * 1000:.2f} ms)")
+        if args.check:
+            failures = check(index, args.check)
+            print(f"{args.check} random searches, {failures} mismatches")
+            return 1 if failures else 0
+        return 0
+
+    started = time.perf_counter()
+    try:
+        rows, as_of = supabase_rows(args)
+    except FileNotFoundError as e:
+        print(f"Error: {e}")
+        return 1
+    except SupabaseError as e:
+        print(f"Error fetching businesses: {e}")
+        return 1
+    docs = merge_docs(load_listings(), rows)
+    asset = build_index(docs, as_of)
+    size = write_index(asset, out)
+    print(f"{len(docs)} businesses ({sum(d['supabase'] for d in docs)} from Supabase), "
+          f"{len(asset['grams'])} trigrams")
+    print(f"Wrote {out} ({size / 1024:.0f} KB) in {time.perf_counter() - started:.1f}s")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
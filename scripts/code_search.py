@@ -0,0 +1,73 @@
+import re
+import sys
+import time
+import argparse
+
+from lib.codesearch import load_index
+
+# Regex search over src/ answered from a trigram index, for class-usage and style
+# audits ("which files still use bg-gold / glow / conic-gradient?").
+#
+# The index is kept in .cache/codesearch.pickle and refreshed by mtime on every run,
+# so only edited files are re-read; each pattern is then run only on the files whose
+# trigrams can contain it.
+#
+# Usage:
+#   python scripts/code_search.py bg-gold glow blob conic-gradient blur
+#   python scripts/code_search.py "text-(red|blue)-500" --path src/components/
+#   python scripts/code_search.py animate-pulse --files
+#   python scripts/code_search.py -i "revolut" --count
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Indexed regex search over src/")
+    parser.add_argument("patterns", nargs="+", help="Python regexes; a line matching any of them is shown")
+    parser.add_argument("--path", action="append", help="Only files under this path (repeatable)")
+    parser.add_argument("-i", "--ignore-case", action="store_true")
+    output = parser.add_mutually_exclusive_group()
+    output.add_argument("--files", action="store_true", help="Only list matching files")
+    output.add_argument("--count", action="store_true", help="Matching lines per pattern")
+    parser.add_argument("--no-cache", action="store_true", help="Index from scratch, don't write the cache")
+    args = parser.parse_args(argv)
+
+    try:
+        for pattern in args.patterns:
+            re.compile(pattern)
+    except re.error as e:
+        print(f"Invalid pattern {pattern!r}: {e}")
+        return 2
+
+    started = time.perf_counter()
+    index = load_index(use_cache=not args.no_cache)
+    loaded = time.perf_counter()
+
+    prefixes = [p.replace("\\", "/").lstrip("./") for p in args.path or []]
+    paths = None
+    if prefixes:
+        paths = {rel for rel in index.files if any(rel.startswith(prefix) for prefix in prefixes)}
+    hits = index.search(args.patterns, re.I if args.ignore_case else 0, paths)
+    elapsed = time.perf_counter() - started
+
+    if args.files:
+        for rel in sorted({hit.path for hit in hits}):
+            print(rel)
+    elif args.count:
+        for pattern in args.patterns:
+            matching = [hit for hit in hits if pattern in hit.patterns]
+            print(f"  {len(matching):>6} lines in {len({hit.path for hit in matching}):>4} files  {pattern}")
+    else:
+        current = None
+        for hit in hits:
+            if hit.path != current:
+                current = hit.path
+                print(f"\n--- {current} ---")
+            print(f"[{hit.line}] {hit.text.strip()}")
+
+    print(f"\n{len(hits)} lines in {len({hit.path for hit in hits})} of {len(index.files)} files "
+          f"({(loaded - started) * 1000:.0f} ms index, {(elapsed - (loaded - started)) * 1000:.0f} ms search)",
+          file=sys.stderr)
+    return 0 if hits else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
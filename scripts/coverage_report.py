@@ -0,0 +1,142 @@
+import csv
+import sys
+import time
+import argparse
+
+from lib import PROFILES, ROOT, SupabaseClient, SupabaseError
+from lib.coverage import LAYERS, TAXONOMY_PATH, Coverage, build_coverage, load_taxonomy
+from lib.listings import SOURCE_PATH, load_listings
+from lib.snapshot import load_snapshot
+
+# Trade x city listing coverage: static businesses.ts merged with verified Supabase
+# businesses the way the trade/city pages do (by id, Supabase wins), as one matrix.
+# Replaces coverage_summary.ts and count_total_listings_v2.ts (--supabase none --layer
+# static) and debug_city_dist.mjs and debug_trade_dist.mjs (--layer supabase --by-city;
+# they also counted unverified rows, which no page shows), now removed.
+#
+# Supabase rows come from the live API (--supabase live), the last local snapshot
+# (--supabase snapshot, see snapshot_businesses.py) or are left out (--supabase none).
+# The matrix is cached in .cache/coverage/ and rebuilt when businesses.ts, trades.ts
+# or the snapshot change, or after --max-age seconds for live data.
+#
+# Usage:
+#   python scripts/coverage_report.py                                  summary + cells under 20
+#   python scripts/coverage_report.py --supabase snapshot --min 5 --by-city
+#   python scripts/coverage_report.py --supabase none --layer static
+#   python scripts/coverage_report.py --csv coverage.csv --refresh
+
+CACHE_DIR = ROOT / ".cache" / "coverage"
+SUPABASE_COLUMNS = "id,trade,city,tier,verified"
+
+
+def file_stamp(path):
+    stat = path.stat()
+    return f"{stat.st_size}:{stat.st_mtime_ns}"
+
+
+def supabase_rows(args):
+    """(rows, description of the source for the cache key)"""
+    if args.supabase == "none":
+        return [], "none"
+    if args.supabase == "snapshot":
+        table = load_snapshot(args.profile)
+        rows = table.query().where("verified", "is.true").rows(SUPABASE_COLUMNS.split(","))
+        return rows, f"snapshot:{args.profile}:{table.meta['pulled_at']}"
+    client = SupabaseClient.from_profile(args.profile)
+    rows = list(client.paginate("businesses", select=SUPABASE_COLUMNS, filters={"verified": "eq.true"}))
+    return rows, f"live:{client.url}"
+
+
+def get_coverage(args):
+    """(Coverage, whether it came from the cache)"""
+    cache_path = CACHE_DIR / f"{args.supabase}-{args.profile}.npz"
+    meta = {"listings": file_stamp(SOURCE_PATH), "taxonomy": file_stamp(TAXONOMY_PATH), "supabase": args.supabase}
+    if args.supabase == "snapshot":
+        meta["snapshot"] = load_snapshot(args.profile).meta["pulled_at"]
+    fresh = args.supabase != "live" or (cache_path.exists() and time.time() - cache_path.stat().st_mtime < args.max_age)
+    if not args.refresh and fresh:
+        cached = Coverage.load(cache_path, meta)
+        if cached is not None:
+            return cached, True
+
+    rows, _ = supabase_rows(args)
+    coverage = build_coverage(load_listings(), rows, *load_taxonomy())
+    coverage.save(cache_path, meta)
+    return coverage, False
+
+
+def write_csv(coverage, layer, path):
+    matrix = coverage.matrices[layer]
+    with open(path, "w", encoding="utf-8", newline="") as f:
+        writer = csv.writer(f)
+        writer.writerow(["city"] + coverage.trades)
+        for j, city in enumerate(coverage.cities):
+            writer.writerow([city] + matrix[:, j].tolist())
+    print(f"Wrote {len(coverage.cities)} cities x {len(coverage.trades)} trades ({layer}) to {path}")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Trade x city listing coverage and gaps")
+    parser.add_argument("--supabase", default="live", choices=("live", "snapshot", "none"),
+                        help="Where verified Supabase businesses come from")
+    parser.add_argument("--profile", default="prod", choices=sorted(PROFILES))
+    parser.add_argument("--layer", default="total", choices=LAYERS,
+                        help="Count merged listings (total), or only static, supabase or paid ones")
+    parser.add_argument("--min", type=int, default=20, help="Report cells with fewer listings than this")
+    parser.add_argument("--show", type=int, default=50, help="Gaps to list")
+    parser.add_argument("--by-city", action="store_true", help="Also print totals per city")
+    parser.add_argument("--csv", metavar="PATH", help="Write the city x trade matrix to a CSV file")
+    parser.add_argument("--max-age", type=float, default=600, help="Seconds a cached live build is reused")
+    parser.add_argument("--refresh", action="store_true", help="Rebuild instead of using the cache")
+    args = parser.parse_args(argv)
+
+    started = time.perf_counter()
+    try:
+        coverage, cached = get_coverage(args)
+    except FileNotFoundError as e:
+        print(f"Error: {e}")
+        return 1
+    except (KeyError, ValueError) as e:
+        print(f"Error: {e.args[0]}")
+        return 1
+    except SupabaseError as e:
+        print(f"Error fetching businesses: {e}")
+        return 1
+    elapsed = time.perf_counter() - started
+
+    layer = args.layer
+    matrix = coverage.matrices[layer]
+    site = matrix[:coverage.site_trades, :coverage.site_cities]
+    print(f"--- Coverage ({layer}, Supabase: {args.supabase}) ---")
+    print("By trade:")
+    for i, trade in enumerate(coverage.trades):
+        row = matrix[i]
+        print(f"  {trade:<20} {int(row.sum()):>6} listings across {int((row > 0).sum())} cities")
+    if args.by_city:
+        print("By city:")
+        for city, n in sorted(coverage.by_city(layer).items(), key=lambda item: (-item[1], item[0])):
+            print(f"  {city:<28} {n:>6}")
+
+    extra_trades, extra_cities = coverage.off_site()
+    if extra_trades or extra_cities:
+        print(f"Listed but not on the site: {', '.join(extra_trades + extra_cities)}")
+
+    gaps = coverage.gaps(args.min, layer)
+    print(f"\n{len(gaps)} of {site.size} site trade/city pages have fewer than {args.min} listings:")
+    for trade, city, n in gaps[:args.show]:
+        print(f"  {n:>4}  {trade} in {city}")
+    if len(gaps) > args.show:
+        print(f"  ... {len(gaps) - args.show} more")
+
+    print(f"\n{int(matrix.sum())} listings, {int(site.sum())} on site pages, "
+          f"{int((site == 0).sum())} empty pages, {len(coverage.cities)} cities")
+    source = "cache" if cached else "fresh build"
+    print(f"({source}, {elapsed * 1000:.0f} ms)", file=sys.stderr)
+
+    if args.csv:
+        write_csv(coverage, layer, args.csv)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
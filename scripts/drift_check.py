@@ -0,0 +1,237 @@
+import sys
+import hashlib
+import argparse
+from concurrent.futures import ThreadPoolExecutor
+
+from lib import PROFILES, SupabaseClient, SupabaseError, quote_value, row_hash
+from sync_businesses import EXCLUDED_COLUMNS
+
+# Detects businesses drift between two projects without downloading the table.
+#
+# Compares hashes top-down, like a Merkle tree:
+#   root    hash of every bucket hash          -> equal? done.
+#   bucket  one hash per (trade, city)         -> a few KB for the whole table
+#   shard   16 hashes per differing bucket     (first hex digit of md5(slug))
+#   row     slug + hash, only in shards whose hashes differ
+#   --rows  full rows, only for slugs whose hashes differ
+#
+# Hashes are computed in Postgres by the functions in
+# supabase/migrations/023_drift_fingerprints.sql. If either project doesn't have them
+# yet, both sides fall back to hashing locally (which does download the hashed columns).
+#
+# Usage:
+#   python scripts/drift_check.py
+#   python scripts/drift_check.py --rows
+#   python scripts/drift_check.py --columns logo_url,photos,tier
+
+TABLE = "businesses"
+RPC_PAGE = 1000
+
+
+def shared_columns(a, b, requested=None):
+    """Columns both projects have, minus ones that legitimately differ per project."""
+    def columns(client):
+        sample = client.select(TABLE, limit=1)
+        return set(sample[0]) if sample else None
+
+    cols_a, cols_b = columns(a), columns(b)
+    cols_a = cols_a if cols_a is not None else cols_b or set()
+    cols_b = cols_b if cols_b is not None else cols_a
+    for name, only in ((a.name, cols_a - cols_b), (b.name, cols_b - cols_a)):
+        if only:
+            print(f"Columns only on {name} (ignored): {', '.join(sorted(only))}")
+    shared = (cols_a & cols_b) - EXCLUDED_COLUMNS - {"id"}
+    if requested:
+        shared &= set(requested) | {"slug", "trade", "city"}
+    return sorted(shared)
+
+
+def slug_shard(slug):
+    """Same as business_slug_shard() in SQL."""
+    return hashlib.md5(slug.encode("utf-8")).hexdigest()[0]
+
+
+def bucket_digest(row_digests):
+    """Client-side equivalent of the string_agg/md5 in the fingerprint functions."""
+    joined = ",".join(f"{slug}:{digest}" for slug, digest in sorted(row_digests.items()))
+    return hashlib.md5(joined.encode("utf-8")).hexdigest()
+
+
+def root_digest(buckets):
+    joined = ",".join(f"{trade}|{city}:{d['digest']}" for (trade, city), d in sorted(buckets.items()))
+    return hashlib.md5(joined.encode("utf-8")).hexdigest()
+
+
+class ServerSide:
+    """Hashes computed by Postgres; only hashes cross the wire."""
+
+    def __init__(self, client, columns):
+        self.client = client
+        self.columns = columns
+
+    def _rpc_all(self, function, args):
+        rows, offset = [], 0
+        while True:
+            page = self.client.rpc(function, args, params={"limit": RPC_PAGE, "offset": offset})
+            rows.extend(page)
+            if len(page) < RPC_PAGE:
+                return rows
+            offset += RPC_PAGE
+
+    def buckets(self):
+        rows = self._rpc_all("business_bucket_fingerprints", {"cols": self.columns})
+        return {(r["trade"], r["city"]): {"rows": r["row_count"], "digest": r["digest"]} for r in rows}
+
+    def shards(self, trade, city):
+        rows = self._rpc_all("business_shard_fingerprints", {"cols": self.columns, "p_trade": trade, "p_city": city})
+        return {r["shard"]: r["digest"] for r in rows}
+
+    def rows(self, trade, city, shard):
+        rows = self._rpc_all("business_row_fingerprints",
+                             {"cols": self.columns, "p_trade": trade, "p_city": city, "p_shard": shard})
+        return {r["slug"]: r["digest"] for r in rows}
+
+
+class ClientSide:
+    """Fallback: download the hashed columns once and hash locally."""
+
+    def __init__(self, client, columns):
+        self.client = client
+        self.columns = columns
+        self._rows = None
+
+    def _load(self):
+        if self._rows is None:
+            self._rows = {}
+            select = ",".join(dict.fromkeys(["id", "slug", "trade", "city"] + self.columns))
+            for row in self.client.paginate(TABLE, select=select):
+                bucket = self._rows.setdefault((row["trade"], row["city"]), {})
+                bucket[row["slug"]] = row_hash(row, self.columns)
+        return self._rows
+
+    def buckets(self):
+        return {key: {"rows": len(rows), "digest": bucket_digest(rows)} for key, rows in self._load().items()}
+
+    def _shard_rows(self, trade, city):
+        shards = {}
+        for slug, digest in self._load().get((trade, city), {}).items():
+            shards.setdefault(slug_shard(slug), {})[slug] = digest
+        return shards
+
+    def shards(self, trade, city):
+        return {shard: bucket_digest(rows) for shard, rows in self._shard_rows(trade, city).items()}
+
+    def rows(self, trade, city, shard):
+        return self._shard_rows(trade, city).get(shard, {})
+
+
+def has_fingerprint_functions(client, columns):
+    try:
+        client.rpc("business_bucket_fingerprints", {"cols": columns}, params={"limit": 1})
+        return True
+    except SupabaseError as e:
+        if e.status_code in (400, 404):
+            return False
+        raise
+
+
+def fetch_rows(client, slugs):
+    rows = {}
+    slugs = list(slugs)
+    for start in range(0, len(slugs), 100):
+        chunk = ",".join(quote_value(s) for s in slugs[start:start + 100])
+        for row in client.select(TABLE, filters={"slug": f"in.({chunk})"}):
+            rows[row["slug"]] = row
+    return rows
+
+
+def check(a, b, requested_columns=None, show_rows=False, limit=50):
+    columns = shared_columns(a, b, requested_columns)
+    hashed = [c for c in columns if c != "slug"]
+
+    with ThreadPoolExecutor(max_workers=8) as pool:
+        server = all(pool.map(lambda c: has_fingerprint_functions(c, hashed), (a, b)))
+        side = ServerSide if server else ClientSide
+        if not server:
+            print("Fingerprint functions (migration 023) missing on at least one project, hashing locally.")
+        side_a, side_b = side(a, hashed), side(b, hashed)
+
+        buckets_a, buckets_b = pool.map(lambda s: s.buckets(), (side_a, side_b))
+        print(f"Compared {len(hashed)} columns across {len(set(buckets_a) | set(buckets_b))} (trade, city) buckets")
+
+        if root_digest(buckets_a) == root_digest(buckets_b):
+            print(f"No drift: root hashes match ({sum(d['rows'] for d in buckets_a.values())} rows).")
+            return 0
+
+        differing = sorted(k for k in set(buckets_a) | set(buckets_b)
+                           if buckets_a.get(k, {}).get("digest") != buckets_b.get(k, {}).get("digest"))
+        print(f"{len(differing)} buckets differ, drilling down")
+
+        # Level 2: shards of the differing buckets
+        jobs = [(k, pool.submit(side_a.shards, *k), pool.submit(side_b.shards, *k)) for k in differing]
+        shards = []
+        for key, fut_a, fut_b in jobs:
+            shards_a, shards_b = fut_a.result(), fut_b.result()
+            shards.extend(key + (s,) for s in sorted(set(shards_a) | set(shards_b))
+                          if shards_a.get(s) != shards_b.get(s))
+
+        # Level 3: row hashes of the differing shards
+        rows_a, rows_b = {}, {}
+        jobs = [(pool.submit(side_a.rows, *k), pool.submit(side_b.rows, *k)) for k in shards]
+        for fut_a, fut_b in jobs:
+            rows_a.update(fut_a.result())
+            rows_b.update(fut_b.result())
+
+    only_a = sorted(set(rows_a) - set(rows_b))
+    only_b = sorted(set(rows_b) - set(rows_a))
+    changed = sorted(s for s in set(rows_a) & set(rows_b) if rows_a[s] != rows_b[s])
+
+    for trade, city in differing[:limit]:
+        count_a = buckets_a.get((trade, city), {}).get("rows", 0)
+        count_b = buckets_b.get((trade, city), {}).get("rows", 0)
+        print(f"  {trade:<20} {city:<20} {a.name}={count_a:<6} {b.name}={count_b}")
+
+    print(f"\nOnly on {a.name}: {len(only_a)}")
+    for slug in only_a[:limit]:
+        print(f"  + {slug}")
+    print(f"Only on {b.name}: {len(only_b)}")
+    for slug in only_b[:limit]:
+        print(f"  - {slug}")
+    print(f"Changed: {len(changed)}")
+
+    if show_rows and changed:
+        full_a, full_b = fetch_rows(a, changed[:limit]), fetch_rows(b, changed[:limit])
+        for slug in changed[:limit]:
+            ra, rb = full_a.get(slug, {}), full_b.get(slug, {})
+            diff = [c for c in columns if ra.get(c) != rb.get(c)]
+            print(f"  ~ {slug}")
+            for c in diff:
+                print(f"      {c}: {ra.get(c)!r} -> {rb.get(c)!r}")
+    else:
+        for slug in changed[:limit]:
+            print(f"  ~ {slug}")
+    return 1
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Hash-based businesses drift check between projects")
+    parser.add_argument("--a", default="dev", choices=sorted(PROFILES))
+    parser.add_argument("--b", default="prod", choices=sorted(PROFILES))
+    parser.add_argument("--columns", help="Only compare these columns")
+    parser.add_argument("--rows", action="store_true", help="Fetch changed rows and show field differences")
+    parser.add_argument("--limit", type=int, default=50, help="Max items listed per section")
+    args = parser.parse_args(argv)
+
+    a = SupabaseClient.from_profile(args.a)
+    b = SupabaseClient.from_profile(args.b)
+    try:
+        status = check(a, b, args.columns.split(",") if args.columns else None, args.rows, args.limit)
+    except SupabaseError as e:
+        print(f"Error: {e}")
+        return 2
+    print(f"\nTransferred {(a.bytes_received + b.bytes_received) / 1024:.1f} KB")
+    return status
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,251 @@
+import os
+import re
+import sys
+import mmap
+import time
+import argparse
+import subprocess
+from codecs import BOM_UTF16_BE, BOM_UTF16_LE
+from pathlib import Path
+
+import numpy as np
+
+from lib import ROOT
+
+# Finds and repairs the encoding accidents PowerShell and editors have left in the tree,
+# across every text file under src/ and scripts/ in one run:
+#
+#   bom              UTF-8 with a byte order mark
+#   utf16le/utf16be  UTF-16, with or without BOM (PowerShell `>` / Set-Content)
+#   nul              stray NUL bytes in otherwise UTF-8 text
+#   mojibake-utf16   UTF-16LE bytes that were decoded as UTF-8 and saved again: ASCII
+#                    source turns into CJK ideographs ("import" -> "浩潰瑲")
+#   mojibake-cp1252  UTF-8 read as Windows-1252 and saved again (U+2019 -> "\u00e2\u20ac\u2122")
+#   cp1252           not valid UTF-8 at all, saved by a Windows-1252 editor
+#
+# Each file is memory-mapped and classified with numpy (NUL positions by parity, high
+# bytes); only files with non-ASCII bytes are decoded. Repairs are whole-buffer codec
+# round trips, e.g. mojibake-utf16 is text.encode("utf-16-le").decode("utf-8").
+#
+# Usage:
+#   python scripts/encoding_guard.py                  report, exit 1 if anything is wrong
+#   python scripts/encoding_guard.py --fix            repair in place
+#   python scripts/encoding_guard.py --staged         only files staged in git (pre-commit)
+#   python scripts/encoding_guard.py scripts/index_temp.tsx --fix
+#
+# As a git hook, .git/hooks/pre-commit:
+#   #!/bin/sh
+#   exec python scripts/encoding_guard.py --staged
+
+DEFAULT_ROOTS = ("src", "scripts")
+TEXT_EXTENSIONS = (".ts", ".tsx", ".js", ".jsx", ".mjs", ".cjs", ".py", ".css", ".html", ".json",
+                   ".md", ".sql", ".txt", ".ps1", ".backup")
+SKIP_DIRS = {"node_modules", "dist", "build", ".git", ".cache", "__pycache__"}
+# Fix scripts whose search strings are mojibake on purpose
+MOJIBAKE_ON_PURPOSE = {"scripts/update_index_text.py", "scripts/fix_index_visuals.py",
+                       "scripts/fix_index_visuals_strict.py"}
+
+# Characters Windows-1252 maps bytes 0x80-0x9F to, plus Latin-1 0xA0-0xFF: a UTF-8
+# lead byte read as cp1252 (Ã, Â, â, ...) followed by continuation-byte characters
+CP1252_HIGH = ("\u0080-\u00ff\u0152\u0153\u0160\u0161\u0178\u017d\u017e\u0192\u02c6\u02dc"
+               "\u2013\u2014\u2018-\u201a\u201c-\u201e\u2020-\u2022\u2026\u2030\u2039\u203a\u20ac\u2122")
+CP1252_MOJIBAKE = re.compile(f"[\u00c2-\u00f4][{CP1252_HIGH}]+")
+
+MAX_PASSES = 3
+BOM = "\ufeff"
+
+
+def classify(data):
+    """(kind, detail) for a bytes-like object; kind "ok" when it is clean UTF-8."""
+    n = len(data)
+    if n == 0:
+        return "ok", ""
+    head = bytes(data[:3])
+    if head.startswith(BOM_UTF16_LE):
+        return "utf16le", "BOM"
+    if head.startswith(BOM_UTF16_BE):
+        return "utf16be", "BOM"
+
+    arr = np.frombuffer(data, dtype=np.uint8)
+    nuls = int(np.count_nonzero(arr == 0))
+    if nuls:
+        even = int(np.count_nonzero(arr[0::2] == 0))
+        odd = nuls - even
+        pairs = n // 2 or 1
+        # ASCII text as UTF-16 has a NUL in every other byte
+        if odd > 0.3 * pairs and even < 0.05 * odd:
+            return "utf16le", f"{odd} NULs at odd offsets"
+        if even > 0.3 * pairs and odd < 0.05 * even:
+            return "utf16be", f"{even} NULs at even offsets"
+        return "nul", f"{nuls} NUL bytes"
+
+    if not np.count_nonzero(arr >= 0x80):
+        return "ok", ""
+    try:
+        text = bytes(data).decode("utf-8")
+    except UnicodeDecodeError as e:
+        return "cp1252", f"invalid UTF-8 at byte {e.start}"
+
+    body = text[1:] if text.startswith(BOM) else text
+    if body:
+        codepoints = np.frombuffer(body.encode("utf-32-le"), dtype=np.uint32)
+        cjk = int(np.count_nonzero((codepoints >= 0x3400) & (codepoints <= 0x9FFF)))
+        if cjk > 0.3 * len(codepoints):
+            return "mojibake-utf16", f"{cjk} of {len(codepoints)} characters are CJK"
+    runs = len(CP1252_MOJIBAKE.findall(body))
+    if runs and _fix_cp1252_runs(body) != body:
+        return "mojibake-cp1252", f"{runs} sequences like {CP1252_MOJIBAKE.search(body).group()!r}"
+    if text.startswith(BOM):
+        return "bom", "UTF-8 BOM"
+    return "ok", ""
+
+
+def _fix_cp1252_runs(text):
+    def fix(match):
+        run = match.group()
+        try:
+            return run.encode("cp1252").decode("utf-8")
+        except UnicodeError:
+            return run
+    return CP1252_MOJIBAKE.sub(fix, text)
+
+
+def repair_once(kind, data):
+    """Bytes with one layer of damage undone."""
+    data = bytes(data)
+    if kind == "utf16le":
+        text = data.decode("utf-16" if data.startswith(BOM_UTF16_LE) else "utf-16-le")
+    elif kind == "utf16be":
+        text = data.decode("utf-16" if data.startswith(BOM_UTF16_BE) else "utf-16-be")
+    elif kind == "nul":
+        return data.replace(b"\x00", b"")
+    elif kind == "cp1252":
+        text = data.decode("cp1252")
+    else:
+        text = data.decode("utf-8")
+        if text.startswith(BOM):
+            text = text[1:]
+        if kind == "mojibake-utf16":
+            # Each character holds two bytes of the original file, low byte first
+            text = text.encode("utf-16-le").rstrip(b"\x00").decode("utf-8")
+        elif kind == "mojibake-cp1252":
+            text = _fix_cp1252_runs(text)
+    if text.startswith(BOM):
+        text = text[1:]
+    return text.replace("\x00", "").encode("utf-8")
+
+
+def repair(data):
+    """(repaired bytes, [kinds undone]); raises UnicodeError when a layer can't be undone."""
+    steps = []
+    for _ in range(MAX_PASSES):
+        kind, _ = classify(data)
+        if kind == "ok":
+            return bytes(data), steps
+        data = repair_once(kind, data)
+        steps.append(kind)
+    kind, detail = classify(data)
+    if kind != "ok":
+        raise UnicodeError(f"still {kind} ({detail}) after {MAX_PASSES} passes")
+    return data, steps
+
+
+def check_file(path):
+    """(kind, detail) for the file at `path`, reading through a memory map."""
+    with open(path, "rb") as f:
+        if os.fstat(f.fileno()).st_size == 0:
+            return "ok", ""
+        with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mapped:
+            result = classify(mapped)
+            # numpy views must be gone before the map closes
+            return result
+
+
+def write_atomic(path, data):
+    tmp = f"{path}.encoding.tmp"
+    with open(tmp, "wb") as f:
+        f.write(data)
+    os.chmod(tmp, os.stat(path).st_mode & 0o7777)
+    os.replace(tmp, path)
+
+
+def find_files(paths):
+    for path in paths:
+        path = str(path)
+        if os.path.isfile(path):
+            yield path
+            continue
+        for dirpath, dirnames, filenames in os.walk(path):
+            dirnames[:] = [d for d in dirnames if d not in SKIP_DIRS]
+            for filename in filenames:
+                if filename.endswith(TEXT_EXTENSIONS):
+                    yield os.path.join(dirpath, filename)
+
+
+def _relative(path):
+    path = Path(path).resolve()
+    return path.relative_to(ROOT).as_posix() if path.is_relative_to(ROOT) else str(path)
+
+
+def staged_files():
+    out = subprocess.run(["git", "diff", "--cached", "--name-only", "--diff-filter=ACMR", "-z"],
+                         cwd=ROOT, capture_output=True, check=True).stdout
+    names = [n for n in out.decode("utf-8").split("\0") if n]
+    return [str(ROOT / n) for n in names if n.endswith(TEXT_EXTENSIONS)]
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Detect and repair BOM / UTF-16 / NUL / mojibake damage")
+    parser.add_argument("paths", nargs="*", help="Files or directories (default: src/ and scripts/)")
+    parser.add_argument("--staged", action="store_true", help="Only check files staged in git")
+    parser.add_argument("--fix", action="store_true", help="Repair damaged files in place")
+    parser.add_argument("--allow-bom", action="store_true", help="Don't report UTF-8 BOMs")
+    args = parser.parse_args(argv)
+
+    if args.staged:
+        files = staged_files()
+    else:
+        files = list(find_files(args.paths or [ROOT / d for d in DEFAULT_ROOTS]))
+
+    started = time.perf_counter()
+    problems = []
+    for path in files:
+        try:
+            kind, detail = check_file(path)
+        except OSError as e:
+            print(f"  unreadable   {_relative(path)}: {e}")
+            continue
+        if kind == "ok" or (kind == "bom" and args.allow_bom):
+            continue
+        if kind == "mojibake-cp1252" and _relative(path) in MOJIBAKE_ON_PURPOSE:
+            continue
+        problems.append((path, kind, detail))
+    elapsed = time.perf_counter() - started
+
+    for path, kind, detail in problems:
+        print(f"  {kind:<16} {_relative(path)}  ({detail})")
+    print(f"Checked {len(files)} files in {elapsed * 1000:.0f} ms: {len(problems)} with encoding problems")
+
+    if not problems:
+        return 0
+    if not args.fix:
+        print("Run with --fix to repair them.")
+        return 1
+
+    failed = 0
+    for path, kind, _ in problems:
+        with open(path, "rb") as f:
+            data = f.read()
+        try:
+            fixed, steps = repair(data)
+        except UnicodeError as e:
+            print(f"  could not repair {_relative(path)}: {e}")
+            failed += 1
+            continue
+        write_atomic(path, fixed)
+        print(f"  repaired {_relative(path)}: {' -> '.join(steps)}, {len(data)} -> {len(fixed)} bytes")
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,83 @@
+import sys
+import json
+import time
+import pathlib
+import argparse
+
+from lib.knowledge import INDEX_PATH, build_index
+from lib.qacorpus import CORPUS_PATH, INTENTS_PATH, PDF_PATH, build_intents, export_pdf, load_corpus, write_json
+
+# Renders the trades Q&A corpus (scripts/data/qa_corpus.json, the only copy of the
+# Q&A, safety tips and chatbot keywords) into every format that uses it:
+#
+#   pdf      the master Q&A PDF. Chapters are laid out into fragments cached under
+#            .cache/qa_export/ by content hash; only edited chapters are laid out
+#            again, and an unchanged PDF is not rewritten. Needs fpdf2.
+#   json     the chatbot's knowledge index, src/config/knowledge-index.json
+#   intents  the voice agent's Q&A intents, src/voice-agent/qa-intents.json
+#
+# The JSON exports are committed with the site; --check fails while they are stale.
+#
+# Usage:
+#   python scripts/export_qa.py
+#   python scripts/export_qa.py --format pdf --pdf-out ~/Desktop/UK_Trades_QA_Master_List.pdf
+#   python scripts/export_qa.py --format pdf --force
+#   python scripts/export_qa.py --check
+
+FORMATS = ("pdf", "json", "intents")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Export the trades Q&A corpus to PDF, chatbot JSON and voice intents")
+    parser.add_argument("--format", action="append", choices=FORMATS, help="Only these exports (repeatable)")
+    parser.add_argument("--pdf-out", default=str(PDF_PATH), help="Where to write the PDF")
+    parser.add_argument("--force", action="store_true", help="Lay out every PDF chapter again")
+    parser.add_argument("--check", action="store_true", help="Exit 1 if the committed JSON exports are out of date")
+    args = parser.parse_args(argv)
+
+    try:
+        corpus = load_corpus()
+    except (OSError, ValueError) as e:
+        print(f"Error loading {CORPUS_PATH}: {e}")
+        return 1
+    exports = {"json": (build_index(corpus), INDEX_PATH, None),
+               "intents": (build_intents(corpus), INTENTS_PATH, 4)}
+
+    if args.check:
+        stale = []
+        for data, path, _ in exports.values():
+            try:
+                with open(path, "r", encoding="utf-8") as f:
+                    current = json.load(f)
+            except (OSError, ValueError):
+                current = None
+            if current != data:
+                stale.append(path)
+        for path in stale:
+            print(f"{path} is out of date; run scripts/export_qa.py")
+        if not stale:
+            print(f"Exports of {CORPUS_PATH} are up to date")
+        return 1 if stale else 0
+
+    formats = args.format or FORMATS
+    for name in ("json", "intents"):
+        if name in formats:
+            data, path, indent = exports[name]
+            print(f"{'Wrote' if write_json(data, path, indent) else 'Unchanged'} {path}")
+
+    if "pdf" in formats:
+        output = pathlib.Path(args.pdf_out).expanduser()
+        started = time.perf_counter()
+        try:
+            stats = export_pdf(corpus, output, force=args.force)
+        except ImportError:
+            print("The PDF export needs fpdf2: pip install fpdf2")
+            return 1
+        print(f"{'Wrote' if stats['written'] else 'Unchanged'} {output}: {stats['pages']} pages, "
+              f"{stats['laid_out']} of {stats['chapters']} chapters laid out "
+              f"({time.perf_counter() - started:.2f}s)")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
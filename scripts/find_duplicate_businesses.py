@@ -0,0 +1,114 @@
+import sys
+import json
+import time
+import random
+import argparse
+
+from lib import PROFILES, SupabaseClient, SupabaseError
+from lib.dedup import DEFAULT_THRESHOLD, find_duplicate_pairs, merge_plan
+from lib.listings import load_listings
+
+# Finds duplicate businesses and writes a merge plan, without comparing every pair.
+#
+# Rows are blocked by trade + city + phone prefix and by trade + city + first name
+# word, and names are only fuzzy-matched within a block, so rows on different listing
+# pages (cities or trades) are never compared. Phones are normalised from any UK
+# format, names without "Ltd", "24/7", the city, etc. See lib/dedup.py for the scoring.
+#
+# Nothing is deleted: the plan lists, per cluster, the row to keep (claimed, premium,
+# most complete), the rows to remove and the fields to copy onto the kept row.
+#
+# Usage:
+#   python scripts/find_duplicate_businesses.py                  (static src/lib/businesses.ts)
+#   python scripts/find_duplicate_businesses.py --source prod --out dup_plan.json
+#   python scripts/find_duplicate_businesses.py --bench 100000
+
+
+def load_rows(source):
+    if source == "listings":
+        return [dict(business, city=city, trade=trade) for city, trade, business in load_listings().records]
+    client = SupabaseClient.from_profile(source)
+    return list(client.paginate("businesses"))
+
+
+def synthetic_rows(n, dup_rate=0.05, seed=7):
+    """n businesses over 80 cities x 7 trades, with dup_rate of them re-listed with small edits."""
+    rng = random.Random(seed)
+    words = ["acme", "apex", "city", "direct", "elite", "express", "first", "metro", "prime", "rapid", "swift",
+             "total", "united", "valley", "north", "south", "west", "east", "royal", "star", "fox", "oak"]
+    trades = ["plumber", "electrician", "locksmith", "glazier", "gas-engineer", "drain-specialist", "breakdown"]
+    cities = [f"city{i}" for i in range(80)]
+    rows = []
+    for i in range(n):
+        name = f"{rng.choice(words).title()} {rng.choice(words).title()} {rng.randint(1, 999)} {rng.choice(trades).title()}s"
+        rows.append({"id": f"b{i}", "name": name, "trade": rng.choice(trades), "city": rng.choice(cities),
+                     "phone": f"01{rng.randint(100, 999)} {rng.randint(100000, 999999)}"})
+    for i in range(int(n * dup_rate)):
+        src = rows[rng.randrange(n)]
+        phone = src["phone"]
+        variants = [f"+44 {phone[1:]}", phone.replace(" ", ""), f"0044 ({phone[:5]}) {phone[6:]}", phone]
+        rows.append(dict(src, id=f"d{i}", name=src["name"].replace("s", "", 1) + rng.choice(["", " Ltd", " & Co"]),
+                         phone=rng.choice(variants), dup_of=src["id"]))
+    return rows
+
+
+def bench(n, threshold):
+    rows = synthetic_rows(n)
+    print(f"Benchmarking {len(rows)} synthetic rows ({sum('dup_of' in r for r in rows)} planted duplicates)")
+    pairs, stats = find_duplicate_pairs(rows, threshold)
+    started = time.perf_counter()
+    plan = merge_plan(rows, pairs)
+    planned = time.perf_counter() - started
+    print_stats(stats)
+    removed = {rid for entry in plan for rid in entry["remove"]} | {entry["keep"] for entry in plan}
+    found = sum(1 for r in rows if "dup_of" in r and r["id"] in removed and r["dup_of"] in removed)
+    print(f"Recall on planted duplicates: {found / max(1, sum('dup_of' in r for r in rows)):.1%}, "
+          f"merge plan in {planned:.2f}s")
+
+
+def print_stats(stats):
+    print(f"{stats['rows']} rows, {stats['blocks']} blocks, {stats['compared']} pairs compared "
+          f"(of {stats['all_pairs']} possible), {stats['matches']} matches in {stats['seconds']:.2f}s")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Blocked duplicate detection for businesses, with a merge plan")
+    parser.add_argument("--source", default="listings", choices=["listings"] + sorted(PROFILES),
+                        help="Static businesses.ts listings, or a project's businesses table")
+    parser.add_argument("--threshold", type=float, default=DEFAULT_THRESHOLD, help="Minimum pair score (0-1)")
+    parser.add_argument("--out", help="Write the merge plan as JSON to this file")
+    parser.add_argument("--show", type=int, default=20, help="Clusters to print")
+    parser.add_argument("--bench", type=int, metavar="N", help="Time N synthetic rows instead")
+    args = parser.parse_args(argv)
+
+    if args.bench:
+        bench(args.bench, args.threshold)
+        return 0
+
+    try:
+        rows = load_rows(args.source)
+    except SupabaseError as e:
+        print(f"Error: {e}")
+        return 1
+    pairs, stats = find_duplicate_pairs(rows, args.threshold)
+    plan = merge_plan(rows, pairs)
+    print_stats(stats)
+    print(f"{len(plan)} clusters, {sum(len(e['remove']) for e in plan)} rows to remove\n")
+
+    for entry in plan[:args.show]:
+        print(f"  keep {entry['keep']} ({entry['trade']}/{entry['city']}, score {entry['score']}, "
+              f"{'+'.join(entry['reasons']) or 'name'})")
+        for rid, name in zip(entry["remove"], entry["names"][1:]):
+            print(f"    - {rid}: {name}")
+        if entry["fill"]:
+            print(f"    fill: {', '.join(entry['fill'])}")
+
+    if args.out:
+        with open(args.out, "w", encoding="utf-8") as f:
+            json.dump(plan, f, indent=2, ensure_ascii=False, default=str)
+        print(f"\nMerge plan written to {args.out}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
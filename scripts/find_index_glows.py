@@ -1,17 +1,13 @@
+from lib.codesearch import load_index
 
-import os
-import re
-
-path = "../src/pages/Index.tsx"
-if os.path.exists(path):
+path = "src/pages/Index.tsx"
+index = load_index()
+if path in index.files:
     print(f"\n--- {path} ---")
-    with open(path, "r", encoding="utf-8") as f:
-        lines = f.readlines()
-    
     patterns = [r'bg-gold', r'glow', r'blob', r'conic-gradient', r'blur']
-    for i, line in enumerate(lines):
-        for pattern in patterns:
-            if re.search(pattern, line):
-                print(f"[{i+1}] {line.strip()}")
+    for hit in index.search(patterns, paths={path}):
+        # Once per matching pattern, like the old per-pattern line scan
+        for _ in hit.patterns:
+            print(f"[{hit.line}] {hit.text.strip()}")
 else:
     print(f"File not found: {path}")
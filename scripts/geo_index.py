@@ -0,0 +1,167 @@
+import sys
+import json
+import time
+import pathlib
+import argparse
+import datetime
+
+import numpy as np
+
+from lib import PROFILES, ROOT, SupabaseClient, SupabaseError
+from lib.geo import GeoIndex, cell_table, geohash, haversine, load_city_coordinates
+from lib.snapshot import load_snapshot
+
+# Nearest-city and nearest-business lookups, and precomputed cell tables for clients
+# that can't hold a KD-tree.
+#
+# Cities come from src/lib/cityCoordinates.ts, businesses from the latitude/longitude
+# columns of verified Supabase businesses (live, or a snapshot_businesses.py snapshot).
+#
+#   nearest   k nearest cities (or --businesses) to a point, through the KD-tree
+#   export    write public/geo-index.v<N>.json: for every geohash cell over the UK,
+#             the cities/businesses that can be among the k nearest of any point in
+#             it. A client geohashes a position, reads one cell and measures only
+#             those candidates (see cell_table() in lib/geo.py). Nothing in
+#             src/ reads it yet.
+#   check     compare the tree and the exported table with a brute force scan
+#
+# Usage:
+#   python scripts/geo_index.py nearest 53.48 -2.24 --k 3
+#   python scripts/geo_index.py nearest 51.51 -0.13 --businesses --supabase snapshot
+#   python scripts/geo_index.py export --profile prod --k 10
+#   python scripts/geo_index.py check --samples 2000
+
+FORMAT_VERSION = 1
+ASSET_PATH = ROOT / "public" / f"geo-index.v{FORMAT_VERSION}.json"
+BUSINESS_COLUMNS = "id,name,trade,city,latitude,longitude,verified"
+
+
+def business_rows(args):
+    """Verified businesses with coordinates."""
+    if args.supabase == "none":
+        return []
+    if args.supabase == "snapshot":
+        query = load_snapshot(args.profile).query().where("verified", "is.true")
+        rows = query.where("latitude", "not.is.null").where("longitude", "not.is.null").rows(BUSINESS_COLUMNS.split(","))
+    else:
+        client = SupabaseClient.from_profile(args.profile)
+        rows = client.paginate("businesses", select=BUSINESS_COLUMNS, filters={
+            "verified": "eq.true", "latitude": "not.is.null", "longitude": "not.is.null"})
+    # DECIMAL columns arrive as numbers or strings depending on the client
+    return [dict(row, latitude=float(row["latitude"]), longitude=float(row["longitude"])) for row in rows]
+
+
+def city_index():
+    return GeoIndex.from_mapping(load_city_coordinates())
+
+
+def business_index(rows):
+    return GeoIndex([row["id"] for row in rows], [row["latitude"] for row in rows], [row["longitude"] for row in rows])
+
+
+def layer(index, k, precision, **columns):
+    return dict(keys=index.keys, lat=[round(v, 5) for v in index.lats.tolist()],
+                lng=[round(v, 5) for v in index.lngs.tolist()], **columns,
+                cells=cell_table(index, k, precision))
+
+
+def export(args):
+    started = time.perf_counter()
+    rows = business_rows(args)
+    cities, businesses = city_index(), business_index(rows)
+    asset = {
+        "version": FORMAT_VERSION,
+        "built_at": datetime.datetime.now(datetime.timezone.utc).isoformat(timespec="seconds"),
+        "precision": args.precision,
+        "k": args.k,
+        "cities": layer(cities, args.k, args.precision),
+        "businesses": layer(businesses, args.k, args.precision,
+                            trade=[row.get("trade") for row in rows], city=[row.get("city") for row in rows]),
+    }
+    out = pathlib.Path(args.out)
+    out.parent.mkdir(parents=True, exist_ok=True)
+    tmp = out.with_suffix(".tmp")
+    with open(tmp, "w", encoding="utf-8") as f:
+        json.dump(asset, f, separators=(",", ":"))
+    tmp.replace(out)
+    for name in ("cities", "businesses"):
+        cells = asset[name]["cells"]
+        average = sum(map(len, cells.values())) / len(cells) if cells else 0
+        print(f"  {name}: {len(asset[name]['keys'])} points, {len(cells)} cells, {average:.1f} candidates per cell")
+    print(f"Wrote {out} ({out.stat().st_size / 1024:.0f} KB) in {time.perf_counter() - started:.1f}s")
+    return 0
+
+
+def check(args):
+    rng = np.random.default_rng(0)
+    rows = business_rows(args)
+    failures = 0
+    for name, index in (("cities", city_index()), ("businesses", business_index(rows))):
+        if not len(index):
+            continue
+        k = min(args.k, len(index))
+        lats, lngs = rng.uniform(50.0, 58.5, args.samples), rng.uniform(-6.0, 1.7, args.samples)
+        full = haversine(lats[:, None], lngs[:, None], index.lats[None, :], index.lngs[None, :])
+        expected = np.sort(full, axis=1)[:, :k]
+        _, tree_km = index.nearest_many(lats, lngs, k)
+        table = cell_table(index, k, args.precision)
+        table_km = np.array([np.sort(full[i, table[geohash(lats[i], lngs[i], args.precision)]])[:k]
+                             for i in range(args.samples)])
+        # Compare distances, so ties between equidistant points don't count
+        tree_bad = int((~np.isclose(tree_km, expected)).any(axis=1).sum())
+        table_bad = int((~np.isclose(table_km, expected)).any(axis=1).sum())
+        print(f"  {name}: {args.samples} points, tree {tree_bad} wrong, cell table {table_bad} wrong")
+        failures += tree_bad + table_bad
+    return 1 if failures else 0
+
+
+def main(argv=None):
+    common = argparse.ArgumentParser(add_help=False)
+    common.add_argument("--supabase", default="live", choices=("live", "snapshot", "none"),
+                        help="Where business coordinates come from")
+    common.add_argument("--profile", default="prod", choices=sorted(PROFILES))
+    common.add_argument("--k", type=int, default=5, help="Nearest points to return or precompute")
+    common.add_argument("--precision", type=int, default=4, help="Geohash length of the table cells")
+
+    parser = argparse.ArgumentParser(description="Nearest city/business index and lookup tables")
+    sub = parser.add_subparsers(dest="command", required=True)
+    p = sub.add_parser("nearest", parents=[common], help="Nearest cities or businesses to a point")
+    p.add_argument("lat", type=float)
+    p.add_argument("lng", type=float)
+    p.add_argument("--businesses", action="store_true")
+    p.add_argument("--max-km", type=float)
+    p = sub.add_parser("export", parents=[common], help="Write the precomputed lookup table")
+    p.add_argument("--out", default=str(ASSET_PATH))
+    p = sub.add_parser("check", parents=[common], help="Compare tree and table with brute force")
+    p.add_argument("--samples", type=int, default=1000)
+    args = parser.parse_args(argv)
+
+    try:
+        if args.command == "export":
+            return export(args)
+        if args.command == "check":
+            return check(args)
+        if args.businesses:
+            rows = business_rows(args)
+            names = {row["id"]: f"{row['name']} ({row['trade']}, {row['city']})" for row in rows}
+            index = business_index(rows)
+        else:
+            names, index = {}, city_index()
+    except (FileNotFoundError, KeyError) as e:
+        print(f"Error: {e.args[0] if isinstance(e, KeyError) else e}")
+        return 1
+    except SupabaseError as e:
+        print(f"Error fetching businesses: {e}")
+        return 1
+
+    started = time.perf_counter()
+    hits = index.nearest(args.lat, args.lng, args.k, args.max_km)
+    elapsed = time.perf_counter() - started
+    for key, km in hits:
+        print(f"  {km:>7.1f} km  {names.get(key, key)}")
+    print(f"{len(hits)} of {len(index)} points ({elapsed * 1000:.2f} ms)")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,176 @@
+import io
+import csv
+import sys
+import time
+import zipfile
+import pathlib
+import argparse
+from collections import Counter
+
+from lib import PROFILES, SupabaseClient, SupabaseError
+from lib.geocode import DB_PATH, PRECISIONS, Geocoder
+
+# Offline geocoding of business addresses, with write-back of latitude/longitude.
+#
+# Needs a local postcode centroid dataset, imported once into .cache/geocode.sqlite:
+# the ONS Postcode Directory (the ONSPD zip or its CSV: pcds, lat, long columns) or
+# any CSV with postcode and latitude/longitude columns. No network is used to
+# geocode. Results are cached per normalised address, so later runs only resolve
+# new or changed addresses.
+#
+#   import   load a postcode dataset (replaces the previous one, clears cached results)
+#   lookup   geocode one address (and optionally its separate postcode)
+#   run      geocode the project's businesses (postcode column first, then the
+#            address) and write latitude, longitude and geocode_precision back
+#            through apply_business_coordinates() (migration 025) in batches.
+#            Hand-set coordinates are left alone.
+#   stats    dataset and cache sizes
+#
+# Usage:
+#   python scripts/geocode_businesses.py import ~/Downloads/ONSPD_FEB_2025_UK.zip
+#   python scripts/geocode_businesses.py lookup "12 High St, Luton LU1 3AB"
+#   python scripts/geocode_businesses.py lookup "12 High St, Luton" --postcode "LU1 3AB"
+#   python scripts/geocode_businesses.py run --profile prod --dry-run
+#   python scripts/geocode_businesses.py run --profile prod --min-precision district
+
+POSTCODE_COLUMNS = ("pcds", "postcode", "pcd", "pcd2")
+LAT_COLUMNS = ("lat", "latitude")
+LNG_COLUMNS = ("long", "lng", "longitude", "lon")
+
+
+def _column(header, names, path):
+    for name in names:
+        if name in header:
+            return header.index(name)
+    raise ValueError(f"{path}: no {names[0]} column (looked for {', '.join(names)})")
+
+
+def _csv_rows(f, path):
+    reader = csv.reader(f)
+    header = [h.strip().lower() for h in next(reader)]
+    pc, lat, lng = (_column(header, names, path) for names in (POSTCODE_COLUMNS, LAT_COLUMNS, LNG_COLUMNS))
+    # ONSPD keeps terminated postcodes, with their termination date
+    terminated = header.index("doterm") if "doterm" in header else None
+    for row in reader:
+        if terminated is not None and row[terminated].strip():
+            continue
+        try:
+            yield row[pc], float(row[lat]), float(row[lng])
+        except (ValueError, IndexError):
+            continue
+
+
+def dataset_rows(path):
+    """(postcode, lat, lng) from a CSV, or every CSV of the main data in a zip (ONSPD)."""
+    if path.lower().endswith(".zip"):
+        with zipfile.ZipFile(path) as archive:
+            names = [n for n in archive.namelist() if n.lower().endswith(".csv")]
+            # ONSPD ships the full file under Data/ and per-area splits under Data/multi_csv
+            main = [n for n in names if "/data/" in f"/{n.lower()}" and "multi_csv" not in n.lower()] or names
+            for name in main:
+                with archive.open(name) as raw:
+                    yield from _csv_rows(io.TextIOWrapper(raw, encoding="utf-8-sig", newline=""), f"{path}:{name}")
+        return
+    with open(path, "r", encoding="utf-8-sig", newline="") as f:
+        yield from _csv_rows(f, path)
+
+
+def _coordinate(value):
+    # DECIMAL columns arrive as numbers or strings depending on the client
+    return None if value is None else round(float(value), 6)
+
+
+def run(args, geocoder):
+    client = SupabaseClient.from_profile(args.profile)
+    print(f"--- Geocoding businesses on {client.url} ---")
+    started = time.perf_counter()
+    try:
+        rows = list(client.paginate("businesses", select="id,address,city,postcode,latitude,longitude,geocode_precision"))
+    except SupabaseError as e:
+        print(f"Error fetching businesses: {e}")
+        return 1
+    # Coordinates without a precision were set by hand
+    rows = [r for r in rows if r.get("geocode_precision") or r.get("latitude") is None or r.get("longitude") is None]
+
+    results = geocoder.geocode_many([(row.get("address"), row.get("city"), row.get("postcode")) for row in rows])
+    allowed = PRECISIONS[:PRECISIONS.index(args.min_precision) + 1]
+    counts, updates = Counter(), []
+    for row, result in zip(rows, results):
+        counts[result.precision if result else "unresolved"] += 1
+        if result is None or result.precision not in allowed:
+            continue
+        lat, lng = round(result.lat, 6), round(result.lng, 6)
+        current = (_coordinate(row.get("latitude")), _coordinate(row.get("longitude")), row.get("geocode_precision"))
+        if current != (lat, lng, result.precision):
+            updates.append({"id": row["id"], "latitude": lat, "longitude": lng, "geocode_precision": result.precision})
+
+    print(f"{len(rows)} businesses to geocode in {time.perf_counter() - started:.1f}s: "
+          + ", ".join(f"{counts[p]} {p}" for p in (*PRECISIONS, "unresolved") if counts[p]))
+    if args.dry_run:
+        print(f"Would update coordinates on {len(updates)} businesses.")
+        return 0
+
+    written = 0
+    try:
+        for start in range(0, len(updates), args.chunk_size):
+            written += client.rpc("apply_business_coordinates", {"updates": updates[start:start + args.chunk_size]}) or 0
+    except SupabaseError as e:
+        print(f"Error writing coordinates (is migration 025 applied?): {e}")
+        return 1
+    print(f"Updated coordinates on {written} businesses in "
+          f"{(len(updates) + args.chunk_size - 1) // args.chunk_size} calls")
+    return 0
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Offline geocoding of business addresses")
+    parser.add_argument("--db", default=str(DB_PATH), help="SQLite file for the dataset and cache")
+    sub = parser.add_subparsers(dest="command", required=True)
+    p = sub.add_parser("import", help="Load a postcode centroid dataset")
+    p.add_argument("path", help="ONSPD .zip, or a CSV with postcode and latitude/longitude columns")
+    p = sub.add_parser("lookup", help="Geocode one address")
+    p.add_argument("address")
+    p.add_argument("--city")
+    p.add_argument("--postcode", help="The business's postcode column, tried before the address")
+    p = sub.add_parser("run", help="Geocode businesses and write coordinates back")
+    p.add_argument("--profile", default="dev", choices=sorted(PROFILES))
+    p.add_argument("--min-precision", default="city", choices=PRECISIONS,
+                   help="Least exact result worth writing back")
+    p.add_argument("--chunk-size", type=int, default=500, help="Businesses per write-back call")
+    p.add_argument("--dry-run", action="store_true")
+    sub.add_parser("stats", help="Dataset and cache sizes")
+    args = parser.parse_args(argv)
+
+    with Geocoder(pathlib.Path(args.db)) as geocoder:
+        if args.command == "import":
+            started = time.perf_counter()
+            try:
+                geocoder.import_postcodes(dataset_rows(args.path))
+            except (OSError, ValueError, zipfile.BadZipFile) as e:
+                print(f"Error reading {args.path}: {e}")
+                return 1
+            stats = geocoder.stats()
+            print(f"Imported {stats['postcodes']} postcodes in {stats['districts']} districts "
+                  f"in {time.perf_counter() - started:.1f}s")
+            return 0
+        if args.command == "lookup":
+            result = geocoder.geocode(args.address, args.city, args.postcode)
+            if result is None:
+                print("No match")
+                return 1
+            print(f"{result.lat:.6f}, {result.lng:.6f}  ({result.precision}"
+                  f"{', ' + result.postcode if result.postcode else ''})")
+            return 0
+        if args.command == "stats":
+            stats = geocoder.stats()
+            print(f"{stats['postcodes']} postcodes, {stats['districts']} districts, {stats['geocodes']} cached addresses")
+            for precision, n in stats["by precision"].items():
+                print(f"  {precision:<10} {n}")
+            if not stats["postcodes"]:
+                print("No postcode dataset imported; only city-level results are possible.")
+            return 0
+        return run(args, geocoder)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
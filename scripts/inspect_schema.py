@@ -0,0 +1,120 @@
+import sys
+import json
+import argparse
+
+from lib import PROFILES, SupabaseClient, SupabaseError
+from lib.schema import DEFAULT_MAX_AGE, diff_schemas, load_schema
+
+# Tables, columns and types of a project from its PostgREST OpenAPI document, and
+# dev-vs-prod schema differences.
+#
+# The document is cached in .cache/schema.json per project and re-validated with
+# If-None-Match once it is older than --max-age seconds, so repeat checks don't
+# download the spec. Unlike a select=*&limit=1 probe this also works on empty tables.
+#
+# Usage:
+#   python scripts/inspect_schema.py tables --profile prod
+#   python scripts/inspect_schema.py columns businesses --profile prod
+#   python scripts/inspect_schema.py check businesses tier priority_score is_available_now --profile prod
+#   python scripts/inspect_schema.py diff                       dev vs prod, every table
+#   python scripts/inspect_schema.py diff --table businesses --refresh
+
+
+def get_schema(profile, args):
+    client = SupabaseClient.from_profile(profile, service_role=not args.anon)
+    return load_schema(client, max_age=args.max_age, refresh=args.refresh)
+
+
+def describe(column):
+    flags = []
+    if column.primary_key:
+        flags.append("pk")
+    if column.foreign_key:
+        flags.append(f"-> {column.foreign_key}")
+    if column.required:
+        flags.append("not null")
+    if column.default is not None:
+        flags.append(f"default {column.default}")
+    return " ".join(flags)
+
+
+def main(argv=None):
+    common = argparse.ArgumentParser(add_help=False)
+    common.add_argument("--refresh", action="store_true", help="Re-validate the cached document now")
+    common.add_argument("--max-age", type=float, default=DEFAULT_MAX_AGE,
+                        help="Seconds the cached document is used without asking the server")
+    common.add_argument("--anon", action="store_true", help="Use the anon key (only what anon can see)")
+    project = argparse.ArgumentParser(add_help=False)
+    project.add_argument("--profile", default="dev", choices=sorted(PROFILES))
+
+    parser = argparse.ArgumentParser(description="Cached schema introspection via PostgREST's OpenAPI document")
+    sub = parser.add_subparsers(dest="command", required=True)
+    sub.add_parser("tables", parents=[common, project], help="Exposed tables and functions")
+    p = sub.add_parser("columns", parents=[common, project], help="Columns and types of a table")
+    p.add_argument("table")
+    p.add_argument("--json", action="store_true")
+    p = sub.add_parser("check", parents=[common, project], help="Exit 1 unless the table has every column")
+    p.add_argument("table")
+    p.add_argument("columns", nargs="+")
+    p = sub.add_parser("diff", parents=[common], help="Schema differences between two projects")
+    p.add_argument("--from", dest="source", default="dev", choices=sorted(PROFILES))
+    p.add_argument("--to", dest="target", default="prod", choices=sorted(PROFILES))
+    p.add_argument("--table", action="append", help="Only these tables (repeatable)")
+    args = parser.parse_args(argv)
+
+    try:
+        if args.command == "diff":
+            a, b = get_schema(args.source, args), get_schema(args.target, args)
+        else:
+            schema = get_schema(args.profile, args)
+    except SupabaseError as e:
+        print(f"Error fetching the OpenAPI document: {e}")
+        return 1
+
+    if args.command == "tables":
+        print(f"--- {len(schema.tables)} tables on {schema.url} ---")
+        for table, columns in sorted(schema.tables.items()):
+            print(f"  {table:<32} {len(columns):>3} columns")
+        if schema.functions:
+            print(f"\n{len(schema.functions)} functions: {', '.join(schema.functions)}")
+        return 0
+
+    if args.command == "columns":
+        try:
+            columns = schema.table(args.table)
+        except KeyError as e:
+            print(f"Error: {e.args[0]}")
+            return 1
+        if args.json:
+            print(json.dumps(schema.types(args.table), indent=2))
+            return 0
+        print(f"--- {args.table} on {schema.url} ---")
+        for column in columns.values():
+            print(f"  {column.name:<28} {column.type:<28} {describe(column)}")
+        return 0
+
+    if args.command == "check":
+        missing = schema.missing(args.table, args.columns)
+        print(f"--- {args.table} on {schema.url} ---")
+        for column in args.columns:
+            print(f"  {'MISSING' if column in missing else 'ok':<8} {column}")
+        return 1 if missing else 0
+
+    differences = diff_schemas(a, b, args.table)
+    print(f"--- {args.source} ({a.url}) vs {args.target} ({b.url}) ---")
+    labels = {"only in a": f"only in {args.source}", "only in b": f"only in {args.target}"}
+    for table, column, what, x, y in differences:
+        name = table if column is None else f"{table}.{column}"
+        if column is None:
+            detail = ""
+        elif what.startswith("only"):
+            detail = f"  ({x or y})"
+        else:
+            detail = f"  {x!r} -> {y!r}"
+        print(f"  {labels.get(what, what):<20} {name}{detail}")
+    print(f"{len(differences)} differences")
+    return 1 if differences else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
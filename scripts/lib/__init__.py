@@ -0,0 +1,35 @@
+"""Shared helpers for the admin scripts in scripts/.
+
+Scripts are run as ``python scripts/<name>.py`` (or from inside scripts/), so
+``scripts/`` is on sys.path and the package imports as ``lib``::
+
+    from lib import get_client
+
+    client = get_client("prod")
+    for row in client.paginate("businesses", select="id,name", filters={"trade": "eq.plumber"}):
+        ...
+
+The asyncio/httpx client (lib.async_client) and the businesses.ts listings
+parser (lib.listings) are imported explicitly.
+"""
+
+from .env import ROOT, load_env_file
+from .profiles import PROFILES, Profile, resolve_profile
+from .client import SupabaseClient, SupabaseError, get_client, in_filter, keyset_filter, quote_value
+from .fingerprint import canonical, row_hash
+
+__all__ = [
+    "ROOT",
+    "load_env_file",
+    "PROFILES",
+    "Profile",
+    "resolve_profile",
+    "SupabaseClient",
+    "SupabaseError",
+    "get_client",
+    "in_filter",
+    "keyset_filter",
+    "quote_value",
+    "canonical",
+    "row_hash",
+]
@@ -0,0 +1,92 @@
+"""Aho-Corasick automaton for replacing many literals in one scan.
+
+Matching cost is proportional to the text length however many literals there
+are, instead of one str.replace pass per literal. Replacement is leftmost
+first, longest at the same start, never overlapping, which is what a sequence
+of str.replace calls gives when no literal is a substring of another.
+"""
+
+import re
+
+
+class Automaton:
+    def __init__(self, patterns):
+        self.patterns = list(patterns)
+        if not all(self.patterns):
+            raise ValueError("empty search literal")
+        self.goto = [{}]
+        self.fail = [0]
+        # Per state: indexes of the patterns ending there (own and via fail links)
+        self.out = [[]]
+
+        for index, pattern in enumerate(self.patterns):
+            state = 0
+            for ch in pattern:
+                nxt = self.goto[state].get(ch)
+                if nxt is None:
+                    nxt = len(self.goto)
+                    self.goto.append({})
+                    self.fail.append(0)
+                    self.out.append([])
+                    self.goto[state][ch] = nxt
+                state = nxt
+            self.out[state].append(index)
+
+        # Breadth-first, so a state's fail target is finished before its children
+        queue = list(self.goto[0].values())
+        for state in queue:
+            for ch, nxt in self.goto[state].items():
+                queue.append(nxt)
+                f = self.fail[state]
+                while f and ch not in self.goto[f]:
+                    f = self.fail[f]
+                target = self.goto[f].get(ch, 0)
+                self.fail[nxt] = target if target != nxt else 0
+                self.out[nxt] = self.out[nxt] + self.out[self.fail[nxt]]
+
+        # From the root, jump straight to the next character that can start a match
+        starts = "".join(sorted(self.goto[0]))
+        self._skip = re.compile("[" + re.escape(starts) + "]") if starts else None
+
+    def finditer(self, text):
+        """Yields (start, end, pattern index) for every occurrence, overlapping ones included."""
+        if self._skip is None:
+            return
+        goto, fail, out, patterns = self.goto, self.fail, self.out, self.patterns
+        state, i, n = 0, 0, len(text)
+        while i < n:
+            if state == 0:
+                m = self._skip.search(text, i)
+                if m is None:
+                    return
+                i = m.start()
+            ch = text[i]
+            while state and ch not in goto[state]:
+                state = fail[state]
+            state = goto[state].get(ch, 0)
+            i += 1
+            for index in out[state]:
+                yield i - len(patterns[index]), i, index
+
+    def matches(self, text):
+        """Non-overlapping matches, leftmost first and longest at the same start."""
+        chosen, pos = [], 0
+        for start, end, index in sorted(self.finditer(text), key=lambda m: (m[0], m[0] - m[1])):
+            if start >= pos:
+                chosen.append((start, end, index))
+                pos = end
+        return chosen
+
+    def replace(self, text, replacements):
+        """(new text, {pattern: count}) with replacements[i] substituted for patterns[i]."""
+        out, counts, pos = [], {}, 0
+        for start, end, index in self.matches(text):
+            out.append(text[pos:start])
+            out.append(replacements[index])
+            pos = end
+            pattern = self.patterns[index]
+            counts[pattern] = counts.get(pattern, 0) + 1
+        if not counts:
+            return text, counts
+        out.append(text[pos:])
+        return "".join(out), counts
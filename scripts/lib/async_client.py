@@ -0,0 +1,132 @@
+"""asyncio/httpx counterpart of SupabaseClient for bulk jobs.
+
+Kept out of lib/__init__ so scripts that only need the blocking client don't need
+httpx installed::
+
+    from lib.async_client import AsyncSupabaseClient
+
+    async with AsyncSupabaseClient.from_profile("prod") as prod:
+        rows = await prod.fetch_all("businesses")
+"""
+
+import json
+import asyncio
+
+import httpx
+
+from .client import RETRY_STATUSES, _filter_params, in_filter, keyset_filter
+from .profiles import resolve_profile
+
+
+class AsyncSupabaseError(Exception):
+    def __init__(self, response):
+        self.status_code = response.status_code
+        self.text = response.text
+        super().__init__(f"{response.request.method} {response.url} -> {response.status_code} {response.text[:300]}")
+
+
+class AsyncSupabaseClient:
+    def __init__(self, url, key, concurrency=8, retries=5, backoff=0.5, timeout=60, name=None):
+        self.url = url.rstrip("/")
+        self.name = name or self.url
+        self.retries = retries
+        self.backoff = backoff
+        # Caps in-flight requests per project, whatever the caller gathers
+        self.semaphore = asyncio.Semaphore(concurrency)
+        self.http = httpx.AsyncClient(
+            base_url=self.url,
+            headers={"apikey": key, "Authorization": f"Bearer {key}", "Accept": "application/json"},
+            limits=httpx.Limits(max_connections=concurrency, max_keepalive_connections=concurrency),
+            timeout=timeout,
+        )
+
+    @classmethod
+    def from_profile(cls, name, service_role=True, **kwargs):
+        url, key = resolve_profile(name, service_role)
+        return cls(url, key, name=name, **kwargs)
+
+    async def aclose(self):
+        await self.http.aclose()
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc):
+        await self.aclose()
+
+    async def request(self, method, path, params=None, json=None, headers=None, ok=(200, 201, 204, 206)):
+        for attempt in range(self.retries + 1):
+            last = attempt == self.retries
+            try:
+                async with self.semaphore:
+                    resp = await self.http.request(method, path, params=params, json=json, headers=headers)
+            except (httpx.ConnectError, httpx.ReadError, httpx.RemoteProtocolError, httpx.TimeoutException):
+                if last:
+                    raise
+                await asyncio.sleep(self.backoff * 2 ** attempt)
+                continue
+
+            if resp.status_code in ok:
+                return resp
+            if resp.status_code in RETRY_STATUSES and not last:
+                retry_after = resp.headers.get("Retry-After")
+                delay = float(retry_after) if retry_after and retry_after.isdigit() else self.backoff * 2 ** attempt
+                await asyncio.sleep(delay)
+                continue
+            raise AsyncSupabaseError(resp)
+
+    async def pages(self, table, select="*", filters=None, keyset=("id",), page_size=1000):
+        keyset = tuple(keyset)
+        base = [("select", select), ("order", ",".join(f"{k}.asc" for k in keyset)),
+                ("limit", str(page_size))] + _filter_params(filters)
+        cursor = None
+        while True:
+            params = list(base)
+            flt = keyset_filter(keyset, cursor)
+            if flt:
+                params.append(flt)
+            data = (await self.request("GET", f"/rest/v1/{table}", params=params)).json()
+            if data:
+                yield data
+                cursor = [data[-1].get(k) for k in keyset]
+            if len(data) < page_size:
+                return
+
+    async def fetch_all(self, table, select="*", filters=None, keyset=("id",), page_size=1000):
+        rows = []
+        async for page in self.pages(table, select, filters, keyset, page_size):
+            rows.extend(page)
+        return rows
+
+    async def upsert(self, table, rows, on_conflict=None, chunk_size=500):
+        """Batched upsert (Prefer: resolution=merge-duplicates); chunks are sent concurrently."""
+        params = [("on_conflict", on_conflict)] if on_conflict else None
+        headers = {"Content-Type": "application/json",
+                   "Prefer": "resolution=merge-duplicates,return=minimal"}
+        chunks = [rows[i:i + chunk_size] for i in range(0, len(rows), chunk_size)]
+        await asyncio.gather(*(
+            self.request("POST", f"/rest/v1/{table}", params=params, json=chunk, headers=headers)
+            for chunk in chunks
+        ))
+        return len(rows)
+
+    async def update_many(self, table, rows, key="id", chunk_size=200):
+        """
+        PATCH each row's other columns onto the existing row with the same `key`.
+        Rows setting identical values share requests (key=in.(...), `chunk_size`
+        keys each), sent concurrently. Unlike an upsert, only the given columns are
+        written, so partial rows don't trip NOT NULL columns.
+        """
+        groups = {}
+        for row in rows:
+            values = {c: v for c, v in row.items() if c != key}
+            signature = json.dumps(values, sort_keys=True, default=str)
+            groups.setdefault(signature, (values, []))[1].append(row[key])
+        headers = {"Content-Type": "application/json", "Prefer": "return=minimal"}
+        await asyncio.gather(*(
+            self.request("PATCH", f"/rest/v1/{table}", params=[(key, in_filter(keys[i:i + chunk_size]))],
+                         json=values, headers=headers)
+            for values, keys in groups.values()
+            for i in range(0, len(keys), chunk_size)
+        ))
+        return len(rows)
@@ -0,0 +1,289 @@
+"""Pooled PostgREST client shared by the admin scripts.
+
+One requests.Session per client keeps TCP+TLS connections alive across calls, 429
+and 5xx responses are retried with exponential backoff (honouring Retry-After),
+and list reads page automatically with keyset pagination.
+"""
+
+import time
+
+import requests
+from requests.adapters import HTTPAdapter
+
+from .profiles import resolve_profile
+
+RETRY_STATUSES = (429, 500, 502, 503, 504)
+
+
+class SupabaseError(Exception):
+    def __init__(self, response):
+        self.status_code = response.status_code
+        self.text = response.text
+        super().__init__(f"{response.request.method} {response.url} -> {response.status_code} {response.text[:300]}")
+
+
+def quote_value(value):
+    # PostgREST needs values containing reserved characters (, . : ( ) quoted inside
+    # logic trees such as or=(...). Timestamps always contain ':' and '.'.
+    text = str(value)
+    if any(ch in text for ch in ',.:()"\\ '):
+        text = '"' + text.replace('\\', '\\\\').replace('"', '\\"') + '"'
+    return text
+
+
+def keyset_filter(keys, cursor):
+    """
+    Builds the PostgREST filter for "row key > cursor" on a composite key, e.g. for
+    (created_at, id): or=(created_at.gt.X,and(created_at.eq.X,id.gt.Y))
+    Returns a (param, value) pair, or None for the first page.
+    """
+    if cursor is None:
+        return None
+    if len(keys) == 1:
+        return keys[0], f"gt.{cursor[0]}"
+
+    branches = []
+    for i, key in enumerate(keys):
+        parts = [f"{keys[j]}.eq.{quote_value(cursor[j])}" for j in range(i)]
+        parts.append(f"{key}.gt.{quote_value(cursor[i])}")
+        branches.append(parts[0] if len(parts) == 1 else f"and({','.join(parts)})")
+    return "or", f"({','.join(branches)})"
+
+
+def in_filter(values):
+    """PostgREST "in.(...)" filter value for a list of values, quoted where needed."""
+    return f"in.({','.join(quote_value(v) for v in values)})"
+
+
+def _filter_params(filters):
+    # Filters are PostgREST query params: {"trade": "eq.plumber"} or a list of pairs
+    # when a column appears twice (created_at=gte.X&created_at=lt.Y).
+    if not filters:
+        return []
+    if isinstance(filters, dict):
+        return list(filters.items())
+    return list(filters)
+
+
+class SupabaseClient:
+    def __init__(self, url, key, pool_size=10, retries=5, backoff=0.5, timeout=60, name=None):
+        self.url = url.rstrip("/")
+        self.key = key
+        self.name = name or self.url
+        self.retries = retries
+        self.backoff = backoff
+        self.timeout = timeout
+        # Response payload bytes, so scripts can report what a run actually transferred
+        self.bytes_received = 0
+
+        self.session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=pool_size, pool_maxsize=pool_size)
+        self.session.mount("https://", adapter)
+        self.session.mount("http://", adapter)
+        self.session.headers.update({
+            "apikey": key,
+            "Authorization": f"Bearer {key}",
+            "Accept": "application/json",
+        })
+
+    @classmethod
+    def from_profile(cls, name, service_role=True, **kwargs):
+        url, key = resolve_profile(name, service_role)
+        return cls(url, key, name=name, **kwargs)
+
+    def close(self):
+        self.session.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    # ------------------------------------------------------------------
+    # Low level
+    # ------------------------------------------------------------------
+
+    def request(self, method, path, params=None, json=None, headers=None, data=None, ok=(200, 201, 204, 206)):
+        """Send a request relative to the project URL, retrying 429/5xx and dropped connections."""
+        url = path if path.startswith("http") else f"{self.url}/{path.lstrip('/')}"
+        for attempt in range(self.retries + 1):
+            last = attempt == self.retries
+            try:
+                resp = self.session.request(method, url, params=params, json=json, data=data,
+                                            headers=headers, timeout=self.timeout)
+            except (requests.ConnectionError, requests.Timeout):
+                if last:
+                    raise
+                time.sleep(self.backoff * 2 ** attempt)
+                continue
+
+            self.bytes_received += len(resp.content)
+            if resp.status_code in ok:
+                return resp
+            if resp.status_code in RETRY_STATUSES and not last:
+                retry_after = resp.headers.get("Retry-After")
+                delay = float(retry_after) if retry_after and retry_after.isdigit() else self.backoff * 2 ** attempt
+                time.sleep(delay)
+                continue
+            raise SupabaseError(resp)
+
+    def rest(self, method, table, **kwargs):
+        return self.request(method, f"rest/v1/{table}", **kwargs)
+
+    # ------------------------------------------------------------------
+    # Reads
+    # ------------------------------------------------------------------
+
+    def select(self, table, select="*", filters=None, order=None, limit=None, offset=None):
+        """Single request. Use paginate() for anything that may exceed the 1000 row cap."""
+        params = [("select", select)] + _filter_params(filters)
+        if order:
+            params.append(("order", order))
+        if limit is not None:
+            params.append(("limit", str(limit)))
+        if offset:
+            params.append(("offset", str(offset)))
+        return self.rest("GET", table, params=params).json()
+
+    def pages(self, table, select="*", filters=None, keyset=("id",), cursor=None, page_size=1000):
+        """
+        Yields lists of rows ordered by `keyset`, each page starting after the last key of
+        the previous one. Keyset columns must be in `select` (or select="*").
+        """
+        keyset = tuple(keyset)
+        base = [("select", select), ("order", ",".join(f"{k}.asc" for k in keyset)),
+                ("limit", str(page_size))] + _filter_params(filters)
+        while True:
+            params = list(base)
+            flt = keyset_filter(keyset, cursor)
+            if flt:
+                params.append(flt)
+            data = self.rest("GET", table, params=params).json()
+            if data:
+                yield data
+                cursor = [data[-1].get(k) for k in keyset]
+            if len(data) < page_size:
+                return
+
+    def paginate(self, table, select="*", filters=None, keyset=("id",), page_size=1000):
+        """Yields every matching row, one page request per `page_size` rows."""
+        for page in self.pages(table, select, filters, keyset, page_size=page_size):
+            yield from page
+
+    def rpc(self, function, args=None, params=None):
+        """Call a Postgres function exposed by PostgREST (POST /rest/v1/rpc/<function>)."""
+        resp = self.request("POST", f"rest/v1/rpc/{function}", params=params, json=args or {},
+                            headers={"Content-Type": "application/json"})
+        return resp.json() if resp.content else None
+
+    def count(self, table, filters=None):
+        """Exact row count without transferring rows."""
+        params = [("select", "id"), ("limit", "1")] + _filter_params(filters)
+        resp = self.rest("GET", table, params=params, headers={"Prefer": "count=exact"})
+        total = resp.headers.get("Content-Range", "").split("/")[-1]
+        return int(total) if total.isdigit() else None
+
+    # ------------------------------------------------------------------
+    # Writes
+    # ------------------------------------------------------------------
+
+    def insert(self, table, rows, upsert=False, on_conflict=None, chunk_size=500, returning=False):
+        """Bulk insert (or upsert with merge-duplicates) in chunks. Returns rows written or returned."""
+        rows = [rows] if isinstance(rows, dict) else list(rows)
+        prefer = ["return=representation" if returning else "return=minimal"]
+        if upsert:
+            prefer.append("resolution=merge-duplicates")
+        params = [("on_conflict", on_conflict)] if on_conflict else None
+        headers = {"Content-Type": "application/json", "Prefer": ",".join(prefer)}
+
+        out = [] if returning else 0
+        for start in range(0, len(rows), chunk_size):
+            chunk = rows[start:start + chunk_size]
+            resp = self.rest("POST", table, params=params, json=chunk, headers=headers)
+            if returning:
+                out.extend(resp.json())
+            else:
+                out += len(chunk)
+        return out
+
+    def upsert(self, table, rows, on_conflict=None, chunk_size=500, returning=False):
+        return self.insert(table, rows, upsert=True, on_conflict=on_conflict,
+                           chunk_size=chunk_size, returning=returning)
+
+    def update(self, table, filters, values, returning=False):
+        if not filters:
+            raise ValueError("refusing to PATCH a whole table without filters")
+        headers = {"Content-Type": "application/json",
+                   "Prefer": "return=representation" if returning else "return=minimal"}
+        resp = self.rest("PATCH", table, params=_filter_params(filters), json=values, headers=headers)
+        return resp.json() if returning else None
+
+    def delete(self, table, filters):
+        if not filters:
+            raise ValueError("refusing to DELETE a whole table without filters")
+        self.rest("DELETE", table, params=_filter_params(filters), headers={"Prefer": "return=minimal"})
+
+    # ------------------------------------------------------------------
+    # Storage
+    # ------------------------------------------------------------------
+
+    def public_url(self, bucket, path):
+        return f"{self.url}/storage/v1/object/public/{bucket}/{path}"
+
+    def storage_list(self, bucket, prefix="", page_size=1000, recursive=True):
+        """
+        Yields file entries ({"name": full path, "metadata": {...}, ...}) under `prefix`.
+        The Storage API lists one folder level at a time; folders come back with id null.
+        """
+        folders = [prefix.strip("/")]
+        while folders:
+            folder = folders.pop()
+            offset = 0
+            while True:
+                body = {"prefix": folder, "limit": page_size, "offset": offset,
+                        "sortBy": {"column": "name", "order": "asc"}}
+                items = self.request("POST", f"storage/v1/object/list/{bucket}", json=body).json()
+                for item in items:
+                    path = f"{folder}/{item['name']}" if folder else item["name"]
+                    if item.get("id") is None:
+                        if recursive:
+                            folders.append(path)
+                    else:
+                        yield dict(item, name=path)
+                if len(items) < page_size:
+                    break
+                offset += page_size
+
+    def storage_download(self, bucket, path):
+        return self.request("GET", f"storage/v1/object/{bucket}/{path}").content
+
+    def storage_upload(self, bucket, path, data, content_type, upsert=True, cache_control="31536000"):
+        headers = {"Content-Type": content_type, "x-upsert": "true" if upsert else "false",
+                   "cache-control": f"max-age={cache_control}"}
+        self.request("POST", f"storage/v1/object/{bucket}/{path}", data=data, headers=headers)
+        return self.public_url(bucket, path)
+
+    # ------------------------------------------------------------------
+    # Auth admin (service role key only)
+    # ------------------------------------------------------------------
+
+    def auth_users_page(self, page=1, per_page=50):
+        """
+        (users, total) for one page of GET /auth/v1/admin/users, newest signup first.
+        total comes from X-Total-Count and is None when the server doesn't send it.
+        """
+        resp = self.request("GET", "auth/v1/admin/users", params={"page": page, "per_page": per_page})
+        total = resp.headers.get("X-Total-Count", "")
+        return resp.json().get("users", []), int(total) if total.isdigit() else None
+
+
+_clients = {}
+
+
+def get_client(profile="dev", service_role=True, **kwargs):
+    """Shared client per profile, so helpers called from one script reuse the same pool."""
+    cache_key = (profile, service_role)
+    if cache_key not in _clients:
+        _clients[cache_key] = SupabaseClient.from_profile(profile, service_role, **kwargs)
+    return _clients[cache_key]
@@ -0,0 +1,344 @@
+"""Trigram index over src/ for class-usage and style audits.
+
+Every file is reduced to the set of (lowercased) byte trigrams it contains. A
+regex is turned into the literals any match must contain, and only files that
+have all of a literal's trigrams are read and searched, so an audit for
+"conic-gradient" or "bg-gold" opens a handful of files instead of all of them::
+
+    from lib.codesearch import load_index
+
+    index = load_index()                 # refreshes changed files, saves the cache
+    for hit in index.search([r"bg-gold", r"glow", r"conic-gradient"]):
+        print(hit.path, hit.line, hit.text)
+
+The index lives in ``.cache/codesearch.pickle``. Loading it stats every file
+and re-reads only the new or modified ones (size and mtime), and drops the
+deleted ones.
+"""
+
+import os
+import re
+import sys
+import string
+import pickle
+import bisect
+import unicodedata
+
+import numpy as np
+
+from .env import ROOT
+
+CACHE_PATH = ROOT / ".cache" / "codesearch.pickle"
+# Bump when the trigram encoding or cache layout changes
+CACHE_VERSION = 1
+DEFAULT_ROOTS = ("src",)
+EXTENSIONS = (".ts", ".tsx", ".js", ".jsx", ".css", ".html", ".json", ".md", ".svg")
+SKIP_DIRS = {"node_modules", "dist", "build", ".git", ".cache", "__pycache__"}
+
+_WORD_ESCAPES = set("dDwWsSbBAZ")
+_CHAR_ESCAPES = {"n": "\n", "t": "\t", "r": "\r", "f": "\f", "v": "\v", "a": "\a"}
+# Escapes naming a code point, with the length of their digits (\N{...} runs to "}")
+_CODE_ESCAPES = {"x": 2, "u": 4, "U": 8, "N": 0}
+
+
+def trigrams(data):
+    """Sorted unique trigrams of `data` (bytes) as uint32, ASCII case folded."""
+    if len(data) < 3:
+        return np.empty(0, dtype=np.uint32)
+    arr = np.frombuffer(data.lower(), dtype=np.uint8).astype(np.uint32)
+    return np.unique((arr[:-2] << 16) | (arr[1:-1] << 8) | arr[2:])
+
+
+def required_literals(pattern, flags=0):
+    """
+    What any match of `pattern` must contain: a list of alternatives, each a
+    list of literals that all occur in the match. None when nothing is
+    required (the pattern has a branch without a literal), so every file is a
+    candidate. Conservative: groups with alternation, classes and optional
+    parts are skipped, never guessed.
+    """
+    if flags & re.X:
+        return None
+    branches = []
+    for branch in _split_alternatives(pattern):
+        literals = [lit for lit in _branch_literals(branch) if len(lit.encode("utf-8")) >= 3]
+        if not literals:
+            return None
+        branches.append(literals)
+    return branches
+
+
+def _split_alternatives(pattern):
+    parts, depth, start, i = [], 0, 0, 0
+    while i < len(pattern):
+        c = pattern[i]
+        if c == "\\":
+            i += 2
+            continue
+        if c == "[":
+            i = _class_end(pattern, i)
+            continue
+        if c == "(":
+            depth += 1
+        elif c == ")":
+            depth -= 1
+        elif c == "|" and depth == 0:
+            parts.append(pattern[start:i])
+            start = i + 1
+        i += 1
+    parts.append(pattern[start:])
+    return parts
+
+
+def _class_end(pattern, i):
+    """Index just past the character class starting at pattern[i] == "["."""
+    i += 1
+    if i < len(pattern) and pattern[i] == "^":
+        i += 1
+    if i < len(pattern) and pattern[i] == "]":
+        i += 1
+    while i < len(pattern) and pattern[i] != "]":
+        i += 2 if pattern[i] == "\\" else 1
+    return i + 1
+
+
+def _group_end(pattern, i):
+    """Index of the ")" closing the group that starts at pattern[i] == "("."""
+    depth = 0
+    while i < len(pattern):
+        c = pattern[i]
+        if c == "\\":
+            i += 2
+            continue
+        if c == "[":
+            i = _class_end(pattern, i)
+            continue
+        if c == "(":
+            depth += 1
+        elif c == ")":
+            depth -= 1
+            if depth == 0:
+                return i
+        i += 1
+    return len(pattern)
+
+
+def _optional_follows(pattern, i):
+    return i < len(pattern) and (pattern[i] in "*?" or pattern.startswith("{0", i))
+
+
+def _decode_escape(escape):
+    """The character a \\x, \\u, \\U or \\N{...} escape stands for, or None."""
+    kind, body = escape[1], escape[2:]
+    if kind == "N":
+        try:
+            return unicodedata.lookup(body[1:-1]) if body[:1] == "{" and body[-1:] == "}" else None
+        except KeyError:
+            return None
+    if len(body) != _CODE_ESCAPES[kind] or not all(c in string.hexdigits for c in body):
+        return None
+    code = int(body, 16)
+    return chr(code) if code <= sys.maxunicode else None
+
+
+def _branch_literals(branch):
+    literals, run, i = [], [], 0
+
+    def flush():
+        if run:
+            literals.append("".join(run))
+            run.clear()
+
+    while i < len(branch):
+        c = branch[i]
+        if c == "\\" and i + 1 < len(branch):
+            nxt = branch[i + 1]
+            i += 2
+            if nxt in _WORD_ESCAPES:
+                flush()
+                continue
+            if nxt.isdigit():
+                # \0, \0NN and \NNN (three octal digits) are characters; anything
+                # else is a backreference, whose text isn't known here
+                digits = re.match(r"[0-7]{0,2}" if nxt == "0" else r"[0-7]{2}", branch[i:])
+                if nxt in "01234567" and digits and (nxt == "0" or digits.end() == 2):
+                    char = chr(int(nxt + digits.group(), 8))
+                    i += digits.end()
+                else:
+                    flush()
+                    i = re.compile(r"\d*").match(branch, i).end()
+                    continue
+            elif nxt in _CODE_ESCAPES:
+                # \xNN, \uNNNN, \UNNNNNNNN and \N{name} stand for one character
+                end = branch.index("}", i) + 1 if nxt == "N" and "}" in branch[i:] else i + _CODE_ESCAPES[nxt]
+                char = _decode_escape(branch[i - 2:end])
+                i = end
+                if char is None:
+                    flush()
+                    continue
+            elif nxt.isalpha() and nxt not in _CHAR_ESCAPES:
+                flush()
+                continue
+            else:
+                char = _CHAR_ESCAPES.get(nxt, nxt)
+        elif c == "[":
+            flush()
+            i = _class_end(branch, i)
+            if _optional_follows(branch, i):
+                i += 1
+            continue
+        elif c == "(":
+            flush()
+            end = _group_end(branch, i)
+            inner = branch[i + 1:end]
+            i = end + 1
+            if inner.startswith("?:") or inner.startswith("?P<"):
+                inner = inner[inner.index(">") + 1:] if inner.startswith("?P<") else inner[2:]
+            elif inner.startswith("?"):
+                continue
+            if _optional_follows(branch, i) or len(_split_alternatives(inner)) > 1:
+                continue
+            literals.extend(_branch_literals(inner))
+            continue
+        elif c in ".^$":
+            flush()
+            i += 1
+            continue
+        elif c in "*?{+":
+            # The quantified character is optional (or may repeat): end the run before/after it
+            if c != "+" and run:
+                run.pop()
+            flush()
+            i = branch.index("}", i) + 1 if c == "{" and "}" in branch[i:] else i + 1
+            continue
+        else:
+            char = c
+            i += 1
+        run.append(char)
+    flush()
+    return literals
+
+
+def _literal_trigrams(literal):
+    return trigrams(literal.encode("utf-8"))
+
+
+class Hit:
+    __slots__ = ("path", "line", "text", "patterns")
+
+    def __init__(self, path, line, text, patterns):
+        self.path = path
+        self.line = line
+        self.text = text
+        self.patterns = patterns
+
+
+class CodeIndex:
+    def __init__(self, root=ROOT, roots=DEFAULT_ROOTS):
+        self.root = root
+        self.roots = tuple(roots)
+        # relative path -> (size, mtime_ns, sorted uint32 trigrams)
+        self.files = {}
+
+    def _walk(self):
+        for top in self.roots:
+            for dirpath, dirnames, filenames in os.walk(self.root / top):
+                dirnames[:] = sorted(d for d in dirnames if d not in SKIP_DIRS)
+                for filename in sorted(filenames):
+                    if filename.endswith(EXTENSIONS):
+                        path = os.path.join(dirpath, filename)
+                        yield os.path.relpath(path, self.root).replace(os.sep, "/"), path
+
+    def refresh(self):
+        """Re-index new and modified files, forget deleted ones. Returns (indexed, removed)."""
+        seen, indexed = set(), 0
+        for rel, path in self._walk():
+            seen.add(rel)
+            try:
+                stat = os.stat(path)
+            except OSError:
+                continue
+            entry = self.files.get(rel)
+            if entry and entry[0] == stat.st_size and entry[1] == stat.st_mtime_ns:
+                continue
+            with open(path, "rb") as f:
+                self.files[rel] = (stat.st_size, stat.st_mtime_ns, trigrams(f.read()))
+            indexed += 1
+        removed = [rel for rel in self.files if rel not in seen]
+        for rel in removed:
+            del self.files[rel]
+        return indexed, len(removed)
+
+    def candidates(self, pattern, flags=0):
+        """Files that may contain a match for `pattern`, in path order."""
+        branches = required_literals(pattern, flags)
+        if branches is None:
+            return sorted(self.files)
+        wanted = [np.unique(np.concatenate([_literal_trigrams(lit) for lit in literals]))
+                  for literals in branches]
+        found = []
+        for rel, (_, _, grams) in sorted(self.files.items()):
+            for need in wanted:
+                pos = np.searchsorted(grams, need)
+                if pos.size and np.all(pos < grams.size) and np.array_equal(grams[pos], need):
+                    found.append(rel)
+                    break
+        return found
+
+    def search(self, patterns, flags=0, paths=None):
+        """
+        Hits (one per matching line, with every pattern that matched it) for the
+        regexes in `patterns`, optionally limited to the relative `paths`. Only
+        the candidate files for each pattern are read.
+        """
+        compiled = [re.compile(p, flags) for p in patterns]
+        wanted = {}
+        for pattern, regex in zip(patterns, compiled):
+            for rel in self.candidates(pattern, flags):
+                if paths is None or rel in paths:
+                    wanted.setdefault(rel, []).append((pattern, regex))
+
+        hits = []
+        for rel in sorted(wanted):
+            with open(self.root / rel, "r", encoding="utf-8-sig", errors="replace") as f:
+                text = f.read()
+            starts = None
+            lines = {}
+            for pattern, regex in wanted[rel]:
+                for m in regex.finditer(text):
+                    if starts is None:
+                        starts = [0] + [nl.end() for nl in re.finditer("\n", text)]
+                    line = bisect.bisect_right(starts, m.start())
+                    names = lines.setdefault(line, [])
+                    if pattern not in names:
+                        names.append(pattern)
+            for line in sorted(lines):
+                end = starts[line] - 1 if line < len(starts) else len(text)
+                hits.append(Hit(rel, line, text[starts[line - 1]:end].rstrip("\r"), lines[line]))
+        return hits
+
+
+def load_index(root=ROOT, roots=DEFAULT_ROOTS, cache_path=CACHE_PATH, use_cache=True):
+    """CodeIndex for `roots`, brought up to date with the files on disk."""
+    index = None
+    if use_cache and cache_path.exists():
+        try:
+            with open(cache_path, "rb") as f:
+                cached = pickle.load(f)
+            if cached.get("version") == CACHE_VERSION and cached.get("roots") == tuple(roots):
+                index = CodeIndex(root, roots)
+                index.files = cached["files"]
+        except (OSError, pickle.UnpicklingError, EOFError, AttributeError, ImportError):
+            index = None
+    if index is None:
+        index = CodeIndex(root, roots)
+
+    indexed, removed = index.refresh()
+    if use_cache and (indexed or removed or not cache_path.exists()):
+        cache_path.parent.mkdir(parents=True, exist_ok=True)
+        tmp = cache_path.with_suffix(".tmp")
+        with open(tmp, "wb") as f:
+            pickle.dump({"version": CACHE_VERSION, "roots": tuple(roots), "files": index.files},
+                        f, protocol=pickle.HIGHEST_PROTOCOL)
+        tmp.replace(cache_path)
+    return index
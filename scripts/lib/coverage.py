@@ -0,0 +1,161 @@
+"""Trade x city listing coverage, merging the static listings with Supabase.
+
+For each (trade, city) cell the businesses are merged the way fetchBusinesses()
+in src/lib/businessService.ts does it: the static listings for the cell first,
+then the verified Supabase rows for the same trade and city, keyed by id so a
+Supabase row replaces a static listing with the same id. Static cells are
+looked up with getBusinessListings()'s key normalisation (the page's fallback).
+Supabase rows are matched exactly, as the page's .eq("trade", ...).eq("city", ...)
+does: a row for "luton" or "Plumber" never shows on the Luton plumber page, so it
+is counted under its own extra city or trade instead.
+
+The result is a set of dense NumPy matrices (trades x cities) for the trades
+and cities in src/lib/trades.ts, plus any extra trade or city found in the
+data, built in one pass over both sources::
+
+    from lib.coverage import build_coverage, load_taxonomy
+
+    coverage = build_coverage(load_listings(), supabase_rows, *load_taxonomy())
+    coverage.cell("plumber", "Luton")            # merged listing count
+    coverage.gaps(min_count=3)                   # [(trade, city, count), ...]
+"""
+
+import re
+
+import numpy as np
+
+from .env import ROOT
+from .listings import listing_key
+
+TAXONOMY_PATH = ROOT / "src" / "lib" / "trades.ts"
+
+TRADES_RE = re.compile(r"export\s+const\s+trades\s*=\s*\[(.*?)\]\s*as\s+const", re.S)
+CITIES_RE = re.compile(r"export\s+const\s+cities\s*=\s*\[(.*?)\]\s*as\s+const", re.S)
+TRADE_ENTRY_RE = re.compile(r"""slug:\s*["']([^"']+)["'],\s*name:\s*["']([^"']+)["']""")
+STRING_RE = re.compile(r""""([^"]*)"|'([^']*)'""")
+
+# Layers of the matrix stack
+LAYERS = ("total", "static", "supabase", "paid")
+
+
+def load_taxonomy(path=TAXONOMY_PATH):
+    """([(trade slug, trade name)], [city name]) as the site defines them in trades.ts."""
+    text = path.read_text(encoding="utf-8")
+    trades_block, cities_block = TRADES_RE.search(text), CITIES_RE.search(text)
+    if not trades_block or not cities_block:
+        raise ValueError(f"trades/cities arrays not found in {path}")
+    trades = TRADE_ENTRY_RE.findall(trades_block.group(1))
+    cities = [a or b for a, b in STRING_RE.findall(cities_block.group(1))]
+    return trades, cities
+
+
+class Coverage:
+    def __init__(self, trades, cities, matrices, site_trades, site_cities):
+        self.trades = list(trades)
+        self.cities = list(cities)
+        # layer name -> int32 array [len(trades), len(cities)]
+        self.matrices = matrices
+        # How many leading rows/columns are the site's own trades/cities; the rest
+        # only appear in the data
+        self.site_trades = site_trades
+        self.site_cities = site_cities
+        self._trade_index = {t: i for i, t in enumerate(self.trades)}
+        self._city_index = {c: j for j, c in reversed(list(enumerate(self.cities)))}
+        for j, c in enumerate(self.cities[:site_cities]):
+            self._city_index.setdefault(listing_key(c), j)
+
+    @property
+    def total(self):
+        return self.matrices["total"]
+
+    def cell(self, trade, city, layer="total"):
+        """Listings in a cell; site cities also match by their listing key ("luton")."""
+        i, j = self._trade_index.get(trade), self._city_index.get(city, self._city_index.get(listing_key(city)))
+        if i is None or j is None:
+            return 0
+        return int(self.matrices[layer][i, j])
+
+    def by_trade(self, layer="total"):
+        return dict(zip(self.trades, self.matrices[layer].sum(axis=1).tolist()))
+
+    def by_city(self, layer="total"):
+        return dict(zip(self.cities, self.matrices[layer].sum(axis=0).tolist()))
+
+    def gaps(self, min_count=1, layer="total"):
+        """Site (trade, city) cells with fewer than `min_count` listings, emptiest first."""
+        site = self.matrices[layer][:self.site_trades, :self.site_cities]
+        rows, cols = np.nonzero(site < min_count)
+        order = np.lexsort((cols, rows, site[rows, cols]))
+        return [(self.trades[rows[k]], self.cities[cols[k]], int(site[rows[k], cols[k]])) for k in order]
+
+    def off_site(self):
+        """Cities and trades that have listings but no page on the site."""
+        return self.trades[self.site_trades:], self.cities[self.site_cities:]
+
+    def save(self, path, meta):
+        path.parent.mkdir(parents=True, exist_ok=True)
+        tmp = path.with_name(path.name + ".tmp.npz")
+        np.savez(tmp, trades=np.array(self.trades), cities=np.array(self.cities),
+                 site=np.array([self.site_trades, self.site_cities]),
+                 meta=np.array([repr(sorted(meta.items()))]), **self.matrices)
+        tmp.replace(path)
+
+    @classmethod
+    def load(cls, path, meta):
+        """The saved Coverage if it was built from the same inputs (`meta`), else None."""
+        try:
+            with np.load(path, allow_pickle=False) as data:
+                if str(data["meta"][0]) != repr(sorted(meta.items())):
+                    return None
+                matrices = {layer: data[layer] for layer in LAYERS}
+                site_trades, site_cities = data["site"].tolist()
+                return cls(data["trades"].tolist(), data["cities"].tolist(), matrices, site_trades, site_cities)
+        except (OSError, KeyError, ValueError):
+            return None
+
+
+def build_coverage(index, supabase_rows, trades, cities):
+    """
+    Coverage from a ListingIndex and Supabase business rows (id, trade, city,
+    verified, tier). `trades` is [(slug, name)] and `cities` [name], as from
+    load_taxonomy().
+    """
+    trade_slugs = [slug for slug, _ in trades]
+    trade_index = {slug: i for i, slug in enumerate(trade_slugs)}
+    city_names = list(cities)
+    city_index = {listing_key(c): j for j, c in enumerate(city_names)}
+    site_trades, site_cities = len(trade_slugs), len(city_names)
+    site_city_names = set(city_names)
+
+    def cell_of(trade, city, key):
+        if trade not in trade_index:
+            trade_index[trade] = len(trade_slugs)
+            trade_slugs.append(trade)
+        if key not in city_index:
+            city_index[key] = len(city_names)
+            city_names.append(city)
+        return trade_index[trade], city_index[key]
+
+    # One pass per source: {cell: {id: (source, tier)}}, Supabase overwriting static ids
+    cells = {}
+    for city, trade, business in index.records:
+        cell = cell_of(listing_key(trade), city, listing_key(city))
+        cells.setdefault(cell, {})[business.get("id")] = ("static", business.get("tier"))
+    for row in supabase_rows:
+        if row.get("verified") is not True or not row.get("trade") or not row.get("city"):
+            continue
+        city = row["city"]
+        # Only an exact site city name reaches its page; anything else is its own column
+        key = listing_key(city) if city in site_city_names else ("supabase", city)
+        cell = cell_of(row["trade"], city, key)
+        cells.setdefault(cell, {})[row.get("id")] = ("supabase", row.get("tier"))
+
+    shape = (len(trade_slugs), len(city_names))
+    matrices = {layer: np.zeros(shape, dtype=np.int32) for layer in LAYERS}
+    for (i, j), businesses in cells.items():
+        for source, tier in businesses.values():
+            matrices["total"][i, j] += 1
+            matrices[source][i, j] += 1
+            if tier == "paid":
+                matrices["paid"][i, j] += 1
+    return Coverage(trade_slugs, city_names, matrices, site_trades, site_cities)
@@ -0,0 +1,228 @@
+"""Duplicate business detection that scales past pairwise comparison.
+
+Rows are grouped into blocks that duplicates almost always share, and only rows
+in the same block are compared:
+
+    trade + city + phone prefix      same area code on the same listing page
+    trade + city + first name word   catches rows with no or different phones
+
+The same firm listed in several cities or trades is deliberate coverage, so
+rows are never compared across listing pages.
+
+Pairs scoring at or above the threshold are joined into clusters (union-find)
+and each cluster becomes one merge plan entry: keep the claimed / most complete
+row, fill its empty fields from the others, remove the rest.
+"""
+
+import time
+from difflib import SequenceMatcher
+
+from .listings import listing_key
+from .normalize import name_tokens, name_words, normalize_phone, phone_prefix, website_domain
+
+DEFAULT_THRESHOLD = 0.85
+# Blocks larger than this are compared with a sliding window over names sorted
+# alphabetically instead of all pairs, so one generic name word can't go quadratic
+MAX_BLOCK = 200
+WINDOW = 20
+
+# Trade nouns: "Smith Plumbing" and "Smith Plumbers" differ only in these, while
+# "Emergency Locksmith" and "Locksmith Services" have nothing else in common
+TRADE_WORDS = frozenset({
+    "locksmith", "lock", "plumber", "plumbing", "heating", "electrician", "electrical", "electric",
+    "gas", "engineer", "boiler", "glazier", "glazing", "glass", "window", "drain", "drainage",
+    "specialist", "breakdown", "recovery", "mechanic",
+})
+
+# Filled on the kept row from the removed ones when it has no value
+MERGE_FIELDS = (
+    "phone", "email", "website", "address", "logo_url", "header_image_url", "vehicle_image_url",
+    "photos", "premium_description", "services_offered", "coverage_areas", "whatsapp_number", "contact_name",
+)
+
+
+class Candidate:
+    __slots__ = ("index", "trade", "city", "phone", "domain", "tokens", "key", "name")
+
+    def __init__(self, index, row):
+        self.index = index
+        self.trade = listing_key(row.get("trade") or "")
+        self.city = listing_key(row.get("city") or "")
+        self.phone = normalize_phone(row.get("phone"))
+        self.domain = website_domain(row.get("website"))
+        city_words = set(name_words(self.city.replace("-", " ")))
+        self.tokens = name_tokens(row.get("name"), TRADE_WORDS.union(city_words))
+        # Sorted, so word order doesn't matter to the character comparison; names made
+        # only of generic words fall back to comparing all of them (minus the city)
+        self.key = " ".join(sorted(self.tokens)) or " ".join(sorted(w for w in name_words(row.get("name"))
+                                                                   if w not in city_words))
+        self.name = row.get("name") or ""
+
+
+def blocking_keys(c):
+    keys = []
+    prefix = phone_prefix(c.phone)
+    if prefix:
+        keys.append(("p", c.trade, c.city, prefix))
+    if c.key:
+        keys.append(("n", c.trade, c.city, c.key.split(" ", 1)[0]))
+    return keys
+
+
+def name_similarity(a, b):
+    """max(token Jaccard, character ratio of the sorted tokens), 0..1."""
+    if not a.tokens or not b.tokens:
+        return 1.0 if a.key and a.key == b.key else 0.0
+    return max(len(a.tokens & b.tokens) / len(a.tokens | b.tokens), SequenceMatcher(None, a.key, b.key).ratio())
+
+
+def score_pair(a, b, threshold=DEFAULT_THRESHOLD):
+    """(score, reasons), or None when the pair can't reach `threshold`."""
+    same_phone = bool(a.phone) and a.phone == b.phone
+    same_site = bool(a.domain) and a.domain == b.domain
+    conflict = len(a.phone) >= 10 and len(b.phone) >= 10 and not same_phone
+
+    # Lowest name similarity that could still reach the threshold
+    if same_phone or same_site:
+        need = (threshold - 0.6) / 0.4
+    elif conflict:
+        need = threshold / 0.8
+    else:
+        need = threshold
+    if need > 1:
+        return None
+
+    if a.tokens and b.tokens:
+        jaccard = len(a.tokens & b.tokens) / len(a.tokens | b.tokens)
+        name = jaccard
+        if jaccard < need:
+            # Cheap upper bounds first; ratio() is the expensive part
+            matcher = SequenceMatcher(None, a.key, b.key)
+            if matcher.real_quick_ratio() < need or matcher.quick_ratio() < need:
+                return None
+            name = max(jaccard, matcher.ratio())
+    else:
+        name = 1.0 if a.key and a.key == b.key else 0.0
+    if name < need:
+        return None
+
+    reasons = ["name"] if name >= 0.8 else []
+    if same_phone or same_site:
+        score = 0.6 + 0.4 * name
+        reasons += (["phone"] if same_phone else []) + (["website"] if same_site else [])
+    elif conflict:
+        score = name * 0.8
+    else:
+        score = name
+    return (round(score, 3), reasons) if score >= threshold else None
+
+
+def _block_pairs(members):
+    if len(members) <= MAX_BLOCK:
+        for i in range(len(members)):
+            for j in range(i + 1, len(members)):
+                yield members[i], members[j]
+    else:
+        members = sorted(members, key=lambda c: c.key)
+        for i in range(len(members)):
+            for j in range(i + 1, min(i + 1 + WINDOW, len(members))):
+                yield members[i], members[j]
+
+
+def find_duplicate_pairs(rows, threshold=DEFAULT_THRESHOLD):
+    """
+    Returns ({(i, j): (score, reasons)}, stats) for row indexes i < j scoring at
+    or above `threshold`.
+    """
+    started = time.perf_counter()
+    candidates = [Candidate(i, row) for i, row in enumerate(rows)]
+    blocks = {}
+    for c in candidates:
+        for key in blocking_keys(c):
+            blocks.setdefault(key, []).append(c)
+
+    pairs, seen, compared = {}, set(), 0
+    for members in blocks.values():
+        if len(members) < 2:
+            continue
+        for a, b in _block_pairs(members):
+            pair = (a.index, b.index) if a.index < b.index else (b.index, a.index)
+            if pair in seen:
+                continue
+            seen.add(pair)
+            compared += 1
+            result = score_pair(a, b, threshold)
+            if result:
+                pairs[pair] = result
+
+    n = len(rows)
+    stats = {"rows": n, "blocks": len(blocks), "compared": compared, "all_pairs": n * (n - 1) // 2,
+             "matches": len(pairs), "seconds": time.perf_counter() - started}
+    return pairs, stats
+
+
+def clusters(pairs):
+    """Groups of row indexes connected by matching pairs (union-find), largest first."""
+    parent = {}
+
+    def find(x):
+        parent.setdefault(x, x)
+        while parent[x] != x:
+            parent[x] = parent[parent[x]]
+            x = parent[x]
+        return x
+
+    for a, b in pairs:
+        ra, rb = find(a), find(b)
+        if ra != rb:
+            parent[max(ra, rb)] = min(ra, rb)
+
+    groups = {}
+    for x in parent:
+        groups.setdefault(find(x), []).append(x)
+    return sorted((sorted(g) for g in groups.values()), key=lambda g: (-len(g), g[0]))
+
+
+def _filled(value):
+    return value not in (None, "", [], {})
+
+
+def survivor_rank(row):
+    """Sort key: claimed, premium, paid, verified, most filled fields, oldest, id."""
+    return (
+        not row.get("owner_user_id"),
+        not row.get("is_premium"),
+        row.get("tier") != "paid",
+        not row.get("verified"),
+        -sum(_filled(row.get(f)) for f in MERGE_FIELDS),
+        row.get("created_at") or "~",
+        str(row.get("id")),
+    )
+
+
+def merge_plan(rows, pairs):
+    """One entry per cluster: {"keep", "remove", "fill", "score", "reasons", "names", ...}."""
+    plan = []
+    for group in clusters(pairs):
+        members = sorted(group, key=lambda i: survivor_rank(rows[i]))
+        keep = rows[members[0]]
+        fill = {}
+        for field in MERGE_FIELDS:
+            if _filled(keep.get(field)):
+                continue
+            for i in members[1:]:
+                if _filled(rows[i].get(field)):
+                    fill[field] = rows[i][field]
+                    break
+        edges = [pairs[(a, b)] for a in group for b in group if a < b and (a, b) in pairs]
+        plan.append({
+            "keep": keep.get("id"),
+            "remove": [rows[i].get("id") for i in members[1:]],
+            "trade": keep.get("trade"),
+            "city": keep.get("city"),
+            "names": [rows[i].get("name") for i in members],
+            "score": min(score for score, _ in edges),
+            "reasons": sorted({r for _, reasons in edges for r in reasons}),
+            "fill": fill,
+        })
+    return plan
@@ -0,0 +1,25 @@
+"""Minimal .env reader (no python-dotenv needed)."""
+
+from pathlib import Path
+
+# Repository root (scripts/lib/env.py -> repo)
+ROOT = Path(__file__).resolve().parent.parent.parent
+
+
+def load_env_file(path):
+    """Parse KEY=VALUE lines, ignoring comments and surrounding quotes. Missing file -> {}."""
+    env = {}
+    path = Path(path)
+    if not path.exists():
+        return env
+    with open(path, "r", encoding="utf-8-sig") as f:
+        for line in f:
+            line = line.strip()
+            if not line or line.startswith("#") or "=" not in line:
+                continue
+            key, value = line.split("=", 1)
+            key = key.strip()
+            if key.startswith("export "):
+                key = key[len("export "):].strip()
+            env[key] = value.strip().strip('"').strip("'")
+    return env
@@ -0,0 +1,15 @@
+"""Stable content hashes for rows, so two projects can be compared without
+comparing rows field by field."""
+
+import json
+import hashlib
+
+
+def canonical(row, columns):
+    """Deterministic JSON for the given columns (missing columns count as null)."""
+    return json.dumps({c: row.get(c) for c in columns}, sort_keys=True, separators=(",", ":"),
+                      default=str, ensure_ascii=False)
+
+
+def row_hash(row, columns):
+    return hashlib.blake2b(canonical(row, columns).encode("utf-8"), digest_size=16).hexdigest()
@@ -0,0 +1,217 @@
+"""Distances, geohashes and nearest-neighbour indexes for cities and businesses.
+
+``haversine`` is the formula of calculateDistance() in src/lib/cityCoordinates.ts,
+vectorised over NumPy arrays (any broadcastable shapes). ``GeoIndex`` keeps
+points in a KD-tree over unit vectors on the sphere (straight-line distance
+there orders points exactly like great-circle distance), so nearest-N is a
+logarithmic walk instead of a scan::
+
+    from lib.geo import GeoIndex, load_city_coordinates
+
+    cities = GeoIndex.from_mapping(load_city_coordinates())
+    cities.nearest(51.5, -0.12, k=3)        # [(name, km), ...] closest first
+
+``cell_table`` precomputes, for every geohash cell over an area, the points
+that can be among the k nearest of *any* location in the cell. A client
+geohashes its position, looks up the cell and measures only those candidates,
+which gives the exact k nearest without loading a tree. geo_index.py exports
+these tables as a static asset.
+"""
+
+import re
+import heapq
+
+import numpy as np
+
+from .env import ROOT
+
+EARTH_RADIUS_KM = 6371
+CITY_COORDINATES_PATH = ROOT / "src" / "lib" / "cityCoordinates.ts"
+CITY_RE = re.compile(r"""["']([^"']+)["']\s*:\s*\{\s*lat:\s*(-?[\d.]+),\s*lng:\s*(-?[\d.]+)\s*\}""")
+
+BASE32 = "0123456789bcdefghjkmnpqrstuvwxyz"
+# Great Britain and Northern Ireland, with some margin
+UK_BOUNDS = (49.8, -8.7, 60.9, 1.9)
+
+
+def haversine(lat1, lng1, lat2, lng2):
+    """Great-circle distance in km, element-wise over broadcast arrays."""
+    lat1, lng1, lat2, lng2 = (np.radians(np.asarray(v, dtype=np.float64)) for v in (lat1, lng1, lat2, lng2))
+    a = np.sin((lat2 - lat1) / 2) ** 2 + np.cos(lat1) * np.cos(lat2) * np.sin((lng2 - lng1) / 2) ** 2
+    return 2 * EARTH_RADIUS_KM * np.arctan2(np.sqrt(a), np.sqrt(1 - a))
+
+
+def unit_vectors(lats, lngs):
+    lats, lngs = np.radians(np.asarray(lats, dtype=np.float64)), np.radians(np.asarray(lngs, dtype=np.float64))
+    return np.stack([np.cos(lats) * np.cos(lngs), np.cos(lats) * np.sin(lngs), np.sin(lats)], axis=-1)
+
+
+def load_city_coordinates(path=CITY_COORDINATES_PATH):
+    """{city: (lat, lng)} from the cityCoordinates object the site uses."""
+    return {name: (float(lat), float(lng)) for name, lat, lng in CITY_RE.findall(path.read_text(encoding="utf-8"))}
+
+
+# ----------------------------------------------------------------------
+# Geohash
+# ----------------------------------------------------------------------
+
+def _cell_bits(precision):
+    bits = 5 * precision
+    return (bits + 1) // 2, bits // 2          # longitude bits, latitude bits
+
+
+def _interleave(lng_index, lat_index, precision):
+    """Geohash strings for arrays of integer cell indexes (longitude bit first, as the format has it)."""
+    lng_bits, lat_bits = _cell_bits(precision)
+    lng_index, lat_index = np.asarray(lng_index, dtype=np.int64), np.asarray(lat_index, dtype=np.int64)
+    code = np.zeros(lng_index.shape, dtype=np.int64)
+    for bit in range(5 * precision):
+        if bit % 2 == 0:
+            value = (lng_index >> (lng_bits - 1 - bit // 2)) & 1
+        else:
+            value = (lat_index >> (lat_bits - 1 - bit // 2)) & 1
+        code = (code << 1) | value
+    chars = [((code >> (5 * (precision - 1 - i))) & 31).tolist() for i in range(precision)]
+    return ["".join(BASE32[c[n]] for c in chars) for n in range(code.size)]
+
+
+def _cell_index(lat, lng, precision):
+    lng_bits, lat_bits = _cell_bits(precision)
+    lng_index = np.clip(np.floor((np.asarray(lng) + 180) / 360 * (1 << lng_bits)), 0, (1 << lng_bits) - 1)
+    lat_index = np.clip(np.floor((np.asarray(lat) + 90) / 180 * (1 << lat_bits)), 0, (1 << lat_bits) - 1)
+    return lng_index.astype(np.int64), lat_index.astype(np.int64)
+
+
+def geohash(lat, lng, precision=5):
+    """Geohash of a point, or a list of them for arrays of points."""
+    hashes = _interleave(*_cell_index(np.atleast_1d(lat), np.atleast_1d(lng), precision), precision)
+    return hashes if np.ndim(lat) else hashes[0]
+
+
+def cell_size(precision):
+    """(degrees of latitude, degrees of longitude) covered by one cell."""
+    lng_bits, lat_bits = _cell_bits(precision)
+    return 180 / (1 << lat_bits), 360 / (1 << lng_bits)
+
+
+# ----------------------------------------------------------------------
+# KD-tree
+# ----------------------------------------------------------------------
+
+LEAF_SIZE = 16
+
+
+class GeoIndex:
+    def __init__(self, keys, lats, lngs):
+        self.keys = list(keys)
+        self.lats = np.asarray(lats, dtype=np.float64)
+        self.lngs = np.asarray(lngs, dtype=np.float64)
+        self.points = unit_vectors(self.lats, self.lngs)
+        self._root = self._build(np.arange(len(self.keys))) if self.keys else None
+
+    @classmethod
+    def from_mapping(cls, coordinates):
+        """From {key: (lat, lng)}."""
+        keys = list(coordinates)
+        return cls(keys, [coordinates[k][0] for k in keys], [coordinates[k][1] for k in keys])
+
+    def __len__(self):
+        return len(self.keys)
+
+    def _build(self, idx):
+        """Nodes are (dim, split, left, right); leaves are index arrays."""
+        if len(idx) <= LEAF_SIZE:
+            return idx
+        points = self.points[idx]
+        dim = int(np.argmax(points.max(axis=0) - points.min(axis=0)))
+        order = np.argsort(points[:, dim], kind="stable")
+        half = len(idx) // 2
+        split = float(points[order[half], dim])
+        return dim, split, self._build(idx[order[:half]]), self._build(idx[order[half:]])
+
+    def _search(self, target, k):
+        """[(chord distance, index)] of the k nearest, closest first."""
+        best = []                                   # max-heap as (-distance, index)
+        stack = [(0.0, self._root)]
+        while stack:
+            bound, node = stack.pop()
+            if len(best) == k and bound >= -best[0][0]:
+                continue
+            if isinstance(node, np.ndarray):
+                distances = np.linalg.norm(self.points[node] - target, axis=1)
+                for d, i in zip(distances.tolist(), node.tolist()):
+                    if len(best) < k:
+                        heapq.heappush(best, (-d, i))
+                    elif d < -best[0][0]:
+                        heapq.heapreplace(best, (-d, i))
+                continue
+            dim, split, left, right = node
+            gap = target[dim] - split
+            near, far = (left, right) if gap < 0 else (right, left)
+            # Pushed first so it's visited last, once the near side has tightened the bound
+            stack.append((max(bound, abs(gap)), far))
+            stack.append((bound, near))
+        return sorted((-d, i) for d, i in best)
+
+    def nearest(self, lat, lng, k=1, max_km=None):
+        """[(key, km)] of the k nearest points, closest first."""
+        if not self.keys:
+            return []
+        hits = self._search(unit_vectors(lat, lng), min(k, len(self.keys)))
+        idx = np.array([i for _, i in hits])
+        km = haversine(lat, lng, self.lats[idx], self.lngs[idx])
+        return [(self.keys[i], float(d)) for i, d in zip(idx.tolist(), km.tolist()) if max_km is None or d <= max_km]
+
+    def nearest_many(self, lats, lngs, k=1):
+        """(indexes, km) arrays of shape (queries, k) for many points at once."""
+        k = min(k, len(self.keys))
+        targets = unit_vectors(lats, lngs)
+        idx = np.array([[i for _, i in self._search(t, k)] for t in targets], dtype=np.int64).reshape(len(targets), k)
+        km = haversine(np.asarray(lats)[:, None], np.asarray(lngs)[:, None], self.lats[idx], self.lngs[idx])
+        return idx, km
+
+
+# ----------------------------------------------------------------------
+# Precomputed cell tables
+# ----------------------------------------------------------------------
+
+def cell_table(index, k, precision=4, bounds=UK_BOUNDS, block=512):
+    """
+    {geohash: [point indexes]} for every cell over `bounds`: the points that can be
+    among the k nearest of any location in the cell, nearest to the centre first.
+
+    For a cell with centre c and radius r (the furthest corner or edge midpoint),
+    a point p is at least d(c, p) - r and at most d(c, p) + r from anywhere in
+    the cell. So the k-th smallest upper bound H limits the k-th nearest
+    distance everywhere in the cell, and any point with a lower bound above H
+    can't be among the k nearest.
+    """
+    if not len(index):
+        return {}
+    south, west, north, east = bounds
+    dlat, dlng = cell_size(precision)
+    lng0, lat0 = _cell_index(south, west, precision)
+    lng1, lat1 = _cell_index(north, east, precision)
+    lng_idx, lat_idx = np.meshgrid(np.arange(lng0, lng1 + 1), np.arange(lat0, lat1 + 1))
+    lng_idx, lat_idx = lng_idx.ravel(), lat_idx.ravel()
+    cell_south, cell_west = lat_idx * dlat - 90, lng_idx * dlng - 180
+    centre_lat, centre_lng = cell_south + dlat / 2, cell_west + dlng / 2
+
+    # Radius: furthest of the four corners and four edge midpoints from the centre
+    offsets = [(a, b) for a in (0, 0.5, 1) for b in (0, 0.5, 1) if (a, b) != (0.5, 0.5)]
+    radius = np.max([haversine(centre_lat, centre_lng, cell_south + a * dlat, cell_west + b * dlng)
+                     for a, b in offsets], axis=0) * 1.001 + 0.001
+
+    names = _interleave(lng_idx, lat_idx, precision)
+    kth = min(k, len(index)) - 1
+    table = {}
+    for start in range(0, len(names), block):
+        stop = start + block
+        d = haversine(centre_lat[start:stop, None], centre_lng[start:stop, None], index.lats[None, :], index.lngs[None, :])
+        r = radius[start:stop, None]
+        limit = np.partition(d + r, kth, axis=1)[:, kth:kth + 1]
+        candidates = (d - r) <= limit
+        for row in range(d.shape[0]):
+            members = np.flatnonzero(candidates[row])
+            table[names[start + row]] = members[np.argsort(d[row, members], kind="stable")].tolist()
+    return table
@@ -0,0 +1,214 @@
+"""Offline geocoding of business addresses against a postcode centroid dataset.
+
+Everything lives in one SQLite file, .cache/geocode.sqlite:
+
+* ``postcodes``: centroid per full postcode, imported from a local copy of a
+  postcode dataset (ONS Postcode Directory, or any CSV with postcode and
+  latitude/longitude columns; see geocode_businesses.py import);
+* ``districts``: mean centroid per outward code ("LU1"), derived on import;
+* ``geocodes``: the result for every address seen, keyed by the normalised
+  address, city and postcode column, misses included, so an address is
+  resolved once.
+
+An address resolves to the first of: the business's postcode column (full
+postcode, then its district), the postcode in the address (likewise), the
+business's own city, a city named in the address (cities and their centres as
+in src/lib/cityCoordinates.ts). ``Geocode.precision`` says which::
+
+    from lib.geocode import Geocoder
+
+    with Geocoder() as geocoder:
+        geocoder.geocode("12 High St, Luton LU1 3AB")       # Geocode(51.88, -0.41, "postcode", "LU1 3AB")
+        geocoder.geocode_many([(address, city, postcode), ...])   # one cache round trip per batch
+
+Re-importing the postcode dataset clears the geocodes, since better data can
+resolve earlier misses.
+"""
+
+import time
+import sqlite3
+from dataclasses import dataclass
+
+from .env import ROOT
+from .geo import load_city_coordinates
+from .normalize import normalize_address, normalize_name, normalize_postcode, outward_code
+
+DB_PATH = ROOT / ".cache" / "geocode.sqlite"
+SCHEMA_VERSION = 1
+# Bump when cache_key() or the resolution order changes; cached geocodes under
+# other keys are dropped
+KEY_VERSION = 3
+
+# Best first
+PRECISIONS = ("postcode", "district", "city")
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS postcodes (postcode TEXT PRIMARY KEY, lat REAL NOT NULL, lng REAL NOT NULL) WITHOUT ROWID;
+CREATE TABLE IF NOT EXISTS districts (outward TEXT PRIMARY KEY, lat REAL NOT NULL, lng REAL NOT NULL, postcodes INTEGER NOT NULL) WITHOUT ROWID;
+CREATE TABLE IF NOT EXISTS geocodes (
+    key TEXT PRIMARY KEY, lat REAL, lng REAL, precision TEXT, postcode TEXT, resolved_at REAL NOT NULL
+) WITHOUT ROWID;
+CREATE TABLE IF NOT EXISTS meta (name TEXT PRIMARY KEY, value TEXT) WITHOUT ROWID;
+"""
+
+# SQLite's default limit on ? parameters is 999 in older builds
+QUERY_CHUNK = 500
+
+
+@dataclass(frozen=True)
+class Geocode:
+    lat: float
+    lng: float
+    precision: str
+    postcode: str = ""
+
+
+def cache_key(address, city=None, postcode=None):
+    # The postcode column may hold just an outward code ("LU1")
+    code = normalize_postcode(postcode) or outward_code(postcode)
+    return f"{normalize_address(address)}|{normalize_name(city)}|{code}"
+
+
+class Geocoder:
+    def __init__(self, path=DB_PATH, cities=None):
+        path.parent.mkdir(parents=True, exist_ok=True)
+        self.db = sqlite3.connect(path)
+        self.db.executescript(SCHEMA)
+        version = self.db.execute("SELECT value FROM meta WHERE name = 'schema'").fetchone()
+        if version and int(version[0]) != SCHEMA_VERSION:
+            raise ValueError(f"{path} has schema {version[0]}, expected {SCHEMA_VERSION}; delete it and re-import")
+        self.db.execute("INSERT OR REPLACE INTO meta VALUES ('schema', ?)", (str(SCHEMA_VERSION),))
+        keys = self.db.execute("SELECT value FROM meta WHERE name = 'keys'").fetchone()
+        if not keys or int(keys[0]) != KEY_VERSION:
+            self.db.execute("DELETE FROM geocodes")
+            self.db.execute("INSERT OR REPLACE INTO meta VALUES ('keys', ?)", (str(KEY_VERSION),))
+            self.db.commit()
+        cities = load_city_coordinates() if cities is None else cities
+        # Longest names first, so "Newcastle-upon-Tyne" wins over "Newcastle"
+        self._cities = sorted(((normalize_name(name), coords) for name, coords in cities.items()),
+                              key=lambda item: -len(item[0]))
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def close(self):
+        self.db.commit()
+        self.db.close()
+
+    # ------------------------------------------------------------------
+    # Postcode dataset
+    # ------------------------------------------------------------------
+
+    def import_postcodes(self, rows, batch=50000):
+        """Replace the dataset with (postcode, lat, lng) rows."""
+        db = self.db
+        db.execute("DELETE FROM postcodes")
+        pending = []
+        for postcode, lat, lng in rows:
+            postcode = normalize_postcode(postcode)
+            # ONSPD uses 99.999999 for postcodes without a grid reference
+            if not postcode or not -90 <= lat <= 90:
+                continue
+            pending.append((postcode, lat, lng))
+            if len(pending) == batch:
+                db.executemany("INSERT OR REPLACE INTO postcodes VALUES (?, ?, ?)", pending)
+                pending = []
+        db.executemany("INSERT OR REPLACE INTO postcodes VALUES (?, ?, ?)", pending)
+
+        db.execute("DELETE FROM districts")
+        db.execute("""
+            INSERT INTO districts
+            SELECT substr(postcode, 1, instr(postcode, ' ') - 1), avg(lat), avg(lng), count(*)
+            FROM postcodes GROUP BY 1
+        """)
+        db.execute("DELETE FROM geocodes")
+        db.execute("INSERT OR REPLACE INTO meta VALUES ('imported_at', ?)", (str(time.time()),))
+        db.commit()
+
+    def stats(self):
+        db = self.db
+        counts = {table: db.execute(f"SELECT count(*) FROM {table}").fetchone()[0]
+                  for table in ("postcodes", "districts", "geocodes")}
+        counts["by precision"] = dict(db.execute(
+            "SELECT coalesce(precision, 'miss'), count(*) FROM geocodes GROUP BY 1 ORDER BY 2 DESC").fetchall())
+        return counts
+
+    # ------------------------------------------------------------------
+    # Resolution
+    # ------------------------------------------------------------------
+
+    def _lookup(self, table, column, keys):
+        found = {}
+        keys = list(keys)
+        for start in range(0, len(keys), QUERY_CHUNK):
+            chunk = keys[start:start + QUERY_CHUNK]
+            marks = ",".join("?" * len(chunk))
+            for key, lat, lng in self.db.execute(
+                    f"SELECT {column}, lat, lng FROM {table} WHERE {column} IN ({marks})", chunk):
+                found[key] = (lat, lng)
+        return found
+
+    def _city(self, *texts):
+        for text in texts:
+            words = f" {normalize_name(text)} "
+            for name, coords in self._cities:
+                if f" {name} " in words:
+                    return coords
+        return None
+
+    def _resolve(self, items):
+        """{key: Geocode or None} for (key, address, city, postcode) items, without the cache."""
+        # Postcode column first, then the address: [(full postcode, outward code), ...]
+        codes = {key: [(normalize_postcode(text), outward_code(text)) for text in (postcode, address)]
+                 for key, address, _, postcode in items}
+        units = self._lookup("postcodes", "postcode", {p for pairs in codes.values() for p, _ in pairs if p})
+        districts = self._lookup("districts", "outward", {o for pairs in codes.values() for _, o in pairs if o})
+        results = {}
+        for key, address, city, _ in items:
+            # A full postcode from either source beats a district from either
+            pairs = codes[key]
+            postcode = next((p for p, _ in pairs if p), "")
+            result = next((Geocode(*units[p], "postcode", p) for p, _ in pairs if p in units), None)
+            if result is None:
+                result = next((Geocode(*districts[o], "district", p) for p, o in pairs if o in districts), None)
+            if result is None:
+                coords = self._city(city, address)
+                result = Geocode(*coords, "city", postcode) if coords else None
+            results[key] = result
+        return results
+
+    def geocode_many(self, items):
+        """
+        [Geocode or None] for (address, city, postcode) items, in order. Cached results come
+        from one query per chunk; the rest are resolved together and stored in one
+        transaction.
+        """
+        keys = [cache_key(address, city, postcode) for address, city, postcode in items]
+        cached = {}
+        unique = list(dict.fromkeys(keys))
+        for start in range(0, len(unique), QUERY_CHUNK):
+            chunk = unique[start:start + QUERY_CHUNK]
+            marks = ",".join("?" * len(chunk))
+            for key, lat, lng, precision, postcode in self.db.execute(
+                    f"SELECT key, lat, lng, precision, postcode FROM geocodes WHERE key IN ({marks})", chunk):
+                cached[key] = Geocode(lat, lng, precision, postcode or "") if precision else None
+
+        missing = {}
+        for key, (address, city, postcode) in zip(keys, items):
+            if key not in cached and key not in missing:
+                missing[key] = (key, address, city, postcode)
+        if missing:
+            resolved = self._resolve(list(missing.values()))
+            now = time.time()
+            with self.db:
+                self.db.executemany("INSERT OR REPLACE INTO geocodes VALUES (?, ?, ?, ?, ?, ?)", [
+                    (key, g.lat, g.lng, g.precision, g.postcode, now) if g else (key, None, None, None, None, now)
+                    for key, g in resolved.items()])
+            cached.update(resolved)
+        return [cached[key] for key in keys]
+
+    def geocode(self, address, city=None, postcode=None):
+        return self.geocode_many([(address, city, postcode)])[0]
@@ -0,0 +1,181 @@
+"""BM25 retrieval over the chatbot's Q&A knowledge base.
+
+The corpus is scripts/data/qa_corpus.json (see lib.qacorpus), one doc per
+question. build_knowledge_index.py (or export_qa.py) writes the index as
+src/config/knowledge-index.json, which knowledge-base.ts imports, so a chat
+lookup only walks the postings of the query's terms. The index also carries
+each category's safety tips and fallback keywords, which knowledge-base.ts
+serves from it.
+
+The index stores, per term, its IDF and a flat [doc, tf, doc, tf, ...] posting
+list, and per doc its length norm ``k1 * (1 - b + b * len / avglen)``, so a
+doc's score for a query is just::
+
+    sum(idf[t] * tf * (k1 + 1) / (tf + norm[doc]) for each query term t in the doc)
+
+Question words count twice, as a question says what its answer is about.
+``tokenize`` is mirrored in src/lib/knowledge-base.ts; change both together
+(and bump FORMAT_VERSION).
+
+The top hit's category picks the safety tips shown with the answers, unless the
+category keywords disagree and the hit is weak (below ``strong_score``): a
+stray word can rank a drains Q&A first for "I smell gas". The general safety
+protocol (SAFETY_CATEGORY) has no Q&A, so it is only ever reached through its
+keywords, and wins whenever they match.
+"""
+
+import json
+import math
+import re
+
+from .env import ROOT
+
+FORMAT_VERSION = 3
+INDEX_PATH = ROOT / "src" / "config" / "knowledge-index.json"
+
+K1, B = 1.2, 0.75
+QUESTION_WEIGHT = 2
+# Below this a match is a single common word, not an answer to the question
+MIN_SCORE = 3.0
+# Below this the top hit's category gives way to a different keyword category
+STRONG_SCORE = 8.0
+# Keywords-only category with the general safety tips (call 999 etc.)
+SAFETY_CATEGORY = "CORE_PROTOCOL"
+
+WORD_RE = re.compile(r"[a-z0-9]+")
+STOPWORDS = frozenset("""
+a about an and are as at be been but by can could do does for from has have hello hi how i if in into is
+it its just me my need no not of on or our please should so thank thanks that the their them then there
+these they this to was we what when where which who why will with would you your
+""".split())
+
+
+
+def stem(word):
+    """A few English suffix rules: "leaking" -> "leak", "pipes" -> "pipe", "blocked" -> "block"."""
+    if len(word) <= 3 or word.isdigit():
+        return word
+    if word.endswith("ies") and len(word) > 4:
+        return word[:-3] + "y"
+    if word.endswith("sses"):
+        return word[:-2]
+    for suffix in ("ing", "ed"):
+        if word.endswith(suffix) and len(word) - len(suffix) >= 3:
+            word = word[:-len(suffix)]
+            # "stopped" -> "stop", but "fill" and "press" keep their double letter
+            if len(word) > 3 and word[-1] == word[-2] and word[-1] not in "lsz":
+                word = word[:-1]
+            return word
+    if word.endswith("ly") and len(word) > 5:
+        return word[:-2]
+    if word.endswith("s") and not word.endswith(("ss", "us", "is")):
+        return word[:-1]
+    return word
+
+
+def tokenize(text):
+    """Stemmed words of `text` without stopwords, in order (repeats kept)."""
+    return [stem(w) for w in WORD_RE.findall((text or "").lower()) if w not in STOPWORDS]
+
+
+# ----------------------------------------------------------------------
+# Index
+# ----------------------------------------------------------------------
+
+def doc_terms(doc):
+    return tokenize(doc["q"]) * QUESTION_WEIGHT + tokenize(doc["a"])
+
+
+def build_index(corpus, k1=K1, b=B):
+    """The index of a corpus loaded with lib.qacorpus.load_corpus()."""
+    docs = [{"category": chapter["key"], "q": item["q"], "a": item["a"]}
+            for chapter in corpus["chapters"] for item in chapter.get("qa", [])]
+    terms = [doc_terms(doc) for doc in docs]
+    average = sum(map(len, terms)) / len(terms) if terms else 0
+    postings = {}
+    for n, words in enumerate(terms):
+        counts = {}
+        for word in words:
+            counts[word] = counts.get(word, 0) + 1
+        for word, tf in counts.items():
+            postings.setdefault(word, []).extend((n, tf))
+    total = len(docs)
+    index_terms = {}
+    for word in sorted(postings):
+        df = len(postings[word]) // 2
+        idf = math.log(1 + (total - df + 0.5) / (df + 0.5))
+        index_terms[word] = [round(idf, 4), postings[word]]
+    return {
+        "version": FORMAT_VERSION,
+        "k1": k1,
+        "b": b,
+        "min_score": MIN_SCORE,
+        "strong_score": STRONG_SCORE,
+        "categories": {chapter["key"]: {"safety_tips": chapter.get("safety_tips", []),
+                                        "keywords": chapter.get("keywords", [])}
+                       for chapter in corpus["chapters"]},
+        "docs": docs,
+        "norms": [round(k1 * (1 - b + b * len(words) / average), 4) if average else k1 for words in terms],
+        "terms": index_terms,
+    }
+
+
+def write_index(index, path=INDEX_PATH):
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmp = path.with_suffix(".tmp")
+    with open(tmp, "w", encoding="utf-8") as f:
+        json.dump(index, f, ensure_ascii=False, separators=(",", ":"))
+        f.write("\n")
+    tmp.replace(path)
+    return path.stat().st_size
+
+
+class KnowledgeIndex:
+    """Reference implementation of the lookup in searchKnowledgeBase()."""
+
+    def __init__(self, index):
+        if index.get("version") != FORMAT_VERSION:
+            raise ValueError(f"knowledge index version {index.get('version')}, expected {FORMAT_VERSION}")
+        self.index = index
+        self.docs = index["docs"]
+
+    @classmethod
+    def load(cls, path=INDEX_PATH):
+        with open(path, "r", encoding="utf-8") as f:
+            return cls(json.load(f))
+
+    def search(self, query, limit=2):
+        """[(score, doc)] best first, scoring above the index's min_score (all of them if `limit` is None)."""
+        k1, norms, terms = self.index["k1"], self.index["norms"], self.index["terms"]
+        min_score = self.index["min_score"]
+        scores = {}
+        for word in set(tokenize(query)):
+            if word not in terms:
+                continue
+            idf, postings = terms[word]
+            for i in range(0, len(postings), 2):
+                doc, tf = postings[i], postings[i + 1]
+                scores[doc] = scores.get(doc, 0.0) + idf * tf * (k1 + 1) / (tf + norms[doc])
+        ranked = sorted(((s, n) for n, s in scores.items() if s > min_score), key=lambda item: (-item[0], item[1]))
+        return [(round(s, 4), self.docs[n]) for s, n in ranked[:limit]]
+
+    def keyword_category(self, query):
+        """The category with the most keywords in `query`; the safety category wins ties."""
+        lower = query.lower()
+        best, most = None, 0
+        for key, category in self.index["categories"].items():
+            matches = sum(1 for keyword in category["keywords"] if keyword in lower)
+            if matches > most or (matches == most and matches and key == SAFETY_CATEGORY):
+                best, most = key, matches
+        return best
+
+    def answer(self, query, limit=2):
+        """(category, [(score, doc)]): the safety tips' category and the Q&A shown with them."""
+        ranked = self.search(query, None)
+        keyword = self.keyword_category(query)
+        category = ranked[0][1]["category"] if ranked else keyword
+        if keyword and keyword != category and (keyword == SAFETY_CATEGORY or ranked[0][0] < self.index["strong_score"]):
+            category = keyword
+        if ranked and ranked[0][1]["category"] != category:
+            ranked = [(score, doc) for score, doc in ranked if doc["category"] == category]
+        return category, ranked[:limit]
@@ -0,0 +1,557 @@
+"""Parser and in-memory indexes for the static listings in src/lib/businesses.ts.
+
+``businessListings`` is a ~45k line object literal: mostly plain data, plus
+``Array.from({ length: N }, (_, i) => ({ ... }))`` generators that index into
+arrays, use template strings and spread conditional fields. The tokenizer reads
+the literal once and evaluates that small expression subset, so the result is
+the same list of businesses the app sees.
+
+Parsing takes a second or two; the parsed index is pickled to
+``.cache/businesses.ts.pickle`` and reused until the source changes (size and
+mtime, then SHA-256 if only the mtime moved, e.g. after a git checkout)::
+
+    from lib.listings import load_listings
+
+    index = load_listings()
+    index.count(city="luton")
+    index.find(phone="01582 873354")
+"""
+
+import re
+import math
+import pickle
+import hashlib
+
+from .env import ROOT
+from .normalize import normalize_name, normalize_phone
+
+SOURCE_PATH = ROOT / "src" / "lib" / "businesses.ts"
+CACHE_PATH = ROOT / ".cache" / "businesses.ts.pickle"
+# Bump when the parser or index layout changes so old pickles are ignored
+CACHE_VERSION = 2
+
+LISTINGS_START = re.compile(r"export\s+const\s+businessListings\s*(?::\s*\w+\s*)?=\s*\{")
+
+TOKEN_RE = re.compile(r"""
+    (?P<ws>\s+|//[^\n]*|/\*.*?\*/)
+  | (?P<num>(?:\d+\.?\d*|\.\d+)(?:[eE][+-]?\d+)?)
+  | (?P<str>"(?:[^"\\\n]|\\.)*"|'(?:[^'\\\n]|\\.)*')
+  | (?P<name>[A-Za-z_$][\w$]*)
+  | (?P<op>=>|\.\.\.|&&|\|\||\?\?|===|!==|==|!=|<=|>=|[{}\[\](),:.?+\-*/%<>!])
+  | (?P<tpl>`)
+""", re.S | re.X)
+
+ESCAPE_RE = re.compile(r"\\(u\{[0-9a-fA-F]+\}|u[0-9a-fA-F]{4}|x[0-9a-fA-F]{2}|\r\n|.)", re.S)
+ESCAPES = {"n": "\n", "t": "\t", "r": "\r", "b": "\b", "f": "\f", "v": "\v", "0": "\0", "\n": "", "\r\n": ""}
+
+
+class ListingsParseError(ValueError):
+    pass
+
+
+def _unescape(body):
+    def replace(m):
+        esc = m.group(1)
+        if esc[0] in "ux" and len(esc) > 1:
+            return chr(int(esc[1:].strip("{}"), 16))
+        return ESCAPES.get(esc, esc)
+    return ESCAPE_RE.sub(replace, body) if "\\" in body else body
+
+
+def tokenize(text, pos=0, nested=False):
+    """
+    Returns (tokens, end). Tokens are (kind, value) pairs; a template string is
+    ("tpl", [str | token list, ...]). With nested=True, stops at the "}" that
+    closes an enclosing "{" or "${" (end points just past it).
+    """
+    tokens = []
+    depth = 0
+    length = len(text)
+    while pos < length:
+        m = TOKEN_RE.match(text, pos)
+        if not m:
+            line = text.count("\n", 0, pos) + 1
+            raise ListingsParseError(f"unexpected character {text[pos]!r} on line {line}")
+        kind = m.lastgroup
+        pos = m.end()
+        if kind == "ws":
+            continue
+        if kind == "num":
+            raw = m.group()
+            tokens.append(("num", float(raw) if any(c in raw for c in ".eE") else int(raw)))
+        elif kind == "str":
+            tokens.append(("str", _unescape(m.group()[1:-1])))
+        elif kind == "tpl":
+            parts, pos = _template(text, pos)
+            tokens.append(("tpl", parts))
+        else:
+            value = m.group()
+            if kind == "op" and value == "{":
+                depth += 1
+            elif kind == "op" and value == "}":
+                if nested and depth == 0:
+                    return tokens, pos
+                depth -= 1
+            tokens.append((kind, value))
+    if nested:
+        raise ListingsParseError("unterminated object literal")
+    return tokens, pos
+
+
+def _template(text, pos):
+    parts, chunk = [], []
+    while pos < len(text):
+        ch = text[pos]
+        if ch == "`":
+            parts.append(_unescape("".join(chunk)))
+            return parts, pos + 1
+        if ch == "\\":
+            chunk.append(text[pos:pos + 2])
+            pos += 2
+        elif text.startswith("${", pos):
+            parts.append(_unescape("".join(chunk)))
+            chunk = []
+            expr, pos = tokenize(text, pos + 2, nested=True)
+            parts.append(expr)
+        else:
+            chunk.append(ch)
+            pos += 1
+    raise ListingsParseError("unterminated template string")
+
+
+# ----------------------------------------------------------------------
+# Evaluation of the JS subset used in the literal
+# ----------------------------------------------------------------------
+
+def _truthy(value):
+    if value is None or value is False or value == "":
+        return False
+    if isinstance(value, (int, float)) and not isinstance(value, bool):
+        return value != 0 and not math.isnan(value)
+    return True
+
+
+def _js_str(value):
+    if value is None:
+        return "undefined"
+    if value is True or value is False:
+        return "true" if value else "false"
+    if isinstance(value, float) and value.is_integer():
+        return str(int(value))
+    if isinstance(value, list):
+        return ",".join("" if v is None else _js_str(v) for v in value)
+    return str(value)
+
+
+def _array_from(source, fn=None):
+    items = list(range(source["length"])) if isinstance(source, dict) else list(source)
+    if fn is None:
+        return [None if isinstance(source, dict) else v for v in items]
+    return [fn(None if isinstance(source, dict) else v, i) for i, v in enumerate(items)]
+
+
+GLOBALS = {
+    "true": True, "false": False, "null": None, "undefined": None,
+    "Math": {"floor": math.floor, "ceil": math.ceil, "round": lambda x: math.floor(x + 0.5),
+             "min": min, "max": max, "abs": abs},
+    "Array": {"from": _array_from},
+}
+
+
+def _member(obj, name):
+    if isinstance(obj, dict):
+        return obj.get(name)
+    if isinstance(obj, (list, str)):
+        if name == "length":
+            return len(obj)
+        if name == "includes":
+            return lambda v: v in obj
+        if name == "join" and isinstance(obj, list):
+            return lambda sep=",": sep.join(_js_str(v) for v in obj)
+    if isinstance(obj, str):
+        methods = {"toLowerCase": obj.lower, "toUpperCase": obj.upper, "trim": obj.strip}
+        if name in methods:
+            return methods[name]
+    raise ListingsParseError(f"unsupported member .{name} on {type(obj).__name__}")
+
+
+BINARY = {
+    "||": 1, "??": 1, "&&": 2,
+    "===": 3, "!==": 3, "==": 3, "!=": 3,
+    "<": 4, ">": 4, "<=": 4, ">=": 4,
+    "+": 5, "-": 5, "*": 6, "/": 6, "%": 6,
+}
+
+
+def _binary(op, left, right):
+    if op == "+":
+        if isinstance(left, str) or isinstance(right, str):
+            return _js_str(left) + _js_str(right)
+        return left + right
+    if op == "-":
+        return left - right
+    if op == "*":
+        return left * right
+    if op == "/":
+        return left / right
+    if op == "%":
+        return math.fmod(left, right)
+    if op in ("===", "=="):
+        return left == right
+    if op in ("!==", "!="):
+        return left != right
+    return {"<": left < right, ">": left > right, "<=": left <= right, ">=": left >= right}[op]
+
+
+def _value(node, env):
+    const, payload = node
+    return payload if const else payload(env)
+
+
+def _fold(fn, *nodes):
+    """Node for fn(*values): computed now when every input is constant, else per evaluation."""
+    if all(const for const, _ in nodes):
+        return True, fn(*(payload for _, payload in nodes))
+    return False, lambda env: fn(*(_value(n, env) for n in nodes))
+
+
+class _Parser:
+    """
+    Recursive descent parser that compiles to (constant, value-or-closure) nodes.
+    Anything not depending on an arrow function parameter is evaluated while
+    parsing, so plain data costs one pass and a generator body is parsed once,
+    not once per element.
+    """
+
+    def __init__(self, tokens):
+        self.tokens = tokens
+        self.pos = 0
+        self.bound = ()
+
+    def parse(self):
+        node = self.expression()
+        if self.pos != len(self.tokens):
+            raise ListingsParseError(f"unexpected token {self.peek()!r}")
+        return _value(node, {})
+
+    def peek(self, offset=0):
+        i = self.pos + offset
+        return self.tokens[i] if i < len(self.tokens) else (None, None)
+
+    def take(self, value=None):
+        token = self.peek()
+        if value is not None and token[1] != value:
+            raise ListingsParseError(f"expected {value!r}, got {token[1]!r}")
+        self.pos += 1
+        return token
+
+    def accept(self, value):
+        if self.peek() == ("op", value):
+            self.pos += 1
+            return True
+        return False
+
+    def expression(self, min_prec=0):
+        if self._arrow_ahead():
+            return self.arrow()
+        left = self.unary()
+        while True:
+            kind, op = self.peek()
+            if kind == "op" and op == "?" and min_prec == 0:
+                self.pos += 1
+                then = self.expression()
+                self.take(":")
+                other = self.expression()
+                left = _fold(lambda c, a, b: a if _truthy(c) else b, left, then, other)
+                continue
+            prec = BINARY.get(op) if kind == "op" else None
+            if prec is None or prec <= min_prec:
+                return left
+            self.pos += 1
+            right = self.expression(prec)
+            if op == "&&":
+                left = _fold(lambda a, b: b if _truthy(a) else a, left, right)
+            elif op == "||":
+                left = _fold(lambda a, b: a if _truthy(a) else b, left, right)
+            elif op == "??":
+                left = _fold(lambda a, b: b if a is None else a, left, right)
+            else:
+                left = _fold(lambda a, b, op=op: _binary(op, a, b), left, right)
+
+    def unary(self):
+        if self.accept("!"):
+            return _fold(lambda v: not _truthy(v), self.unary())
+        if self.accept("-"):
+            return _fold(lambda v: -v, self.unary())
+        if self.accept("+"):
+            return self.unary()
+        return self.postfix(self.primary())
+
+    def postfix(self, node):
+        while True:
+            if self.accept("."):
+                name = self.take()[1]
+                node = _fold(lambda obj, name=name: _member(obj, name), node)
+            elif self.accept("["):
+                key = self.expression()
+                self.take("]")
+                node = _fold(_index, node, key)
+            elif self.peek() == ("op", "("):
+                node = _fold(lambda fn, *args: fn(*args), node, *self.arguments())
+            else:
+                return node
+
+    def arguments(self):
+        self.take("(")
+        args = []
+        while not self.accept(")"):
+            args.append(self.expression())
+            if not self.accept(","):
+                self.take(")")
+                break
+        return args
+
+    def primary(self):
+        kind, value = self.take()
+        if kind in ("num", "str"):
+            return True, value
+        if kind == "tpl":
+            parts = []
+            for part in value:
+                if isinstance(part, str):
+                    parts.append((True, part))
+                else:
+                    sub = _Parser(part)
+                    sub.bound = self.bound
+                    parts.append(sub.expression())
+            return _fold(lambda *values: "".join(v if isinstance(v, str) else _js_str(v) for v in values), *parts)
+        if kind == "name":
+            return self.name(value)
+        if value == "(":
+            inner = self.expression()
+            self.take(")")
+            return inner
+        if value == "[":
+            return self.array()
+        if value == "{":
+            return self.object()
+        raise ListingsParseError(f"unexpected token {value!r}")
+
+    def name(self, name):
+        if name in self.bound:
+            return False, lambda env: env[name]
+        if name in GLOBALS:
+            return True, GLOBALS[name]
+        raise ListingsParseError(f"unknown identifier {name!r}")
+
+    def array(self):
+        items, spread = [], []
+        while not self.accept("]"):
+            spread.append(self.accept("..."))
+            items.append(self.expression())
+            if not self.accept(","):
+                self.take("]")
+                break
+
+        def build(*values):
+            out = []
+            for is_spread, v in zip(spread, values):
+                if is_spread:
+                    out.extend(v)
+                else:
+                    out.append(v)
+            return out
+        return _fold(build, *items)
+
+    def object(self):
+        keys, nodes = [], []
+        while not self.accept("}"):
+            if self.accept("..."):
+                keys.append(None)
+                nodes.append(self.expression())
+            else:
+                kind, key = self.take()
+                if kind not in ("name", "str", "num"):
+                    raise ListingsParseError(f"bad object key {key!r}")
+                keys.append(_js_str(key))
+                nodes.append(self.expression() if self.accept(":") else self.name(key))
+            if not self.accept(","):
+                self.take("}")
+                break
+
+        def build(*values):
+            obj = {}
+            for key, v in zip(keys, values):
+                if key is not None:
+                    obj[key] = v
+                elif isinstance(v, dict):
+                    obj.update(v)
+            return obj
+        return _fold(build, *nodes)
+
+    def _arrow_ahead(self):
+        kind, value = self.peek()
+        if kind == "name":
+            return self.peek(1) == ("op", "=>")
+        if value != "(":
+            return False
+        i = self.pos + 1
+        while i < len(self.tokens) and (self.tokens[i][0] == "name" or self.tokens[i] == ("op", ",")):
+            i += 1
+        return self.tokens[i:i + 2] == [("op", ")"), ("op", "=>")]
+
+    def arrow(self):
+        params = []
+        if self.peek()[0] == "name":
+            params.append(self.take()[1])
+        else:
+            self.take("(")
+            while not self.accept(")"):
+                params.append(self.take()[1])
+                self.accept(",")
+        self.take("=>")
+        outer = self.bound
+        self.bound = tuple(outer) + tuple(params)
+        body = self.expression()
+        self.bound = outer
+
+        def make(env):
+            return lambda *args: _value(body, dict(env, **dict(zip(params, args))))
+        # A top-level arrow closes over nothing, so it is a constant and calls
+        # such as Array.from(...) on it are evaluated right here
+        if not outer:
+            return True, make({})
+        return False, make
+
+
+def _index(obj, key):
+    if isinstance(obj, (list, str)):
+        i = int(key)
+        return obj[i] if 0 <= i < len(obj) else None
+    return _member(obj, _js_str(key))
+
+
+def parse_listings(text):
+    """{city: {trade: [business, ...]}} from the source of businesses.ts."""
+    m = LISTINGS_START.search(text)
+    if not m:
+        raise ListingsParseError("businessListings literal not found")
+    tokens, _ = tokenize(text, m.end(), nested=True)
+    return _Parser([("op", "{")] + tokens + [("op", "}")]).parse()
+
+
+# ----------------------------------------------------------------------
+# Indexes
+# ----------------------------------------------------------------------
+
+def listing_key(value):
+    """Same normalisation as getBusinessListings() for city and trade keys."""
+    return re.sub(r"\s+", "-", value.strip().lower())
+
+
+class ListingIndex:
+    """Flat list of (city, trade, business) records with lookup indexes over it."""
+
+    def __init__(self, listings):
+        self.listings = listings
+        self.records = []
+        self.by_city, self.by_trade = {}, {}
+        self.by_phone, self.by_name, self.by_id = {}, {}, {}
+        for city, trades in listings.items():
+            for trade, businesses in trades.items():
+                for business in businesses:
+                    i = len(self.records)
+                    self.records.append((city, trade, business))
+                    self.by_city.setdefault(city, []).append(i)
+                    self.by_trade.setdefault(trade, []).append(i)
+                    self.by_id.setdefault(business.get("id"), []).append(i)
+                    phone = normalize_phone(business.get("phone"))
+                    if phone:
+                        self.by_phone.setdefault(phone, []).append(i)
+                    name = normalize_name(business.get("name"))
+                    if name:
+                        self.by_name.setdefault(name, []).append(i)
+
+    def __len__(self):
+        return len(self.records)
+
+    def _select(self, city=None, trade=None, phone=None, name=None):
+        candidates = []
+        if city is not None:
+            candidates.append(self.by_city.get(listing_key(city), []))
+        if trade is not None:
+            candidates.append(self.by_trade.get(listing_key(trade), []))
+        if phone is not None:
+            candidates.append(self.by_phone.get(normalize_phone(phone), []))
+        if name is not None:
+            candidates.append(self.by_name.get(normalize_name(name), []))
+        if not candidates:
+            return range(len(self.records))
+        candidates.sort(key=len)
+        hits = set(candidates[0]).intersection(*candidates[1:])
+        return sorted(hits)
+
+    def find(self, city=None, trade=None, phone=None, name=None):
+        """Records matching every given criterion (all records when none given)."""
+        return [self.records[i] for i in self._select(city, trade, phone, name)]
+
+    def count(self, city=None, trade=None):
+        if city is not None and trade is not None:
+            return len(self.listings.get(listing_key(city), {}).get(listing_key(trade), []))
+        return len(self._select(city, trade))
+
+    def get(self, business_id):
+        """First (city, trade, business) with this id, like getBusinessById()."""
+        hits = self.by_id.get(business_id)
+        return self.records[hits[0]] if hits else None
+
+    def coverage(self):
+        """{city: {trade: count}}"""
+        return {city: {trade: len(rows) for trade, rows in trades.items()}
+                for city, trades in self.listings.items()}
+
+    def duplicates(self, field="id"):
+        """Keys shared by more than one record, for id, phone or name."""
+        index = {"id": self.by_id, "phone": self.by_phone, "name": self.by_name}[field]
+        return {key: [self.records[i] for i in hits] for key, hits in index.items() if len(hits) > 1}
+
+
+# ----------------------------------------------------------------------
+# Cached loading
+# ----------------------------------------------------------------------
+
+def _sha256(path):
+    return hashlib.sha256(path.read_bytes()).hexdigest()
+
+
+def load_listings(path=SOURCE_PATH, cache_path=CACHE_PATH, use_cache=True):
+    """ListingIndex for `path`, from the pickle sidecar when the source hasn't changed."""
+    stat = path.stat()
+    cached = None
+    if use_cache and cache_path.exists():
+        try:
+            with open(cache_path, "rb") as f:
+                cached = pickle.load(f)
+        except (OSError, pickle.UnpicklingError, EOFError, AttributeError, ImportError):
+            cached = None
+        if not isinstance(cached, dict) or cached.get("version") != CACHE_VERSION or cached.get("source") != str(path):
+            cached = None
+
+    if cached and cached["size"] == stat.st_size and cached["mtime_ns"] == stat.st_mtime_ns:
+        return cached["index"]
+
+    digest = _sha256(path)
+    if cached and cached["sha256"] == digest:
+        index = cached["index"]
+    else:
+        index = ListingIndex(parse_listings(path.read_text(encoding="utf-8")))
+
+    if use_cache:
+        cache_path.parent.mkdir(parents=True, exist_ok=True)
+        tmp = cache_path.with_suffix(".tmp")
+        with open(tmp, "wb") as f:
+            pickle.dump({"version": CACHE_VERSION, "source": str(path), "size": stat.st_size,
+                         "mtime_ns": stat.st_mtime_ns, "sha256": digest, "index": index},
+                        f, protocol=pickle.HIGHEST_PROTOCOL)
+        tmp.replace(cache_path)
+    return index
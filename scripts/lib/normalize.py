@@ -0,0 +1,108 @@
+"""Normalisation of business names, UK phone numbers, websites, postcodes and
+addresses, so listings from different sources (static data, dev, prod, Google
+Places) compare equal."""
+
+import re
+from urllib.parse import urlsplit
+
+EXTENSION_RE = re.compile(r"\s*(?:ext\.?|extension|x|#)\s*\d+\s*$", re.I)
+# Outward code (area + district, e.g. "LU1", "SW1A", "M60") and inward code ("3AB")
+POSTCODE_RE = re.compile(r"\b([A-Z]{1,2}[0-9][A-Z0-9]?)\s*([0-9][A-Z]{2})\b")
+OUTWARD_RE = re.compile(r"\b([A-Z]{1,2}[0-9][A-Z0-9]?)\s*$")
+
+ADDRESS_ABBREVIATIONS = {
+    "rd": "road", "st": "street", "ave": "avenue", "av": "avenue", "ln": "lane", "dr": "drive",
+    "ct": "court", "cres": "crescent", "pl": "place", "sq": "square", "gdns": "gardens", "tce": "terrace",
+    "ind": "industrial", "est": "estate", "bldg": "building", "blvd": "boulevard",
+}
+
+# Words that say nothing about which business it is (singular: matched after
+# the plural "s" is dropped)
+NAME_STOPWORDS = frozenset({
+    "the", "and", "of", "ltd", "limited", "llp", "plc", "co", "uk", "company",
+    "service", "solution", "group", "emergency", "24", "7", "247", "hour",
+})
+
+
+def normalize_phone(phone):
+    """
+    UK numbers in national format, digits only:
+    "+44 (0)20 7946 0000", "0044 20 7946 0000", "020-7946-0000 ext 12" -> "02079460000".
+    Anything that doesn't look like a UK number comes back as its digits.
+    """
+    text = EXTENSION_RE.sub("", phone or "")
+    digits = re.sub(r"\D", "", text)
+    if digits.startswith("00"):
+        digits = digits[2:]
+    if digits.startswith("44") and len(digits) >= 12:
+        digits = digits[2:]
+        if digits.startswith("0"):
+            # "+44 (0)20 ..." written with the trunk prefix kept
+            digits = digits[1:]
+        return "0" + digits
+    if len(digits) == 10 and not digits.startswith("0"):
+        # Leading 0 lost, usually by a spreadsheet
+        return "0" + digits
+    return digits
+
+
+def phone_prefix(phone, length=5):
+    """Area code sized prefix of a normalised number ("01582873354" -> "01582"), or ""."""
+    return phone[:length] if len(phone) >= 10 else ""
+
+
+def normalize_name(name):
+    """Lowercase words without punctuation, '&' as 'and': "Luton Lock & Key" -> "luton lock and key"."""
+    text = (name or "").lower().replace("&", " and ")
+    return " ".join(re.sub(r"[^a-z0-9]+", " ", text).split())
+
+
+def name_words(name):
+    """Normalised words with a plural "s" dropped, so "Locksmiths" == "Locksmith"."""
+    words = []
+    for word in normalize_name(name).split():
+        if len(word) > 3 and word.endswith("s") and not word.endswith("ss"):
+            word = word[:-1]
+        words.append(word)
+    return words
+
+
+def name_tokens(name, extra_stopwords=()):
+    """Distinguishing words of a name: name_words() without "Ltd", "Services" or `extra_stopwords`."""
+    stop = NAME_STOPWORDS.union(extra_stopwords)
+    return frozenset(w for w in name_words(name) if w not in stop)
+
+
+def website_domain(url):
+    """"https://www.Example.co.uk/contact" -> "example.co.uk"; "" when there is none."""
+    if not url:
+        return ""
+    host = urlsplit(url if "//" in url else "//" + url).hostname or ""
+    return host[4:] if host.startswith("www.") else host
+
+
+def normalize_postcode(text):
+    """The first full UK postcode in `text`, as "LU1 3AB"; "" when there is none."""
+    match = POSTCODE_RE.search((text or "").upper())
+    return f"{match.group(1)} {match.group(2)}" if match else ""
+
+
+def outward_code(text):
+    """
+    Postcode district: of the full postcode in `text` ("LU1 3AB" -> "LU1"), or a
+    bare outward code ending the text ("High St, Luton LU1" -> "LU1"); "" otherwise.
+    """
+    postcode = normalize_postcode(text)
+    if postcode:
+        return postcode.split()[0]
+    match = OUTWARD_RE.search((text or "").upper())
+    return match.group(1) if match else ""
+
+
+def normalize_address(address):
+    """
+    Lowercase words without punctuation and with common street abbreviations
+    spelled out: "12 High St., Luton" -> "12 high street luton".
+    """
+    words = normalize_name(address).split()
+    return " ".join(ADDRESS_ABBREVIATIONS.get(w, w) for w in words)
@@ -0,0 +1,255 @@
+"""Declarative, all-or-nothing source patching for the one-off fix scripts.
+
+Queue every replacement first, then apply them together::
+
+    from lib.patch import PatchSet
+
+    patches = PatchSet()
+    patches.replace("src/pages/Index.tsx", "mb-6 animate-in", "mb-2 -mt-10 animate-in")
+    patches.sub("src/pages/TradeCityPage.tsx", r'<Link\\s+to="/contact"', '<a href="#services"', expect=1)
+    patches.apply()          # or apply(dry_run=True) to only report
+
+Each file is read once and every rule sees the original text (a rule cannot
+match another rule's output; queue that in a second PatchSet). Rules without
+capture groups run in a single pass, compiled into one alternation; if any rule
+has groups, each rule scans the text on its own and the matches are merged. Every
+rule must hit the expected number of times (default: at least once), otherwise
+PatchError is raised before anything is written. A literal replacement whose
+new text is already there and whose old text is gone counts as already applied,
+so scripts can be re-run.
+
+Files are written to temp files next to the originals and renamed into place
+only when all of them were written; a failed rename restores the files already
+replaced. A file whose bytes no longer hash to what was loaded (edited since)
+fails the commit before anything is written.
+"""
+
+import os
+import re
+import difflib
+import hashlib
+import tempfile
+from pathlib import Path
+
+from .env import ROOT
+
+BOM = "\ufeff"
+
+
+class PatchError(Exception):
+    def __init__(self, message, report=None):
+        super().__init__(message)
+        self.report = report
+
+
+class Rule:
+    def __init__(self, pattern, replacement, regex=False, flags=0, expect=None, optional=False, name=None):
+        self.pattern = pattern
+        self.replacement = replacement
+        self.regex = regex
+        self.flags = flags
+        self.expect = expect
+        self.optional = optional
+        self.name = name or (pattern if len(pattern) <= 60 else pattern[:57] + "...")
+        self.compiled = re.compile(pattern if regex else re.escape(pattern), flags)
+        self.hits = 0
+        self.already_applied = False
+
+    def source(self, group):
+        """This rule as a named branch of the combined pattern, with its flags scoped to it."""
+        inline = "".join(ch for flag, ch in ((re.I, "i"), (re.M, "m"), (re.S, "s"), (re.X, "x"))
+                         if self.flags & flag)
+        body = self.compiled.pattern
+        return f"(?P<{group}>(?{inline}:{body}))" if inline else f"(?P<{group}>{body})"
+
+    def expand(self, text, match):
+        if not self.regex:
+            return self.replacement
+        # Re-match on the same span so the rule's own group numbers and names apply
+        own = self.compiled.fullmatch(text, match.start(), match.end())
+        if callable(self.replacement):
+            return self.replacement(own)
+        return own.expand(self.replacement)
+
+    def problem(self, text):
+        """Why this rule's hit count is unacceptable, or None."""
+        if self.hits == 0:
+            if self.optional:
+                return None
+            if (not self.regex and self.replacement and self.pattern not in self.replacement
+                    and self.replacement in text):
+                self.already_applied = True
+                return None
+            return "pattern not found"
+        if self.expect is not None and self.hits != self.expect:
+            return f"expected {self.expect} matches, found {self.hits}"
+        return None
+
+
+class FilePatch:
+    def __init__(self, path):
+        self.path = path
+        self.rules = []
+        self.original = None
+        self.result = None
+        self.bom = False
+        self.stat = None
+        self.digest = None
+
+    def load(self):
+        raw = self.path.read_bytes()
+        self.stat = os.stat(self.path)
+        self.digest = hashlib.sha256(raw).hexdigest()
+        text = raw.decode("utf-8")
+        self.bom = text.startswith(BOM)
+        # newline handling is left alone: CRLF files stay CRLF
+        self.original = text[1:] if self.bom else text
+
+    def run(self):
+        text = self.original
+        for rule in self.rules:
+            rule.hits, rule.already_applied = 0, False
+        # Wrapping a rule in the combined pattern renumbers its groups, which breaks
+        # backreferences inside the pattern (\1, (?(1)...)). Such rules, and patterns
+        # that can't be combined (e.g. global inline flags), merge separate scans
+        # instead: same leftmost, first-rule-wins result, one scan per rule
+        if any(rule.compiled.groups for rule in self.rules):
+            self.result = self._run_separately(text)
+            return
+        try:
+            combined = re.compile("|".join(rule.source(f"r{i}") for i, rule in enumerate(self.rules)))
+        except re.error:
+            self.result = self._run_separately(text)
+            return
+
+        def replace(match):
+            rule = self.rules[int(match.lastgroup[1:])]
+            rule.hits += 1
+            return rule.expand(text, match)
+
+        self.result = combined.sub(replace, text)
+
+    def _run_separately(self, text):
+        matches = sorted((m.start(), i, m) for i, rule in enumerate(self.rules)
+                         for m in rule.compiled.finditer(text))
+        out, pos = [], 0
+        for start, i, match in matches:
+            if start < pos:
+                continue
+            rule = self.rules[i]
+            rule.hits += 1
+            out.append(text[pos:start])
+            out.append(rule.expand(text, match))
+            pos = match.end()
+        out.append(text[pos:])
+        return "".join(out)
+
+    @property
+    def changed(self):
+        return self.result is not None and self.result != self.original
+
+    def diff(self, root):
+        name = self.path.relative_to(root).as_posix() if self.path.is_relative_to(root) else str(self.path)
+        return "".join(difflib.unified_diff(self.original.splitlines(True), self.result.splitlines(True),
+                                            f"a/{name}", f"b/{name}"))
+
+
+class PatchSet:
+    def __init__(self, root=ROOT):
+        self.root = Path(root).resolve()
+        self.files = {}
+
+    def _file(self, path):
+        path = Path(path)
+        path = (path if path.is_absolute() else self.root / path).resolve()
+        if path not in self.files:
+            self.files[path] = FilePatch(path)
+        return self.files[path]
+
+    def replace(self, path, old, new, expect=None, optional=False, name=None):
+        """Queue a literal replacement of every occurrence of `old`."""
+        if not old:
+            raise ValueError("empty pattern")
+        self._file(path).rules.append(Rule(old, new, False, 0, expect, optional, name))
+        return self
+
+    def sub(self, path, pattern, repl, flags=0, expect=None, optional=False, name=None):
+        """Queue a regex substitution; `repl` may use the pattern's groups or be a callable."""
+        self._file(path).rules.append(Rule(pattern, repl, True, flags, expect, optional, name))
+        return self
+
+    def plan(self):
+        """Load and patch every file in memory. Returns the report; raises PatchError on any miss."""
+        report, problems = [], []
+        for patch in self.files.values():
+            try:
+                patch.load()
+            except (OSError, UnicodeDecodeError) as e:
+                problems.append(f"{patch.path}: {e}")
+                continue
+            patch.run()
+            for rule in patch.rules:
+                problem = rule.problem(patch.original)
+                status = problem or ("already applied" if rule.already_applied
+                                     else "ok" if rule.hits else "none (optional)")
+                report.append({"file": patch.path, "rule": rule.name, "hits": rule.hits, "status": status})
+                if problem:
+                    problems.append(f"{patch.path}: {rule.name!r}: {problem}")
+        if problems:
+            raise PatchError("Patch aborted, nothing written:\n  " + "\n  ".join(problems), report)
+        return report
+
+    def apply(self, dry_run=False, show_diff=False, quiet=False):
+        """plan(), then write every changed file atomically. Returns the report."""
+        log = (lambda *a: None) if quiet else print
+        report = self.plan()
+        for entry in report:
+            name = entry["file"].relative_to(self.root) if entry["file"].is_relative_to(self.root) else entry["file"]
+            log(f"  {entry['hits']:>4}  {entry['status']:<16} {name}: {entry['rule']}")
+
+        changed = [p for p in self.files.values() if p.changed]
+        if show_diff:
+            for patch in changed:
+                log(patch.diff(self.root))
+        if dry_run:
+            log(f"Dry run: {len(changed)} of {len(self.files)} files would change.")
+            return report
+        commit(changed)
+        log(f"Patched {len(changed)} of {len(self.files)} files.")
+        return report
+
+
+def commit(patches):
+    """Write all patched files or none: temp files first, then renames, undone on failure."""
+    staged = []
+    try:
+        for patch in patches:
+            current = os.stat(patch.path)
+            if ((current.st_size, current.st_mtime_ns) != (patch.stat.st_size, patch.stat.st_mtime_ns)
+                    or hashlib.sha256(patch.path.read_bytes()).hexdigest() != patch.digest):
+                raise PatchError(f"{patch.path} changed on disk while patching")
+            fd, tmp = tempfile.mkstemp(dir=patch.path.parent, prefix=f".{patch.path.name}.", suffix=".tmp")
+            with os.fdopen(fd, "w", encoding="utf-8", newline="") as f:
+                f.write((BOM if patch.bom else "") + patch.result)
+                f.flush()
+                os.fsync(f.fileno())
+            os.chmod(tmp, patch.stat.st_mode & 0o7777)
+            staged.append((patch, tmp))
+    except BaseException:
+        for _, tmp in staged:
+            os.unlink(tmp)
+        raise
+
+    replaced = []
+    try:
+        for patch, tmp in staged:
+            os.replace(tmp, patch.path)
+            replaced.append(patch)
+    except BaseException:
+        for patch in replaced:
+            with open(patch.path, "w", encoding="utf-8", newline="") as f:
+                f.write((BOM if patch.bom else "") + patch.original)
+        for patch, tmp in staged[len(replaced):]:
+            if os.path.exists(tmp):
+                os.unlink(tmp)
+        raise
@@ -0,0 +1,268 @@
+"""The trades Q&A corpus and its exports.
+
+scripts/data/qa_corpus.json is the one copy of the Q&A, safety tips and
+keywords per trade. export_qa.py renders it as:
+
+* the master Q&A PDF (formerly generate_qa_pdf.py, with the data inline);
+* the chatbot's knowledge index, src/config/knowledge-index.json (lib.knowledge);
+* Q&A intents for the voice agent, src/voice-agent/qa-intents.json.
+
+The PDF is built incrementally. Each chapter is laid out on its own (lines
+wrapped and placed on pages) into a fragment cached under .cache/qa_export/,
+named by the hash of the chapter's number, title and Q&A. Assembling the PDF
+only replays the fragments' lines, so after an edit only the chapters that
+changed are laid out again, and if nothing changed the PDF is not written at
+all. Page numbers are stamped at assembly, so a chapter growing a page does not
+invalidate the ones after it.
+
+The corpus format::
+
+    {"title": "...",
+     "chapters": [{"key": "ELECTRICAL", "title": "ELECTRICAL (...)", "route_key": "electrician",
+                   "safety_tips": [...], "keywords": [...], "qa": [{"q": "...", "a": "..."}, ...]}, ...]}
+
+``key`` is the chatbot category, ``route_key`` the voice agent's route (see
+src/voice-agent/routes.json). Chapters without Q&A are left out of the PDF.
+"""
+
+import json
+import pathlib
+
+from .env import ROOT
+from .fingerprint import row_hash
+from .knowledge import STOPWORDS, WORD_RE
+
+CORPUS_PATH = ROOT / "scripts" / "data" / "qa_corpus.json"
+INTENTS_PATH = ROOT / "src" / "voice-agent" / "qa-intents.json"
+CACHE_DIR = ROOT / ".cache" / "qa_export"
+PDF_PATH = pathlib.Path("UK_Trades_QA_Master_List.pdf")
+
+# Bump when the layout below changes, so cached fragments are laid out again
+LAYOUT_VERSION = 1
+
+# A4 in mm, FPDF's default 10 mm margins
+PAGE_HEIGHT = 297
+MARGIN = 10
+BODY_WIDTH = 190
+CELL_MARGIN = 1
+BODY_TOP = 25       # below the page header
+BODY_BOTTOM = PAGE_HEIGHT - 15
+FONT = "Helvetica"
+
+
+def load_corpus(path=CORPUS_PATH):
+    with open(path, "r", encoding="utf-8") as f:
+        corpus = json.load(f)
+    keys = set()
+    for chapter in corpus.get("chapters", []):
+        key = chapter.get("key")
+        if not key or not chapter.get("title"):
+            raise ValueError(f"{path}: every chapter needs a key and a title")
+        if key in keys:
+            raise ValueError(f"{path}: chapter {key} appears twice")
+        keys.add(key)
+        for item in chapter.get("qa", []):
+            if not item.get("q") or not item.get("a"):
+                raise ValueError(f"{path}: {key} has a Q&A without a question or answer")
+    return corpus
+
+
+def write_json(data, path, indent=None):
+    """Write `data` to `path` unless it already holds it. True if written."""
+    text = json.dumps(data, ensure_ascii=False, indent=indent,
+                      separators=None if indent else (",", ":")) + "\n"
+    try:
+        if path.read_text(encoding="utf-8") == text:
+            return False
+    except OSError:
+        pass
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmp = path.with_suffix(".tmp")
+    tmp.write_text(text, encoding="utf-8")
+    tmp.replace(path)
+    return True
+
+
+# ----------------------------------------------------------------------
+# Voice agent
+# ----------------------------------------------------------------------
+
+def question_keywords(question):
+    # Plain words, not stems: the voice agent matches keywords as substrings
+    return list(dict.fromkeys(w for w in WORD_RE.findall(question.lower()) if w not in STOPWORDS))
+
+
+def build_intents(corpus):
+    """Q&A intents in the shape of src/voice-agent/intents.json, one per question."""
+    intents = []
+    for chapter in corpus["chapters"]:
+        route = chapter.get("route_key")
+        for n, item in enumerate(chapter.get("qa", []), 1):
+            intent = {"id": f"{(route or chapter['key']).lower()}_qa_{n:02d}",
+                      "keywords": question_keywords(item["q"])}
+            if route:
+                intent["route_key"] = route
+            intent["question"] = item["q"]
+            intent["answer"] = item["a"]
+            intents.append(intent)
+    return {"intents": intents}
+
+
+# ----------------------------------------------------------------------
+# PDF
+# ----------------------------------------------------------------------
+
+def pdf_chapters(corpus):
+    """[(heading, qa)] of the chapters the PDF shows, numbered."""
+    chapters = [c for c in corpus["chapters"] if c.get("qa")]
+    return [(f"{n}. {c['title']}", c["qa"]) for n, c in enumerate(chapters, 1)]
+
+
+def chapter_hash(heading, qa):
+    return row_hash({"layout": LAYOUT_VERSION, "heading": heading, "qa": qa}, ("layout", "heading", "qa"))
+
+
+def _fpdf():
+    from fpdf import FPDF
+    return FPDF
+
+
+def _wrap(pdf, text, width):
+    """Lines of `text` no wider than `width` at the current font, broken at spaces."""
+    lines = []
+    for paragraph in text.split("\n"):
+        line = ""
+        for word in paragraph.split(" "):
+            candidate = f"{line} {word}" if line else word
+            if pdf.get_string_width(candidate) <= width:
+                line = candidate
+                continue
+            if line:
+                lines.append(line)
+            # A word wider than the line is split where it overflows
+            while pdf.get_string_width(word) > width:
+                cut = len(word) - 1
+                while cut > 1 and pdf.get_string_width(word[:cut]) > width:
+                    cut -= 1
+                lines.append(word[:cut])
+                word = word[cut:]
+            line = word
+        lines.append(line)
+    return lines
+
+
+def layout_chapter(pdf, heading, qa):
+    """
+    The chapter's pages, each a list of [style, size, y, height, text, fill]
+    lines, as the old script's add_page/chapter_title/add_qa calls placed them.
+    `pdf` is only used for string widths.
+    """
+    pages = [[]]
+    y = BODY_TOP
+
+    def place(style, size, height, text, fill=0):
+        nonlocal y
+        if y + height > BODY_BOTTOM:
+            pages.append([])
+            y = BODY_TOP
+        pages[-1].append([style, size, round(y, 3), height, text, fill])
+        y += height
+
+    place("B", 14, 10, heading, 1)
+    y += 5
+    width = BODY_WIDTH - 2 * CELL_MARGIN
+    for item in qa:
+        pdf.set_font(FONT, "B", 10)
+        for line in _wrap(pdf, f"Q: {item['q']}", width):
+            place("B", 10, 5, line)
+        pdf.set_font(FONT, "", 10)
+        for line in _wrap(pdf, f"A: {item['a']}", width):
+            place("", 10, 5, line)
+        y += 3
+    return pages
+
+
+def _document(title):
+    FPDF = _fpdf()
+
+    class QADocument(FPDF):
+        def header(self):
+            self.set_font(FONT, "B", 12)
+            self.cell(0, 10, title, 0, 1, "C")
+            self.ln(5)
+
+        def footer(self):
+            self.set_y(-15)
+            self.set_font(FONT, "I", 8)
+            self.cell(0, 10, f"Page {self.page_no()}", 0, 0, "C")
+
+    pdf = QADocument()
+    pdf.set_auto_page_break(False)
+    pdf.set_fill_color(220, 220, 220)
+    return pdf
+
+
+def _read_fragment(path):
+    try:
+        with open(path, "r", encoding="utf-8") as f:
+            return json.load(f)["pages"]
+    except (OSError, ValueError, KeyError):
+        return None
+
+
+def export_pdf(corpus, output=PDF_PATH, cache_dir=CACHE_DIR, force=False):
+    """
+    Write the PDF from cached chapter fragments, laying out only the chapters
+    whose hash has no fragment yet. Returns counts: chapters, laid_out, pages,
+    and written (False when the PDF already matched the corpus).
+    """
+    chapters = pdf_chapters(corpus)
+    hashes = [chapter_hash(heading, qa) for heading, qa in chapters]
+    fragments_dir = cache_dir / "chapters"
+    fragments_dir.mkdir(parents=True, exist_ok=True)
+
+    fragments, laid_out, scratch = [], 0, None
+    for (heading, qa), digest in zip(chapters, hashes):
+        path = fragments_dir / f"{digest}.json"
+        pages = None if force else _read_fragment(path)
+        if pages is None:
+            if scratch is None:
+                scratch = _fpdf()()
+            pages = layout_chapter(scratch, heading, qa)
+            write_json({"heading": heading, "pages": pages}, path)
+            laid_out += 1
+        fragments.append(pages)
+    stats = {"chapters": len(chapters), "laid_out": laid_out, "pages": sum(map(len, fragments)), "written": False}
+
+    # The whole document's hash; an unchanged PDF is left alone
+    document = row_hash({"title": corpus.get("title", ""), "chapters": hashes}, ("title", "chapters"))
+    manifest_path = cache_dir / "pdf.json"
+    try:
+        with open(manifest_path, "r", encoding="utf-8") as f:
+            manifest = json.load(f)
+    except (OSError, ValueError):
+        manifest = {}
+    target = str(output.resolve())
+    if not force and output.exists() and manifest.get(target) == [document, output.stat().st_size]:
+        return stats
+
+    pdf = _document(corpus.get("title", ""))
+    for pages in fragments:
+        for lines in pages:
+            pdf.add_page()
+            for style, size, y, height, text, fill in lines:
+                pdf.set_font(FONT, style, size)
+                pdf.set_xy(MARGIN, y)
+                pdf.cell(0, height, text, 0, 0, "L", fill)
+    output.parent.mkdir(parents=True, exist_ok=True)
+    pdf.output(str(output))
+
+    manifest[target] = [document, output.stat().st_size]
+    write_json(manifest, manifest_path)
+    # Fragments of old chapter versions are no longer reachable
+    keep = {f"{digest}.json" for digest in hashes}
+    for path in fragments_dir.glob("*.json"):
+        if path.name not in keep:
+            path.unlink()
+    stats["written"] = True
+    return stats
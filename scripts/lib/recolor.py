@@ -0,0 +1,64 @@
+"""Whole-image recolour / alpha-key operations on NumPy arrays.
+
+Used by process_arrow.py to turn flat artwork on a white background into a
+transparent single-colour icon. Each operation is a handful of array ops over the
+whole image instead of a Python loop over getdata().
+
+Kept out of lib/__init__ so scripts that don't touch images don't need NumPy::
+
+    from lib.recolor import recolor, GOLD
+"""
+
+import numpy as np
+from PIL import Image
+
+# Brand gold (#D4AF37)
+GOLD = (212, 175, 55)
+
+
+def parse_color(value):
+    """'#D4AF37', 'D4AF37' or '212,175,55' -> (212, 175, 55)."""
+    value = value.strip()
+    if "," in value:
+        parts = tuple(int(p) for p in value.split(","))
+    else:
+        value = value.lstrip("#")
+        parts = tuple(int(value[i:i + 2], 16) for i in (0, 2, 4))
+    if len(parts) != 3 or not all(0 <= p <= 255 for p in parts):
+        raise ValueError(f"not an RGB colour: {value}")
+    return parts
+
+
+def to_rgba_array(img):
+    return np.asarray(img.convert("RGBA"), dtype=np.uint8)
+
+
+def background_mask(arr, threshold=200):
+    """True where all of R, G and B are above `threshold` (the near-white background)."""
+    return (arr[..., :3] > threshold).all(axis=-1)
+
+
+def alpha_key(img, threshold=200):
+    """Make near-white pixels fully transparent white; everything else is left as is."""
+    arr = to_rgba_array(img).copy()
+    arr[background_mask(arr, threshold)] = (255, 255, 255, 0)
+    return Image.fromarray(arr, "RGBA")
+
+
+def tint(img, color=GOLD):
+    """Replace the colour of every pixel, keeping its alpha."""
+    arr = to_rgba_array(img).copy()
+    arr[..., :3] = color
+    return Image.fromarray(arr, "RGBA")
+
+
+def recolor(img, color=GOLD, threshold=200):
+    """
+    Key out the near-white background and paint everything else `color` at full
+    opacity. Same output as the old per-pixel loop in process_arrow.py.
+    """
+    arr = to_rgba_array(img)
+    out = np.empty_like(arr)
+    out[...] = (*color, 255)
+    out[background_mask(arr, threshold)] = (255, 255, 255, 0)
+    return Image.fromarray(out, "RGBA")
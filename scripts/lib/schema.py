@@ -0,0 +1,192 @@
+"""Table and column metadata from the PostgREST OpenAPI document, cached per project.
+
+PostgREST describes every exposed table at ``GET /rest/v1/`` (OpenAPI 2.0
+``definitions``), including empty tables, which a ``select=*&limit=1`` probe
+can't. The document is large, so it is fetched at most once per ``max_age``
+seconds and then only conditionally (If-None-Match on the stored ETag, and a
+SHA-256 of the body so an unchanged document isn't re-parsed). The parsed
+tables live in ``.cache/schema.json``, keyed by project URL and API key (the
+document only shows what the key's role can see, so anon and service-role
+callers get separate entries)::
+
+    from lib import get_client
+    from lib.schema import load_schema
+
+    schema = load_schema(get_client("prod"))
+    schema.columns("businesses")                 # ['id', 'name', ...]
+    schema.types("businesses")["photos"]         # 'text[]'
+    schema.missing("businesses", ["tier", "is_available_now"])
+"""
+
+import re
+import json
+import time
+import hashlib
+from dataclasses import dataclass, asdict
+
+from .env import ROOT
+
+CACHE_PATH = ROOT / ".cache" / "schema.json"
+# Bump when the parsed layout or the cache keys change, so old entries are dropped
+CACHE_VERSION = 2
+# Seconds a cached document is trusted without asking the server at all
+DEFAULT_MAX_AGE = 300
+
+FOREIGN_KEY_RE = re.compile(r"<fk table='([^']*)' column='([^']*)'/>")
+
+
+@dataclass(frozen=True)
+class Column:
+    name: str
+    type: str                # Postgres type as PostgREST reports it: uuid, text, text[], jsonb, ...
+    json_type: str           # OpenAPI type: string, integer, number, boolean, array, ...
+    required: bool = False   # NOT NULL without a default
+    default: str = None
+    primary_key: bool = False
+    foreign_key: str = None  # "table.column"
+    max_length: int = None
+
+
+def parse_definitions(spec):
+    """{table: {column: Column}} from an OpenAPI document, columns in document order."""
+    tables = {}
+    for table, definition in (spec.get("definitions") or {}).items():
+        required = set(definition.get("required") or [])
+        columns = {}
+        for name, prop in (definition.get("properties") or {}).items():
+            description = prop.get("description") or ""
+            fk = FOREIGN_KEY_RE.search(description)
+            default = prop.get("default")
+            columns[name] = Column(
+                name=name,
+                type=prop.get("format") or prop.get("type") or "",
+                json_type=prop.get("type") or "",
+                required=name in required,
+                default=None if default is None else str(default),
+                primary_key="<pk/>" in description,
+                foreign_key=f"{fk.group(1)}.{fk.group(2)}" if fk else None,
+                max_length=prop.get("maxLength"),
+            )
+        tables[table] = columns
+    return tables
+
+
+def parse_functions(spec):
+    return sorted(path[len("/rpc/"):] for path in (spec.get("paths") or {}) if path.startswith("/rpc/"))
+
+
+class Schema:
+    def __init__(self, url, tables, functions=(), fetched_at=None):
+        self.url = url
+        self.tables = tables
+        self.functions = list(functions)
+        self.fetched_at = fetched_at
+
+    def table(self, table):
+        if table not in self.tables:
+            raise KeyError(f"{table!r} is not exposed by {self.url}")
+        return self.tables[table]
+
+    def columns(self, table):
+        return list(self.table(table))
+
+    def column(self, table, name):
+        return self.table(table).get(name)
+
+    def types(self, table):
+        return {name: column.type for name, column in self.table(table).items()}
+
+    def missing(self, table, columns):
+        """The names in `columns` that `table` doesn't have (all of them if the table is missing)."""
+        have = self.tables.get(table, {})
+        return [c for c in columns if c not in have]
+
+    def to_entry(self):
+        return {"tables": {t: [asdict(c) for c in cols.values()] for t, cols in self.tables.items()},
+                "functions": self.functions}
+
+    @classmethod
+    def from_entry(cls, url, entry):
+        tables = {t: {c["name"]: Column(**c) for c in cols} for t, cols in entry["tables"].items()}
+        return cls(url, tables, entry.get("functions", ()), entry.get("fetched_at"))
+
+
+def _read_cache(cache_path):
+    try:
+        with open(cache_path, "r", encoding="utf-8") as f:
+            data = json.load(f)
+    except (OSError, ValueError):
+        return {}
+    return data.get("projects", {}) if data.get("version") == CACHE_VERSION else {}
+
+
+def _write_cache(cache_path, projects):
+    cache_path.parent.mkdir(parents=True, exist_ok=True)
+    tmp = cache_path.with_suffix(".tmp")
+    with open(tmp, "w", encoding="utf-8") as f:
+        json.dump({"version": CACHE_VERSION, "projects": projects}, f, indent=1)
+    tmp.replace(cache_path)
+
+
+def cache_key(client):
+    """Project URL plus a short hash of the API key, which decides the role PostgREST answers as."""
+    return f"{client.url}#{hashlib.sha256((client.key or '').encode('utf-8')).hexdigest()[:12]}"
+
+
+def load_schema(client, max_age=DEFAULT_MAX_AGE, refresh=False, cache_path=CACHE_PATH):
+    """
+    Schema for the client's project. Served from the cache while it is younger
+    than `max_age` seconds; after that the server is asked with If-None-Match, and
+    a 304 (or an identical body) just renews the cached copy. `refresh` skips the
+    age check, never the conditional request.
+    """
+    projects = _read_cache(cache_path)
+    key = cache_key(client)
+    entry = projects.get(key)
+    now = time.time()
+    if entry and not refresh and now - entry["checked_at"] < max_age:
+        return Schema.from_entry(client.url, entry)
+
+    headers = {"Accept": "application/openapi+json"}
+    if entry and entry.get("etag"):
+        headers["If-None-Match"] = entry["etag"]
+    resp = client.request("GET", "rest/v1/", headers=headers, ok=(200, 304))
+
+    if resp.status_code == 304 and entry:
+        entry["checked_at"] = now
+    else:
+        digest = hashlib.sha256(resp.content).hexdigest()
+        if not entry or entry.get("sha256") != digest:
+            spec = resp.json()
+            parsed = Schema(client.url, parse_definitions(spec), parse_functions(spec)).to_entry()
+            entry = dict(parsed, fetched_at=now)
+        entry.update(etag=resp.headers.get("ETag"), sha256=digest, checked_at=now)
+    projects[key] = entry
+    _write_cache(cache_path, projects)
+    return Schema.from_entry(client.url, entry)
+
+
+def diff_schemas(a, b, tables=None):
+    """
+    Differences between two Schemas as (table, column, what, a value, b value)
+    tuples; column is None for a whole table. `what` is one of: only in a,
+    only in b, type, required, default.
+    """
+    out = []
+    names = sorted(set(a.tables) | set(b.tables)) if tables is None else list(tables)
+    for table in names:
+        left, right = a.tables.get(table), b.tables.get(table)
+        if left is None or right is None:
+            if left is not None or right is not None:
+                out.append((table, None, "only in a" if right is None else "only in b", None, None))
+            continue
+        for name in list(left) + [c for c in right if c not in left]:
+            x, y = left.get(name), right.get(name)
+            if x is None or y is None:
+                out.append((table, name, "only in a" if y is None else "only in b",
+                            x.type if x else None, y.type if y else None))
+                continue
+            for field in ("type", "required", "default"):
+                if getattr(x, field) != getattr(y, field):
+                    out.append((table, name, field, getattr(x, field), getattr(y, field)))
+    return out
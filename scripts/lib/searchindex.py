@@ -0,0 +1,169 @@
+"""Trigram search index over the business directory, shipped as a static asset.
+
+searchBusinesses() matches ``name ilike %q% or trade ilike %q%`` ordered by
+rating. A leading wildcard can't use the btree indexes, so the database scans
+every row per keystroke. Instead build_search_index.py writes this index to
+public/ and the site answers searches from it:
+
+* docs are stored best rated first, so a doc's number is its rank;
+* every lowercase 3-character substring of a doc's name or trade maps to the
+  ascending, delta-encoded list of docs containing it.
+
+A search intersects the posting lists of the query's trigrams (shortest first)
+and checks the real substring on the candidates in rank order, stopping at the
+limit. Queries shorter than 3 characters walk the docs in rank order instead,
+where the first matches are found almost at once. Either way the work depends
+on the number of matches needed, not the size of the directory.
+
+The format::
+
+    {"version": 1, "built_at": ..., "trades": [...], "cities": [...],
+     "docs": [[id, name, trade no, city no, rating, from supabase 0/1], ...],
+     "grams": {"plu": [first doc, delta, delta, ...], ...}}
+
+``built_at`` is when the Supabase rows were read. The index doesn't see later
+changes, so searchBusinesses() merges in a live query for rows updated after it.
+
+SearchIndex below is the reference implementation of the lookup that
+src/lib/searchIndex.ts repeats in the browser.
+"""
+
+import json
+import bisect
+import datetime
+
+from .env import ROOT
+
+FORMAT_VERSION = 1
+ASSET_PATH = ROOT / "public" / f"search-index.v{FORMAT_VERSION}.json"
+
+
+def fold(text):
+    return (text or "").lower()
+
+
+def grams(text):
+    """Distinct 3-character substrings of the folded text."""
+    text = fold(text)
+    return {text[i:i + 3] for i in range(len(text) - 2)}
+
+
+def merge_docs(index, supabase_rows):
+    """
+    Search docs for the static listings (a ListingIndex) plus verified Supabase
+    businesses, one per id with the Supabase row winning, as the listing pages merge them.
+    """
+    docs = {}
+    for city, trade, business in index.records:
+        docs[business["id"]] = {"id": business["id"], "name": business.get("name") or "", "trade": trade,
+                                "city": city, "rating": business.get("rating"), "supabase": False}
+    for row in supabase_rows:
+        if row.get("verified") is not True:
+            continue
+        docs[row["id"]] = {"id": row["id"], "name": row.get("name") or "", "trade": row.get("trade") or "",
+                           "city": row.get("city") or "", "rating": row.get("rating"), "supabase": True}
+    return list(docs.values())
+
+
+def _rating(doc):
+    try:
+        return float(doc["rating"])
+    except (TypeError, ValueError):
+        # mapBusinessData() shows a missing rating as 5.0
+        return 5.0
+
+
+def build_index(docs, built_at=None):
+    """
+    The asset (a JSON-ready dict) for a list of merged docs. `built_at` is when the
+    Supabase rows were read (default now): the site queries rows updated after it live.
+    """
+    docs = sorted(docs, key=lambda d: (-_rating(d), d["id"]))
+    trades = sorted({d["trade"] for d in docs})
+    cities = sorted({d["city"] for d in docs})
+    trade_no = {t: i for i, t in enumerate(trades)}
+    city_no = {c: i for i, c in enumerate(cities)}
+
+    postings = {}
+    for n, doc in enumerate(docs):
+        for gram in grams(doc["name"]) | grams(doc["trade"]):
+            postings.setdefault(gram, []).append(n)
+    encoded = {}
+    for gram in sorted(postings):
+        numbers = postings[gram]
+        encoded[gram] = [numbers[0]] + [b - a for a, b in zip(numbers, numbers[1:])]
+
+    return {
+        "version": FORMAT_VERSION,
+        "built_at": built_at or datetime.datetime.now(datetime.timezone.utc).isoformat(timespec="seconds"),
+        "trades": trades,
+        "cities": cities,
+        "docs": [[d["id"], d["name"], trade_no[d["trade"]], city_no[d["city"]], _rating(d), int(d["supabase"])]
+                 for d in docs],
+        "grams": encoded,
+    }
+
+
+def write_index(asset, path=ASSET_PATH):
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmp = path.with_suffix(".tmp")
+    with open(tmp, "w", encoding="utf-8") as f:
+        json.dump(asset, f, ensure_ascii=False, separators=(",", ":"))
+    tmp.replace(path)
+    return path.stat().st_size
+
+
+def _contains(numbers, n):
+    i = bisect.bisect_left(numbers, n)
+    return i < len(numbers) and numbers[i] == n
+
+
+class SearchIndex:
+    def __init__(self, asset):
+        if asset.get("version") != FORMAT_VERSION:
+            raise ValueError(f"search index version {asset.get('version')}, expected {FORMAT_VERSION}")
+        self.asset = asset
+        self.docs = asset["docs"]
+        self.trades = asset["trades"]
+        self._grams = asset["grams"]
+        self._decoded = {}
+
+    @classmethod
+    def load(cls, path=ASSET_PATH):
+        with open(path, "r", encoding="utf-8") as f:
+            return cls(json.load(f))
+
+    def postings(self, gram):
+        if gram not in self._decoded:
+            numbers, total = [], 0
+            for delta in self._grams.get(gram, ()):
+                total += delta
+                numbers.append(total)
+            self._decoded[gram] = numbers
+        return self._decoded[gram]
+
+    def matches(self, n, query):
+        doc = self.docs[n]
+        return query in fold(doc[1]) or query in fold(self.trades[doc[2]])
+
+    def candidates(self, query):
+        """Doc numbers in rank order that may contain `query` (all docs for short queries)."""
+        if len(query) < 3:
+            return range(len(self.docs))
+        shortest, *rest = sorted((self.postings(g) for g in grams(query)), key=len)
+        # Binary search into the longer lists, so only the candidates actually
+        # looked at cost anything
+        return (n for n in shortest if all(_contains(numbers, n) for numbers in rest))
+
+    def search(self, query, limit=20):
+        """Doc rows matching like name/trade ilike %query%, best rated first."""
+        query = fold(query.strip())
+        if not query:
+            return []
+        hits = []
+        for n in self.candidates(query):
+            if self.matches(n, query):
+                hits.append(self.docs[n])
+                if len(hits) == limit:
+                    break
+        return hits
@@ -0,0 +1,307 @@
+"""Columnar local snapshots of Supabase tables, with a small query API.
+
+``snapshot_businesses.py pull`` stores each table as one ``.npz`` file under
+``.cache/snapshots/<profile>/``: numbers and booleans as NumPy arrays with a
+null mask, text (and JSON, stored as text) dictionary-encoded as int32 codes
+into a UTF-8 blob of distinct values. Filters run on whole arrays, and text
+filters are evaluated once per distinct value, so counts over the full table
+take milliseconds::
+
+    from lib.snapshot import load_snapshot
+
+    businesses = load_snapshot("prod")
+    businesses.query().where("trade", "eq.plumber").where("is_premium", "is.true").count()
+    businesses.query().where("logo_url", "not.is.null").group_by("city").count()
+    businesses.query({"tier": "eq.paid"}).rows(["id", "name"], order="priority_score.desc", limit=5)
+
+Filters use PostgREST's syntax (eq, neq, gt, gte, lt, lte, like, ilike, in,
+is, each optionally prefixed with not.), so a query can be moved between the
+snapshot and the live API unchanged.
+"""
+
+import re
+import json
+import time
+import operator
+
+import numpy as np
+
+from .env import ROOT
+
+SNAPSHOT_DIR = ROOT / ".cache" / "snapshots"
+FORMAT_VERSION = 1
+
+TEXT, JSON, BOOL, INT, FLOAT = "text", "json", "bool", "int", "float"
+
+
+def _kind(values):
+    kinds = {type(v) for v in values if v is not None}
+    if not kinds:
+        return TEXT
+    if kinds == {bool}:
+        return BOOL
+    if kinds == {int}:
+        return INT
+    if kinds <= {int, float}:
+        return FLOAT
+    if kinds & {list, dict}:
+        return JSON
+    return TEXT
+
+
+def encode_column(values):
+    """{"kind": ..., array name: ndarray} for one column's values (None is null)."""
+    kind = _kind(values)
+    mask = np.fromiter((v is None for v in values), dtype=bool, count=len(values))
+    if kind in (BOOL, INT, FLOAT):
+        dtype = {BOOL: bool, INT: np.int64, FLOAT: np.float64}[kind]
+        fill = {BOOL: False, INT: 0, FLOAT: np.nan}[kind]
+        data = np.array([fill if v is None else v for v in values], dtype=dtype)
+        return {"kind": kind, "data": data, "mask": mask}
+
+    if kind == JSON:
+        values = [None if v is None else json.dumps(v, sort_keys=True, ensure_ascii=False) for v in values]
+    else:
+        values = [None if v is None else str(v) for v in values]
+    distinct = {}
+    codes = np.fromiter((-1 if v is None else distinct.setdefault(v, len(distinct)) for v in values),
+                        dtype=np.int32, count=len(values))
+    encoded = [v.encode("utf-8") for v in distinct]
+    offsets = np.zeros(len(encoded) + 1, dtype=np.int64)
+    np.cumsum([len(b) for b in encoded], out=offsets[1:])
+    blob = np.frombuffer(b"".join(encoded), dtype=np.uint8)
+    return {"kind": kind, "codes": codes, "blob": blob, "offsets": offsets}
+
+
+def save_table(path, name, rows, meta=None):
+    """Write `rows` (list of dicts) as a columnar .npz snapshot."""
+    columns = list(dict.fromkeys(key for row in rows for key in row))
+    arrays, kinds = {}, {}
+    for column in columns:
+        encoded = encode_column([row.get(column) for row in rows])
+        kinds[column] = encoded.pop("kind")
+        for part, array in encoded.items():
+            arrays[f"{column}:{part}"] = array
+    header = dict(meta or {}, version=FORMAT_VERSION, table=name, rows=len(rows), columns=kinds,
+                  saved_at=time.time())
+    arrays["__meta__"] = np.frombuffer(json.dumps(header).encode("utf-8"), dtype=np.uint8)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmp = path.with_name(path.name + ".tmp.npz")
+    np.savez(tmp, **arrays)
+    tmp.replace(path)
+
+
+def like_regex(pattern, ignore_case=False):
+    """Compiled regex for a PostgREST like/ilike pattern: % (or *) is any run, _ one character."""
+    wildcards = {"%": ".*", "*": ".*", "_": "."}
+    regex = "".join(wildcards.get(char) or re.escape(char) for char in pattern)
+    return re.compile(regex, re.DOTALL | (re.IGNORECASE if ignore_case else 0))
+
+
+class Column:
+    def __init__(self, name, kind, arrays):
+        self.name = name
+        self.kind = kind
+        self.codes = arrays.get("codes")
+        self.data = arrays.get("data")
+        self.mask = arrays.get("mask") if self.codes is None else self.codes < 0
+        self._blob = arrays.get("blob")
+        self._offsets = arrays.get("offsets")
+        self._values = None
+
+    @property
+    def text(self):
+        return self.codes is not None
+
+    @property
+    def values(self):
+        """Distinct values of a text column, indexed by code."""
+        if self._values is None:
+            blob, offsets = self._blob.tobytes(), self._offsets
+            self._values = [blob[offsets[i]:offsets[i + 1]].decode("utf-8") for i in range(len(offsets) - 1)]
+        return self._values
+
+    def value(self, i):
+        if self.mask[i]:
+            return None
+        if self.text:
+            value = self.values[self.codes[i]]
+            return json.loads(value) if self.kind == JSON else value
+        return self.data[i].item()
+
+    def _parse(self, raw):
+        if self.kind == BOOL:
+            return raw.lower() == "true"
+        if self.kind == INT:
+            return int(raw)
+        if self.kind == FLOAT:
+            return float(raw)
+        return raw
+
+    def _codes_where(self, test):
+        """Rows whose text value passes `test`, evaluated once per distinct value."""
+        hits = np.fromiter((test(v) for v in self.values), dtype=bool, count=len(self.values))
+        return np.append(hits, False)[self.codes]
+
+    def match(self, expr):
+        """Boolean row mask for a PostgREST filter expression such as "eq.Luton" or "not.is.null"."""
+        negate = expr.startswith("not.")
+        if negate:
+            expr = expr[4:]
+        op, _, raw = expr.partition(".")
+        if op == "is":
+            lowered = raw.lower()
+            if lowered == "null":
+                result = self.mask.copy()
+            elif self.kind == BOOL and lowered in ("true", "false"):
+                result = ~self.mask & (self.data == (lowered == "true"))
+            else:
+                raise ValueError(f"unsupported is.{raw} on {self.name}")
+        elif op == "in":
+            options = [o.strip().strip('"') for o in raw.strip("()").split(",") if o.strip()]
+            if self.text:
+                wanted = set(options)
+                result = self._codes_where(lambda v: v in wanted)
+            else:
+                result = ~self.mask & np.isin(self.data, [self._parse(o) for o in options])
+        elif op in ("like", "ilike"):
+            if not self.text:
+                raise ValueError(f"{op} needs a text column, {self.name} is {self.kind}")
+            match = like_regex(raw, op == "ilike").fullmatch
+            result = self._codes_where(lambda v: match(v) is not None)
+        elif op in ("eq", "neq", "gt", "gte", "lt", "lte"):
+            compare = {"eq": operator.eq, "neq": operator.ne, "gt": operator.gt, "gte": operator.ge,
+                       "lt": operator.lt, "lte": operator.le}[op]
+            if self.text:
+                result = self._codes_where(lambda v: compare(v, raw))
+            else:
+                result = ~self.mask & compare(self.data, self._parse(raw))
+        else:
+            raise ValueError(f"unsupported operator: {op}")
+        if not negate:
+            return result
+        # As in SQL, NOT (x = 1) is not true for a null x; only is. tests see nulls
+        return ~result if op == "is" else ~result & ~self.mask
+
+
+class Table:
+    def __init__(self, path):
+        self.path = path
+        self._npz = np.load(path, allow_pickle=False)
+        self.meta = json.loads(self._npz["__meta__"].tobytes().decode("utf-8"))
+        self.name = self.meta["table"]
+        self.kinds = self.meta["columns"]
+        self._columns = {}
+
+    def __len__(self):
+        return self.meta["rows"]
+
+    @property
+    def columns(self):
+        return list(self.kinds)
+
+    def column(self, name):
+        if name not in self.kinds:
+            raise KeyError(f"{self.name} snapshot has no column {name!r}")
+        if name not in self._columns:
+            parts = ("codes", "blob", "offsets") if self.kinds[name] in (TEXT, JSON) else ("data", "mask")
+            self._columns[name] = Column(name, self.kinds[name], {p: self._npz[f"{name}:{p}"] for p in parts})
+        return self._columns[name]
+
+    def query(self, filters=None):
+        return Query(self).filter(filters)
+
+
+class Query:
+    def __init__(self, table, mask=None):
+        self.table = table
+        self.mask = np.ones(len(table), dtype=bool) if mask is None else mask
+
+    def where(self, column, expr):
+        return Query(self.table, self.mask & self.table.column(column).match(expr))
+
+    def filter(self, filters):
+        """where() for each item of a PostgREST filter dict or list of (column, expr) pairs."""
+        query = self
+        for column, expr in (filters.items() if isinstance(filters, dict) else filters or ()):
+            query = query.where(column, expr)
+        return query
+
+    def any_of(self, *conditions):
+        """Rows matching at least one (column, expr) condition, like PostgREST's or=(...)."""
+        combined = np.zeros(len(self.table), dtype=bool)
+        for column, expr in conditions:
+            combined |= self.table.column(column).match(expr)
+        return Query(self.table, self.mask & combined)
+
+    def count(self):
+        return int(np.count_nonzero(self.mask))
+
+    def indexes(self, order=None, limit=None):
+        idx = np.flatnonzero(self.mask)
+        if order:
+            column_name, _, direction = order.partition(".")
+            column = self.table.column(column_name)
+            if column.text:
+                # Codes are in first-seen order; rank the distinct values to sort by text
+                ranks = np.argsort(np.argsort(np.array(column.values, dtype=object)))
+                keys = np.append(ranks, -1)[column.codes[idx]]
+            else:
+                keys = column.data[idx].astype(np.float64)
+            nulls = column.mask[idx]
+            # Nulls last either way, as PostgREST does for asc (and nullslast for desc)
+            keys = np.where(nulls, np.inf, -keys if direction == "desc" else keys)
+            idx = idx[np.argsort(keys, kind="stable")]
+        return idx if limit is None else idx[:limit]
+
+    def rows(self, columns=None, order=None, limit=None):
+        columns = [self.table.column(c) for c in (columns or self.table.columns)]
+        return [{c.name: c.value(i) for c in columns} for i in self.indexes(order, limit)]
+
+    def values(self, column):
+        column = self.table.column(column)
+        return [column.value(i) for i in np.flatnonzero(self.mask)]
+
+    def group_by(self, *columns):
+        return Grouping(self, columns)
+
+
+class Grouping:
+    def __init__(self, query, columns):
+        self.query = query
+        self.columns = [query.table.column(c) for c in columns]
+
+    def count(self):
+        """[(key tuple, rows)] largest group first; None stands for null."""
+        idx = np.flatnonzero(self.query.mask)
+        if not self.columns:
+            return [((), len(idx))]
+        keys = []
+        for column in self.columns:
+            if column.text:
+                keys.append(column.codes[idx].astype(np.int64))
+            else:
+                # Nulls get their own group: a null flag, then the value (0 for nulls)
+                nulls = column.mask[idx]
+                keys.append(nulls.astype(np.float64))
+                keys.append(np.where(nulls, 0, column.data[idx]).astype(np.float64))
+        stacked = np.stack(keys, axis=1)
+        groups, first, counts = np.unique(stacked, axis=0, return_index=True, return_counts=True)
+        out = []
+        for g, row_pos, n in zip(groups, first, counts):
+            row = idx[row_pos]
+            out.append((tuple(column.value(row) for column in self.columns), int(n)))
+        out.sort(key=lambda item: (-item[1], [str(k) for k in item[0]]))
+        return out
+
+
+def snapshot_path(profile, table):
+    return SNAPSHOT_DIR / profile / f"{table}.npz"
+
+
+def load_snapshot(profile="prod", table="businesses"):
+    """Table for the last pulled snapshot; FileNotFoundError if there is none."""
+    path = snapshot_path(profile, table)
+    if not path.exists():
+        raise FileNotFoundError(f"no {table} snapshot for {profile}; run snapshot_businesses.py pull --profile {profile}")
+    return Table(path)
@@ -0,0 +1,355 @@
+"""Bracket and JSX tag balance checking for .ts/.tsx sources.
+
+Counting "{" and "}" over a whole file is wrong as soon as one sits in a
+string, a template, a comment, a regex or JSX text. ``scan`` is a small
+TS/JSX lexer that knows those states (a stack of open brackets, template
+strings, JSX tags and elements) and stops at the first token that doesn't
+balance::
+
+    from lib.tsx import check_source
+
+    problem = check_source(text, jsx=True)
+    if problem:
+        print(f"line {problem.line}:{problem.column}: {problem.message}")
+
+It doesn't parse TypeScript; it only answers "does every opener have its
+closer". ``validate_paths`` runs that over many files in a process pool and
+keeps the results in ``.cache/tsx_check.json`` keyed by content hash, so
+re-checking an unchanged tree only costs a stat per file.
+"""
+
+import os
+import re
+import json
+import hashlib
+from concurrent.futures import ProcessPoolExecutor
+
+from .env import ROOT
+
+CACHE_PATH = ROOT / ".cache" / "tsx_check.json"
+# Bump when the lexer changes so cached verdicts are re-computed
+CACHE_VERSION = 1
+EXTENSIONS = (".ts", ".tsx", ".js", ".jsx", ".mjs", ".cjs")
+# Below this many files the pool start-up costs more than it saves
+POOL_THRESHOLD = 8
+
+_IDENT = r"[A-Za-z_$\u0080-\uffff][\w$\u0080-\uffff]*"
+
+CODE_RE = re.compile(rf"""
+    (?P<ws>\s+)
+  | (?P<comment>//[^\n]*|/\*.*?(?:\*/|\Z))
+  | (?P<str>"(?:[^"\\\n]|\\.|\\\n)*"|'(?:[^'\\\n]|\\.|\\\n)*')
+  | (?P<badstr>["'])
+  | (?P<tpl>`)
+  | (?P<name>{_IDENT})
+  | (?P<num>\d[\w.]*)
+  | (?P<open>[{{(\[])
+  | (?P<close>[}})\]])
+  | (?P<lt><)
+  | (?P<slash>/)
+  | (?P<op>[-+*%&|^!~?:;,.=>@#\\]+)
+  | (?P<other>.)
+""", re.S | re.X)
+
+REGEX_RE = re.compile(r"/(?:[^/\\\[\n]|\\.|\[(?:[^\]\\\n]|\\.)*\])+/[A-Za-z]*")
+TEMPLATE_RE = re.compile(r"(?:[^`\\$]|\\.|\$(?!\{))*", re.S)
+
+# <Name followed by what can only be an attribute list, "/>" or ">"; fragments are "<>"
+JSX_OPEN_RE = re.compile(rf"<\s*(?:(?P<name>{_IDENT}(?:[.:\-][\w$\-]+)*)(?=[\s/>{{])|(?=>))")
+# <T,>(...) and <T extends X>(...) are arrow-function generics, not JSX
+JSX_GENERIC_RE = re.compile(rf"<\s*{_IDENT}\s*(?:,|extends\b)|<\s*[A-Z]\s*>\s*\(")
+
+TAG_RE = re.compile(rf"""
+    (?P<ws>\s+)
+  | (?P<comment>/\*.*?\*/|//[^\n]*)
+  | (?P<attr>{_IDENT}(?:[.:\-][\w$\-]*)*)
+  | (?P<eq>=)
+  | (?P<str>"[^"]*"|'[^']*')
+  | (?P<expr>\{{)
+  | (?P<selfclose>/\s*>)
+  | (?P<end>>)
+""", re.S | re.X)
+
+CHILDREN_RE = re.compile(rf"""
+    (?P<text>[^<{{}}]+)
+  | (?P<expr>\{{)
+  | (?P<closetag></\s*(?P<name>{_IDENT}(?:[.:\-][\w$\-]+)*)?\s*>)
+  | (?P<lt><)
+  | (?P<stray>}})
+""", re.X)
+
+# After these words an expression starts, so "/" begins a regex and "<" may begin JSX
+EXPRESSION_KEYWORDS = {"return", "typeof", "instanceof", "in", "of", "new", "delete", "void", "throw",
+                       "case", "do", "else", "yield", "await", "default", "export", "extends"}
+
+PAIRS = {"}": "{", ")": "(", "]": "["}
+
+
+class Problem:
+    """The first token that doesn't balance, with 1-based line and column."""
+
+    def __init__(self, message, pos, text, opened=None):
+        self.pos = pos
+        self.line = text.count("\n", 0, pos) + 1
+        self.column = pos - (text.rfind("\n", 0, pos) + 1) + 1
+        self.message = message
+        if opened is not None:
+            line = text.count("\n", 0, opened) + 1
+            self.message = f"{message} (opened on line {line})"
+
+    def as_dict(self):
+        return {"line": self.line, "column": self.column, "message": self.message}
+
+    def __str__(self):
+        return f"line {self.line}:{self.column}: {self.message}"
+
+
+class _Mismatch(Exception):
+    def __init__(self, message, pos, opened=None):
+        super().__init__(message)
+        self.pos = pos
+        self.opened = opened
+
+
+def scan(text, jsx=True):
+    """
+    Yields (kind, value, pos) for every significant token, raising _Mismatch at
+    the first one that doesn't balance. Frames on the stack are (kind, value,
+    pos) with kind "{", "(", "[", "${", "jsx{", "tpl", "tag" or "element".
+    """
+    stack = []
+    pos = 0
+    length = len(text)
+    # True where an expression may start: "/" is a regex, "<" may be JSX
+    expr = True
+
+    while pos < length:
+        frame = stack[-1][0] if stack else None
+
+        if frame == "tpl":
+            pos = TEMPLATE_RE.match(text, pos).end()
+            if pos >= length:
+                break
+            if text[pos] == "`":
+                stack.pop()
+                yield "tpl", "`", pos
+                pos += 1
+                expr = False
+            elif text.startswith("${", pos):
+                stack.append(("${", "${", pos))
+                pos += 2
+                expr = True
+            else:
+                break
+            continue
+
+        if frame == "tag":
+            m = TAG_RE.match(text, pos)
+            if not m:
+                raise _Mismatch(f"unexpected {text[pos]!r} in JSX tag <{stack[-1][1]}>", pos, stack[-1][2])
+            kind = m.lastgroup
+            if kind == "expr":
+                stack.append(("jsx{", "{", pos))
+                expr = True
+            elif kind == "selfclose":
+                stack.pop()
+                yield "jsx", "/>", pos
+                expr = False
+            elif kind == "end":
+                _, name, opened = stack.pop()
+                stack.append(("element", name, opened))
+            pos = m.end()
+            continue
+
+        if frame == "element":
+            m = CHILDREN_RE.match(text, pos)
+            kind = m.lastgroup
+            if kind == "expr":
+                stack.append(("jsx{", "{", pos))
+                expr = True
+            elif kind == "closetag":
+                _, name, opened = stack.pop()
+                closing = m.group("name") or ""
+                if closing != name:
+                    raise _Mismatch(f"</{closing}> closes <{name}>", pos, opened)
+                yield "jsx", f"</{closing}>", pos
+                expr = False
+            elif kind == "lt":
+                pos = _open_tag(text, pos, stack)
+                continue
+            elif kind == "stray":
+                raise _Mismatch("unmatched '}' in JSX text", pos)
+            pos = m.end()
+            continue
+
+        m = CODE_RE.match(text, pos)
+        kind = m.lastgroup
+        value = m.group()
+        if kind == "ws" or kind == "comment":
+            if kind == "comment" and value.startswith("/*") and not value.endswith("*/"):
+                raise _Mismatch("unterminated comment", pos)
+            pos = m.end()
+            continue
+        if kind == "badstr":
+            raise _Mismatch("unterminated string", pos)
+        if kind == "tpl":
+            stack.append(("tpl", "`", pos))
+            pos += 1
+            continue
+        if kind == "open":
+            stack.append((value, value, pos))
+            expr = True
+        elif kind == "close":
+            if not stack:
+                raise _Mismatch(f"unmatched {value!r}", pos)
+            opener, _, opened = stack[-1]
+            if opener in ("${", "jsx{"):
+                opener = "{"
+            if opener != PAIRS[value]:
+                raise _Mismatch(f"{value!r} closes {stack[-1][1]!r}", pos, opened)
+            stack.pop()
+            expr = False
+        elif kind == "lt":
+            if jsx and expr and not JSX_GENERIC_RE.match(text, pos) and JSX_OPEN_RE.match(text, pos):
+                pos = _open_tag(text, pos, stack)
+                continue
+            expr = True
+        elif kind == "slash":
+            if expr:
+                regex = REGEX_RE.match(text, pos)
+                if not regex:
+                    raise _Mismatch("unterminated regular expression", pos)
+                m = regex
+                kind, value = "regex", regex.group()
+                expr = False
+            else:
+                expr = True
+        elif kind == "name":
+            expr = value in EXPRESSION_KEYWORDS
+        elif kind == "op":
+            expr = True
+        else:
+            expr = False
+        yield kind, value, pos
+        pos = m.end()
+
+    if stack:
+        kind, value, opened = stack[-1]
+        what = {"tpl": "template string", "${": "'${'", "jsx{": "'{'", "tag": f"JSX tag <{value}",
+                "element": f"<{value}>"}.get(kind, repr(value))
+        raise _Mismatch(f"{what} is never closed ({len(stack)} open at end of file)", length, opened)
+
+
+def _open_tag(text, pos, stack):
+    m = JSX_OPEN_RE.match(text, pos)
+    if not m:
+        raise _Mismatch("'<' in JSX text", pos)
+    name = m.group("name") or ""
+    if name:
+        stack.append(("tag", name, pos))
+    else:
+        # Fragment "<>": no attributes, straight to children
+        stack.append(("element", "", pos))
+        return text.index(">", m.end()) + 1
+    return m.end()
+
+
+def check_source(text, jsx=True):
+    """The first unbalanced token in `text` as a Problem, or None when everything closes."""
+    try:
+        for _ in scan(text, jsx):
+            pass
+    except _Mismatch as e:
+        return Problem(str(e), e.pos, text, e.opened)
+    return None
+
+
+def check_file(path):
+    """Problem dict for the file at `path`, or None. JSX is only recognised in .tsx/.jsx files."""
+    with open(path, "r", encoding="utf-8-sig") as f:
+        text = f.read()
+    problem = check_source(text, jsx=str(path).endswith(("x", ".js")))
+    return problem.as_dict() if problem else None
+
+
+def _digest(data):
+    return hashlib.blake2b(data, digest_size=16).hexdigest()
+
+
+def _check_worker(path):
+    try:
+        return path, check_file(path)
+    except (OSError, UnicodeDecodeError) as e:
+        return path, {"line": 0, "column": 0, "message": f"unreadable: {e}"}
+
+
+def load_cache(cache_path=CACHE_PATH):
+    try:
+        with open(cache_path, "r", encoding="utf-8") as f:
+            data = json.load(f)
+    except (OSError, ValueError):
+        return {}
+    return data.get("files", {}) if data.get("version") == CACHE_VERSION else {}
+
+
+def save_cache(entries, cache_path=CACHE_PATH):
+    cache_path.parent.mkdir(parents=True, exist_ok=True)
+    tmp = cache_path.with_suffix(".tmp")
+    with open(tmp, "w", encoding="utf-8") as f:
+        json.dump({"version": CACHE_VERSION, "files": entries}, f, separators=(",", ":"))
+    tmp.replace(cache_path)
+
+
+def validate_paths(paths, workers=None, use_cache=True, cache_path=CACHE_PATH):
+    """
+    {path: problem dict or None} for every path. Unchanged files (same size and
+    mtime, or same content hash) reuse the cached verdict; the rest are checked
+    in a process pool. Returns (results, number of files actually checked).
+    """
+    cache = load_cache(cache_path) if use_cache else {}
+    results, pending, digests = {}, [], {}
+    for path in paths:
+        key = os.path.abspath(path)
+        try:
+            stat = os.stat(path)
+        except OSError as e:
+            results[path] = {"line": 0, "column": 0, "message": f"unreadable: {e}"}
+            continue
+        entry = cache.get(key)
+        if entry and entry["size"] == stat.st_size and entry["mtime_ns"] == stat.st_mtime_ns:
+            results[path] = entry["problem"]
+            continue
+        with open(path, "rb") as f:
+            digest = _digest(f.read())
+        digests[path] = (key, stat, digest)
+        if entry and entry["hash"] == digest:
+            results[path] = entry["problem"]
+        else:
+            pending.append(path)
+
+    if len(pending) >= POOL_THRESHOLD and workers != 1:
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            checked = list(pool.map(_check_worker, pending, chunksize=max(1, len(pending) // 32)))
+    else:
+        checked = [_check_worker(path) for path in pending]
+    results.update(checked)
+
+    if use_cache:
+        for path, (key, stat, digest) in digests.items():
+            cache[key] = {"size": stat.st_size, "mtime_ns": stat.st_mtime_ns, "hash": digest,
+                          "problem": results[path]}
+        save_cache(cache, cache_path)
+    return results, len(pending)
+
+
+def find_sources(paths, skip_dirs=("node_modules", "dist", "build", ".git", ".cache")):
+    for path in paths:
+        path = str(path)
+        if os.path.isfile(path):
+            yield path
+            continue
+        for dirpath, dirnames, filenames in os.walk(path):
+            dirnames[:] = [d for d in dirnames if d not in skip_dirs]
+            for filename in sorted(filenames):
+                if filename.endswith(EXTENSIONS) and not filename.endswith(".d.ts"):
+                    yield os.path.join(dirpath, filename)
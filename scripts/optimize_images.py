@@ -1,8 +1,38 @@
 
 import os
 import sys
+import json
+import time
+import shutil
+import hashlib
+import argparse
+import tempfile
 import subprocess
 from pathlib import Path
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+# Converts large PNG/JPG files under public/ to WebP (same name, .webp), plus
+# responsive widths (<name>-<w>w.webp) and AVIF versions, from a single decode per image.
+#
+# - Conversions run on a process pool across all cores.
+# - .cache/optimize_images.json remembers each source's size, mtime and SHA-256 and the
+#   settings used. Unchanged sources are skipped without being opened; a source whose
+#   mtime changed but whose content didn't (git checkout) is skipped after hashing only.
+#
+# Usage:
+#   python scripts/optimize_images.py
+#   python scripts/optimize_images.py --widths 480,960 --no-avif
+#   python scripts/optimize_images.py --bench
+
+ROOT = Path(__file__).resolve().parent.parent
+CACHE_PATH = ROOT / ".cache" / "optimize_images.json"
+
+SOURCE_SUFFIXES = ('.png', '.jpg', '.jpeg')
+MAX_WIDTH = 2500
+DEFAULT_WIDTHS = (640, 1280)
+QUALITY = 85
+AVIF_QUALITY = 60
+
 
 def install_pillow():
     print("Installing Pillow for image conversion...")
@@ -13,71 +43,233 @@ def install_pillow():
         sys.exit(1)
 
 try:
-    from PIL import Image
+    from PIL import Image, features
 except ImportError:
     install_pillow()
-    from PIL import Image
+    from PIL import Image, features
+
+
+def avif_supported():
+    try:
+        return bool(features.check("avif"))
+    except Exception:
+        return False
+
+
+def normalize_mode(img):
+    """RGB/RGBA for the encoders, keeping transparency where there is any (palette PNGs, LA)."""
+    if img.mode in ("RGB", "RGBA"):
+        return img
+    return img.convert("RGBA" if "A" in img.getbands() or "transparency" in img.info else "RGB")
+
+
+def sha256_file(path):
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for block in iter(lambda: f.read(1 << 20), b""):
+            digest.update(block)
+    return digest.hexdigest()
 
-def convert_to_webp(directory, min_size_kb=200):
+
+def convert_image(file_path, widths, avif):
     """
-    Recursively finds images > min_size_kb and converts them to WebP.
+    Worker: decode once, then write the full-size WebP/AVIF and one WebP/AVIF per
+    responsive width smaller than the image. Runs in a child process.
     """
-    public_dir = Path(directory)
-    count = 0
-    saved_space = 0
+    file_path = Path(file_path)
+    written = []
+    with Image.open(file_path) as img:
+        img.load()
+        img = normalize_mode(img)
+
+        # Resize if extremely large (e.g., > 2500px width)
+        base = img
+        if base.width > MAX_WIDTH:
+            base = base.resize((MAX_WIDTH, round(base.height * MAX_WIDTH / base.width)), Image.Resampling.LANCZOS)
+
+        variants = [(None, base)]
+        for width in sorted(widths, reverse=True):
+            if width < base.width:
+                # Downscale from the previous (larger) variant: cheaper than from the original
+                source = variants[-1][1]
+                variants.append((width, source.resize((width, round(base.height * width / base.width)),
+                                                      Image.Resampling.LANCZOS)))
+
+        for width, variant in variants:
+            stem = file_path if width is None else file_path.with_name(f"{file_path.stem}-{width}w{file_path.suffix}")
+            webp_path = stem.with_suffix('.webp')
+            variant.save(webp_path, 'WEBP', quality=QUALITY)
+            written.append(str(webp_path))
+            if avif:
+                avif_path = stem.with_suffix('.avif')
+                variant.save(avif_path, 'AVIF', quality=AVIF_QUALITY)
+                written.append(str(avif_path))
+
+    webp_size = file_path.with_suffix('.webp').stat().st_size
+    return {"outputs": written, "webp_bytes": webp_size, "width": base.width}
 
-    print(f"Scanning {public_dir} for images larger than {min_size_kb}KB...")
 
-    for file_path in public_dir.rglob('*'):
-        if file_path.suffix.lower() not in ['.png', '.jpg', '.jpeg']:
+def load_cache(path):
+    if path.exists():
+        try:
+            with open(path, "r", encoding="utf-8") as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            print(f"Ignoring unreadable cache {path}")
+    return {"settings": None, "files": {}}
+
+
+def save_cache(path, cache):
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmp = path.with_suffix(".tmp")
+    with open(tmp, "w", encoding="utf-8") as f:
+        json.dump(cache, f, indent=1, sort_keys=True)
+    os.replace(tmp, path)
+
+
+def find_sources(public_dir, min_size_kb):
+    for file_path in sorted(public_dir.rglob('*')):
+        if file_path.suffix.lower() not in SOURCE_SUFFIXES or not file_path.is_file():
             continue
-        
-        # Skip if it's already a webp source (though looking for png/jpg)
-        
-        size_kb = file_path.stat().st_size / 1024
-        if size_kb > min_size_kb:
+        if file_path.stat().st_size / 1024 > min_size_kb:
+            yield file_path
+
+
+def optimize(directory, min_size_kb=200, widths=DEFAULT_WIDTHS, avif=True, workers=None,
+             cache_path=CACHE_PATH, use_cache=True, quiet=False):
+    """
+    Converts every PNG/JPG in `directory` larger than min_size_kb. Returns a stats dict
+    (converted, skipped, failed, bytes_in, bytes_out, seconds).
+    """
+    public_dir = Path(directory)
+    widths = tuple(sorted(set(widths)))
+    settings = {"widths": list(widths), "avif": avif, "quality": QUALITY,
+                "avif_quality": AVIF_QUALITY, "max_width": MAX_WIDTH}
+    cache = load_cache(cache_path) if use_cache else {"settings": None, "files": {}}
+    if cache.get("settings") != settings:
+        # Different output settings: every cached entry is stale
+        cache = {"settings": settings, "files": {}}
+    entries = cache["files"]
+
+    log = (lambda *a: None) if quiet else print
+    log(f"Scanning {public_dir} for images larger than {min_size_kb}KB...")
+
+    stats = {"converted": 0, "skipped": 0, "failed": 0, "bytes_in": 0, "bytes_out": 0}
+    started = time.perf_counter()
+
+    jobs = []
+    for file_path in find_sources(public_dir, min_size_kb):
+        key = file_path.relative_to(public_dir).as_posix()
+        stat = file_path.stat()
+        entry = entries.get(key)
+        # Widths at or above the image's own width are never written, so trust the
+        # cached output list rather than the full set of possible names
+        outputs_exist = entry is not None and all((public_dir / p).exists() for p in entry["outputs"])
+
+        if outputs_exist:
+            if entry["size"] == stat.st_size and entry["mtime_ns"] == stat.st_mtime_ns:
+                stats["skipped"] += 1
+                continue
+            digest = sha256_file(file_path)
+            if digest == entry["sha256"]:
+                entry.update(size=stat.st_size, mtime_ns=stat.st_mtime_ns)
+                stats["skipped"] += 1
+                continue
+        else:
+            digest = sha256_file(file_path)
+        jobs.append((key, file_path, stat, digest))
+
+    log(f"{len(jobs)} to convert, {stats['skipped']} unchanged")
+
+    with ProcessPoolExecutor(max_workers=workers or os.cpu_count()) as pool:
+        futures = {pool.submit(convert_image, str(path), widths, avif): (key, path, stat, digest)
+                   for key, path, stat, digest in jobs}
+        for done, future in enumerate(as_completed(futures), 1):
+            key, path, stat, digest = futures[future]
             try:
-                # Target path
-                webp_path = file_path.with_suffix('.webp')
-                
-                # Check if webp already exists and is efficient
-                if webp_path.exists() and webp_path.stat().st_size < file_path.stat().st_size:
-                    print(f"Skipping {file_path.name} (WebP already exists)")
-                    continue
-
-                print(f"Converting {file_path.name} ({size_kb:.1f}KB)...")
-                
-                with Image.open(file_path) as img:
-                    # Resize if extremely large (e.g., > 2500px width)
-                    if img.width > 2500:
-                        ratio = 2500 / img.width
-                        new_height = int(img.height * ratio)
-                        img = img.resize((2500, new_height), Image.Resampling.LANCZOS)
-                        print(f"  Resized to 2500px width")
-
-                    # Convert to RGB if necessary (e.g. PNG with alpha)
-                    # For PNGs with transparency, we keep RGBA, but WebP handles it.
-                    # If saving as JPG we'd need RGB. WebP supports transparency.
-                    
-                    img.save(webp_path, 'WEBP', quality=85, optimize=True)
-                
-                new_size_kb = webp_path.stat().st_size / 1024
-                saved = size_kb - new_size_kb
-                if saved > 0:
-                    print(f"  -> Created {webp_path.name} ({new_size_kb:.1f}KB). Saved {saved:.1f}KB")
-                    saved_space += saved
-                    count += 1
-                else:
-                    print(f"  -> Created {webp_path.name} but it was larger/same. Keeping both.")
-                    
+                result = future.result()
             except Exception as e:
-                print(f"Error converting {file_path}: {e}")
+                log(f"Error converting {path}: {e}")
+                stats["failed"] += 1
+                continue
+
+            stats["converted"] += 1
+            stats["bytes_in"] += stat.st_size
+            stats["bytes_out"] += result["webp_bytes"]
+            saved = (stat.st_size - result["webp_bytes"]) / 1024
+            note = f"Saved {saved:.1f}KB" if saved > 0 else "larger/same as source, keeping both"
+            log(f"  {key} ({stat.st_size / 1024:.1f}KB) -> {len(result['outputs'])} files. {note}")
+
+            entries[key] = {"size": stat.st_size, "mtime_ns": stat.st_mtime_ns, "sha256": digest,
+                            "outputs": [Path(p).relative_to(public_dir).as_posix() for p in result["outputs"]]}
+            if use_cache and done % 20 == 0:
+                save_cache(cache_path, cache)
+
+    if use_cache:
+        save_cache(cache_path, cache)
+
+    stats["seconds"] = time.perf_counter() - started
+    return stats
+
+
+def print_summary(stats):
+    rate = stats["converted"] / stats["seconds"] if stats["seconds"] else 0
+    saved = (stats["bytes_in"] - stats["bytes_out"]) / (1024 * 1024)
+    print(f"\nSummary: Converted {stats['converted']} images ({stats['skipped']} unchanged, "
+          f"{stats['failed']} failed) in {stats['seconds']:.1f}s, {rate:.2f} images/sec. "
+          f"Total space saved: {saved:.2f} MB")
+
+
+def bench(public_dir, sample, widths, avif):
+    """Times serial vs. pooled conversion on a temp copy of the first `sample` images, then a warm re-run."""
+    sources = list(find_sources(public_dir, 200))[:sample]
+    if not sources:
+        print("No images to benchmark.")
+        return
+    with tempfile.TemporaryDirectory() as tmp:
+        tmp = Path(tmp)
+        for src in sources:
+            dest = tmp / "public" / src.relative_to(public_dir)
+            dest.parent.mkdir(parents=True, exist_ok=True)
+            shutil.copy2(src, dest)
+        cache_path = tmp / "cache.json"
+
+        print(f"Benchmarking {len(sources)} images, widths={list(widths)}, avif={avif}\n")
+        for label, workers, use_cache in (("serial, cold", 1, False), (f"pool ({os.cpu_count()} cores), cold", None, True),
+                                          ("pool, warm cache", None, True)):
+            stats = optimize(tmp / "public", 200, widths, avif, workers, cache_path, use_cache, quiet=True)
+            rate = stats["converted"] / stats["seconds"] if stats["seconds"] else 0
+            saved = (stats["bytes_in"] - stats["bytes_out"]) / (1024 * 1024)
+            print(f"{label:<24} {stats['seconds']:7.2f}s  {rate:6.2f} images/sec  "
+                  f"{stats['skipped']:4} skipped  {saved:7.2f} MB saved")
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="Convert large public/ images to WebP/AVIF with responsive widths")
+    parser.add_argument("directory", nargs="?", default=str(ROOT / "public"))
+    parser.add_argument("--min-size-kb", type=int, default=200)
+    parser.add_argument("--widths", default=",".join(str(w) for w in DEFAULT_WIDTHS),
+                        help="Responsive widths to emit (empty for none)")
+    parser.add_argument("--no-avif", action="store_true", help="Skip AVIF output")
+    parser.add_argument("--workers", type=int, help="Processes (default: all cores)")
+    parser.add_argument("--no-cache", action="store_true", help="Ignore and don't update the cache manifest")
+    parser.add_argument("--bench", type=int, nargs="?", const=20, metavar="N",
+                        help="Benchmark on a temp copy of N images (default 20) instead of converting")
+    return parser.parse_args()
 
-    print(f"\nSummary: Converted {count} images. Total space saved: {saved_space/1024:.2f} MB")
 
 if __name__ == "__main__":
-    target_dir = os.path.join(os.getcwd(), "public")
-    if not os.path.exists(target_dir):
-        print("Error: 'public' directory not found.")
+    args = parse_args()
+    target_dir = Path(args.directory)
+    widths = [int(w) for w in args.widths.split(",") if w.strip()]
+    avif = not args.no_avif and avif_supported()
+    if not args.no_avif and not avif:
+        print("This Pillow build has no AVIF support, writing WebP only.")
+
+    if not target_dir.exists():
+        print(f"Error: '{target_dir}' directory not found.")
+    elif args.bench:
+        bench(target_dir, args.bench, widths, avif)
     else:
-        convert_to_webp(target_dir)
+        print_summary(optimize(target_dir, args.min_size_kb, widths, avif, args.workers,
+                               use_cache=not args.no_cache))
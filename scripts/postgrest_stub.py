@@ -0,0 +1,620 @@
+import json
+import uuid
+import hashlib
+import random
+import argparse
+import datetime
+import threading
+from bisect import bisect_left
+from urllib.parse import urlsplit, parse_qsl
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+# Local stand-in for the Supabase REST API (PostgREST) so the admin scripts can be
+# run and benchmarked without touching a real project.
+#
+# Serves synthetic, deterministic rows for the tables in backup_database.TABLES and
+# understands the subset of PostgREST the scripts use:
+#   GET    /rest/v1/<table>?select=a,b&order=x.asc,y.desc&limit=&offset=
+#          filters: eq neq gt gte lt lte like ilike in is, not.<op>, or=(...), and=(...)
+#   POST   /rest/v1/<table>   (insert, or upsert on id / ?on_conflict= with Prefer: resolution=merge-duplicates)
+#   PATCH  /rest/v1/<table>?<filters>
+#   DELETE /rest/v1/<table>?<filters>
+#   POST   /rest/v1/rpc/<function>   (only functions registered in Store.functions)
+#   POST   /storage/v1/object/list/<bucket>, GET/POST /storage/v1/object[/public]/<bucket>/<path>
+#   Prefer: count=exact  ->  Content-Range header
+#   GET    /auth/v1/admin/users?page=&per_page=   newest first, X-Total-Count header
+#   GET    /rest/v1/   OpenAPI document inferred from the first row of each table, with an
+#          ETag (If-None-Match -> 304)
+#
+# Usage:
+#   python scripts/postgrest_stub.py --rows 200000 --port 54321
+#   python scripts/backup_database.py --url http://127.0.0.1:54321 --key stub --out /tmp/bk
+
+TRADES = ["plumber", "electrician", "locksmith", "gas-engineer", "drain-specialist", "glazier", "breakdown-recovery"]
+CITIES = ["London", "Manchester", "Birmingham", "Leeds", "Bristol", "Luton", "Liverpool", "Sheffield", "Glasgow", "Cardiff"]
+STREETS = ["High Street", "Station Road", "Church Lane", "Park Avenue", "Victoria Road", "Mill Lane"]
+BASE_TIME = datetime.datetime(2025, 1, 1, tzinfo=datetime.timezone.utc)
+
+
+def _iso(dt):
+    return dt.isoformat(timespec="microseconds")
+
+
+def make_business(rng, i):
+    trade = rng.choice(TRADES)
+    city = rng.choice(CITIES)
+    created = BASE_TIME + datetime.timedelta(seconds=i * 37)
+    name = f"{rng.choice(['Rapid', 'Ace', 'City', 'Pro', 'Express', 'Local'])} {trade.replace('-', ' ').title()} {i}"
+    return {
+        "id": str(uuid.UUID(int=rng.getrandbits(128), version=4)),
+        "name": name,
+        "slug": name.lower().replace(" ", "-"),
+        "trade": trade,
+        "city": city,
+        "address": f"{rng.randint(1, 200)} {rng.choice(STREETS)}, {city}",
+        "phone": f"07{rng.randint(100000000, 999999999)}",
+        "email": f"info{i}@example.co.uk",
+        "website": None,
+        "rating": round(rng.uniform(3.5, 5.0), 1),
+        "review_count": rng.randint(0, 400),
+        "verified": rng.random() < 0.4,
+        "is_premium": rng.random() < 0.1,
+        "tier": "paid" if rng.random() < 0.1 else "free",
+        "priority_score": rng.randint(0, 100),
+        "logo_url": None,
+        "photos": [],
+        "created_at": _iso(created),
+        "updated_at": _iso(created + datetime.timedelta(days=rng.randint(0, 30))),
+    }
+
+
+def make_generic(rng, table, i):
+    created = BASE_TIME + datetime.timedelta(seconds=i * 53)
+    return {
+        "id": str(uuid.UUID(int=rng.getrandbits(128), version=4)),
+        "title": f"{table} row {i}",
+        "body": "x" * rng.randint(20, 400),
+        "created_at": _iso(created),
+        "updated_at": _iso(created),
+    }
+
+
+def generate_tables(rows, tables, seed=0):
+    rng = random.Random(seed)
+    data = {}
+    for table in tables:
+        count = rows if table == "businesses" else max(1, rows // 20)
+        if table == "businesses":
+            data[table] = [make_business(rng, i) for i in range(count)]
+        else:
+            data[table] = [make_generic(rng, table, i) for i in range(count)]
+    return data
+
+
+# ---------------------------------------------------------------------------
+# PostgREST filter parsing
+# ---------------------------------------------------------------------------
+
+def split_top_level(text):
+    """Split on commas that are not inside parentheses or double quotes."""
+    parts, depth, quoted, buf = [], 0, False, []
+    i = 0
+    while i < len(text):
+        ch = text[i]
+        if ch == "\\" and quoted and i + 1 < len(text):
+            buf.append(text[i:i + 2])
+            i += 2
+            continue
+        if ch == '"':
+            quoted = not quoted
+        elif not quoted and ch == "(":
+            depth += 1
+        elif not quoted and ch == ")":
+            depth -= 1
+        if ch == "," and depth == 0 and not quoted:
+            parts.append("".join(buf))
+            buf = []
+        else:
+            buf.append(ch)
+        i += 1
+    if buf:
+        parts.append("".join(buf))
+    return parts
+
+
+def unquote(value):
+    if len(value) >= 2 and value[0] == value[-1] == '"':
+        return value[1:-1].replace('\\"', '"').replace("\\\\", "\\")
+    return value
+
+
+def coerce(raw, sample):
+    if isinstance(sample, bool):
+        return raw.lower() == "true"
+    if isinstance(sample, int):
+        try:
+            return int(raw)
+        except ValueError:
+            return raw
+    if isinstance(sample, float):
+        try:
+            return float(raw)
+        except ValueError:
+            return raw
+    return raw
+
+
+def like_match(pattern, value, ignore_case):
+    import fnmatch
+    pattern = pattern.replace("%", "*")
+    if ignore_case:
+        return fnmatch.fnmatchcase(value.lower(), pattern.lower())
+    return fnmatch.fnmatchcase(value, pattern)
+
+
+def compare(op, value, raw):
+    if op == "is":
+        lowered = raw.lower()
+        if lowered == "null":
+            return value is None
+        if lowered in ("true", "false"):
+            return value is (lowered == "true")
+        return False
+    if op == "in":
+        options = [unquote(v) for v in split_top_level(raw.strip("()"))]
+        return value is not None and any(value == coerce(o, value) for o in options)
+    if value is None:
+        return False
+    if op in ("like", "ilike"):
+        return like_match(raw, str(value), op == "ilike")
+    target = coerce(raw, value)
+    try:
+        if op == "eq":
+            return value == target
+        if op == "neq":
+            return value != target
+        if op == "gt":
+            return value > target
+        if op == "gte":
+            return value >= target
+        if op == "lt":
+            return value < target
+        if op == "lte":
+            return value <= target
+    except TypeError:
+        return False
+    raise ValueError(f"unsupported operator: {op}")
+
+
+def build_condition(column, expr):
+    """column + 'op.value' (optionally 'not.op.value') -> predicate(row)."""
+    negate = expr.startswith("not.")
+    if negate:
+        expr = expr[4:]
+    op, _, raw = expr.partition(".")
+    raw = unquote(raw)
+    if op == "in":
+        # Parsed once, not per row: in.(...) lists can hold hundreds of keys
+        options = [unquote(v) for v in split_top_level(raw.strip("()"))]
+        by_type = {}
+
+        def predicate(row):
+            value = row.get(column)
+            if value is None:
+                result = False
+            else:
+                kind = type(value)
+                if kind not in by_type:
+                    coerced = [coerce(o, value) for o in options]
+                    try:
+                        by_type[kind] = set(coerced)
+                    except TypeError:
+                        by_type[kind] = coerced
+                result = value in by_type[kind]
+            return not result if negate else result
+        return predicate
+
+    def predicate(row):
+        result = compare(op, row.get(column), raw)
+        return not result if negate else result
+    return predicate
+
+
+def build_logic(kind, body):
+    """kind is 'or'/'and', body is '(cond,cond,...)' where cond is col.op.val or a nested tree."""
+    items = []
+    for part in split_top_level(body.strip()[1:-1]):
+        part = part.strip()
+        for nested in ("and", "or", "not.and", "not.or"):
+            if part.startswith(nested + "("):
+                inner = build_logic(nested.split(".")[-1], part[len(nested):])
+                items.append((lambda p: lambda row: not p(row))(inner) if nested.startswith("not.") else inner)
+                break
+        else:
+            column, _, expr = part.partition(".")
+            items.append(build_condition(column, expr))
+    if kind == "or":
+        return lambda row: any(p(row) for p in items)
+    return lambda row: all(p(row) for p in items)
+
+
+RESERVED = {"select", "order", "limit", "offset", "on_conflict", "columns"}
+
+
+def parse_query(params):
+    """The row predicates for the filter params of a request (all must hold)."""
+    predicates = []
+    for key, value in params:
+        if key in RESERVED:
+            continue
+        if key in ("or", "and"):
+            predicates.append(build_logic(key, value))
+        else:
+            predicates.append(build_condition(key, value))
+    return predicates
+
+
+def sort_key(columns):
+    def key(row):
+        out = []
+        for column, desc in columns:
+            value = row.get(column)
+            # Postgres sorts NULLs last for ASC
+            out.append((value is None, value if value is not None else ""))
+        return tuple(out)
+    return key
+
+
+def parse_order(value):
+    columns = []
+    for part in value.split(","):
+        bits = part.split(".")
+        columns.append((bits[0], len(bits) > 1 and bits[1] == "desc"))
+    return columns
+
+
+def is_keyset(params, order):
+    """
+    True when every filter is a lower bound on the leading sort columns (what keyset
+    pagination sends). Those predicates are monotone over the sorted rows, so the
+    first match can be found with a binary search instead of a scan.
+    """
+    if not order or any(desc for _, desc in order):
+        return False
+    order_cols = {c for c, _ in order}
+    filters = [(k, v) for k, v in params if k not in RESERVED]
+    if not filters:
+        return False
+    for key, value in filters:
+        if key == "or":
+            # or=(a.gt.x,and(a.eq.x,b.gt.y)) as produced by backup_database.keyset_filter
+            for part in split_top_level(value[1:-1]):
+                cols = [p.split(".")[0] for p in split_top_level(part[4:-1])] if part.startswith("and(") else [part.split(".")[0]]
+                if not set(cols) <= order_cols:
+                    return False
+        elif key != order[0][0] or not (value.startswith("gt.") or value.startswith("gte.")):
+            return False
+    return True
+
+
+def openapi_property(column, value):
+    if column == "id":
+        return {"description": "Note:\nThis is a Primary Key.<pk/>", "default": "gen_random_uuid()",
+                "format": "uuid", "type": "string"}
+    if isinstance(value, bool):
+        return {"format": "boolean", "type": "boolean"}
+    if isinstance(value, int):
+        return {"format": "integer", "type": "integer"}
+    if isinstance(value, float):
+        return {"format": "numeric", "type": "number"}
+    if isinstance(value, list):
+        return {"format": "text[]", "items": {"type": "string"}, "type": "array"}
+    if isinstance(value, dict):
+        return {"format": "jsonb"}
+    if column.endswith("_at"):
+        return {"format": "timestamp with time zone", "type": "string"}
+    return {"format": "text", "type": "string"}
+
+
+class Store:
+    def __init__(self, tables):
+        self.tables = tables
+        self.lock = threading.Lock()
+        self._sorted = {}
+        # name -> callable(tables, **args) returning rows, for /rest/v1/rpc/<name>
+        self.functions = {}
+        # bucket -> {path: {"data": bytes, "content_type": str, "updated_at": str}}
+        self.buckets = {}
+        # GoTrue users for /auth/v1/admin/users
+        self.users = []
+
+    def invalidate(self, table):
+        for cache_key in [k for k in self._sorted if k[0] == table]:
+            del self._sorted[cache_key]
+
+    def sorted_rows(self, table, order):
+        cache_key = (table, tuple(order))
+        rows = self._sorted.get(cache_key)
+        if rows is None:
+            rows = list(self.tables.get(table, []))
+            # Stable multi-key sort, applied from the last key to the first
+            for column, desc in reversed(order):
+                rows.sort(key=sort_key([(column, desc)]), reverse=desc)
+            self._sorted[cache_key] = rows
+        return rows
+
+    def select(self, table, params):
+        param_map = dict(params)
+        order = parse_order(param_map["order"]) if "order" in param_map else []
+        predicates = parse_query(params)
+        with self.lock:
+            rows = self.sorted_rows(table, order) if order else self.tables.get(table, [])
+
+            if predicates and is_keyset(params, order):
+                matches = lambda row: all(p(row) for p in predicates)
+                start = bisect_left(range(len(rows)), True, key=lambda i: matches(rows[i]))
+                result = rows[start:]
+            elif predicates:
+                result = [r for r in rows if all(p(r) for p in predicates)]
+            else:
+                result = rows
+
+        total = len(result)
+        offset = int(param_map.get("offset", 0))
+        limit = param_map.get("limit")
+        result = result[offset:offset + int(limit)] if limit is not None else result[offset:]
+
+        select = param_map.get("select", "*")
+        if select != "*":
+            columns = [c.strip() for c in select.split(",")]
+            result = [{c: r.get(c) for c in columns} for r in result]
+        return result, offset, total
+
+    def openapi(self):
+        """Swagger 2.0 document in PostgREST's shape, column types guessed from the first row."""
+        definitions = {}
+        with self.lock:
+            for table, rows in self.tables.items():
+                properties = {}
+                for column, value in (rows[0] if rows else {"id": str(uuid.uuid4())}).items():
+                    properties[column] = openapi_property(column, value)
+                definitions[table] = {"required": ["id"], "properties": properties, "type": "object"}
+            paths = {"/": {}}
+            paths.update({f"/{t}": {} for t in self.tables})
+            paths.update({f"/rpc/{name}": {} for name in self.functions})
+        return {"swagger": "2.0", "info": {"title": "PostgREST stub"}, "paths": paths, "definitions": definitions}
+
+    def upsert(self, table, rows, merge, on_conflict="id"):
+        with self.lock:
+            existing = self.tables.setdefault(table, [])
+            by_key = {r.get(on_conflict): r for r in existing}
+            for row in rows:
+                row = dict(row)
+                row.setdefault("id", str(uuid.uuid4()))
+                current = by_key.get(row.get(on_conflict))
+                if current is not None:
+                    if not merge:
+                        raise KeyError(row.get(on_conflict))
+                    current.update(row)
+                else:
+                    existing.append(row)
+                    by_key[row.get(on_conflict)] = row
+            self.invalidate(table)
+        return len(rows)
+
+    def update(self, table, params, values):
+        predicates = parse_query(params)
+        with self.lock:
+            hits = [r for r in self.tables.get(table, []) if all(p(r) for p in predicates)]
+            for row in hits:
+                row.update(values)
+            self.invalidate(table)
+        return hits
+
+    def delete(self, table, params):
+        predicates = parse_query(params)
+        with self.lock:
+            rows = self.tables.get(table, [])
+            keep = [r for r in rows if not all(p(r) for p in predicates)]
+            self.tables[table] = keep
+            self.invalidate(table)
+        return len(rows) - len(keep)
+
+
+class Handler(BaseHTTPRequestHandler):
+    store = None
+    protocol_version = "HTTP/1.1"  # keep-alive
+
+    def log_message(self, format, *args):
+        pass
+
+    def _send(self, status, body=None, headers=None):
+        payload = b"" if body is None else json.dumps(body, default=str).encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(payload)))
+        for key, value in (headers or {}).items():
+            self.send_header(key, value)
+        self.end_headers()
+        self.wfile.write(payload)
+
+    def _route(self):
+        parts = urlsplit(self.path)
+        params = parse_qsl(parts.query, keep_blank_values=True)
+        segments = [s for s in parts.path.split("/") if s]
+        if len(segments) == 3 and segments[:2] == ["rest", "v1"]:
+            return segments[2], params
+        return None, params
+
+    def _rpc(self, name, params):
+        function = self.store.functions.get(name)
+        args = self._body() or {}
+        if function is None:
+            return self._send(404, {"code": "PGRST202", "message": f"Could not find the function public.{name}"})
+        with self.store.lock:
+            rows = function(self.store.tables, **args)
+        if isinstance(rows, list):
+            param_map = dict(params)
+            offset = int(param_map.get("offset", 0))
+            limit = param_map.get("limit")
+            rows = rows[offset:offset + int(limit)] if limit is not None else rows[offset:]
+        self._send(200, rows)
+
+    def _raw_body(self):
+        length = int(self.headers.get("Content-Length") or 0)
+        return self.rfile.read(length)
+
+    def _body(self):
+        return json.loads(self._raw_body() or b"null")
+
+    def _storage(self, method):
+        path = urlsplit(self.path).path[len("/storage/v1/object/"):]
+        if method == "POST" and path.startswith("list/"):
+            bucket = self.store.buckets.get(path[len("list/"):], {})
+            body = self._body() or {}
+            prefix = body.get("prefix", "").strip("/")
+            prefix = prefix + "/" if prefix else ""
+            entries = {}
+            for name, obj in bucket.items():
+                if not name.startswith(prefix):
+                    continue
+                head, sep, _ = name[len(prefix):].partition("/")
+                if sep:
+                    entries.setdefault(head, {"name": head, "id": None, "metadata": None})
+                else:
+                    entries[head] = {"name": head, "id": obj["id"], "updated_at": obj["updated_at"],
+                                     "metadata": {"size": len(obj["data"]), "mimetype": obj["content_type"],
+                                                  "eTag": obj["etag"]}}
+            items = [entries[k] for k in sorted(entries)]
+            offset, limit = body.get("offset", 0), body.get("limit", 100)
+            return self._send(200, items[offset:offset + limit])
+
+        if path.startswith("public/"):
+            path = path[len("public/"):]
+        bucket_name, _, name = path.partition("/")
+        bucket = self.store.buckets.setdefault(bucket_name, {})
+        if method == "POST":
+            data = self._raw_body()
+            if name in bucket and self.headers.get("x-upsert") != "true":
+                return self._send(409, {"message": "The resource already exists"})
+            bucket[name] = {"data": data, "content_type": self.headers.get("Content-Type"), "id": str(uuid.uuid4()),
+                            "updated_at": _iso(datetime.datetime.now(datetime.timezone.utc)),
+                            "etag": hashlib.md5(data).hexdigest()}
+            return self._send(200, {"Key": f"{bucket_name}/{name}"})
+        obj = bucket.get(name)
+        if obj is None:
+            return self._send(404, {"message": "Object not found"})
+        self.send_response(200)
+        self.send_header("Content-Type", obj["content_type"] or "application/octet-stream")
+        self.send_header("Content-Length", str(len(obj["data"])))
+        self.end_headers()
+        self.wfile.write(obj["data"])
+
+    def _auth_users(self):
+        params = dict(parse_qsl(urlsplit(self.path).query))
+        page = max(1, int(params.get("page", 1)))
+        per_page = int(params.get("per_page", 50))
+        with self.store.lock:
+            # Newest first by time, as GoTrue does (the strings drop trailing zeros)
+            users = sorted(self.store.users, reverse=True,
+                           key=lambda u: datetime.datetime.fromisoformat(u["created_at"].replace("Z", "+00:00")))
+        start = (page - 1) * per_page
+        self._send(200, {"users": users[start:start + per_page], "aud": "authenticated"},
+                   {"X-Total-Count": str(len(users))})
+
+    def _openapi(self):
+        spec = self.store.openapi()
+        etag = '"' + hashlib.sha256(json.dumps(spec, sort_keys=True).encode("utf-8")).hexdigest()[:32] + '"'
+        if self.headers.get("If-None-Match") == etag:
+            self.send_response(304)
+            self.send_header("ETag", etag)
+            self.send_header("Content-Length", "0")
+            self.end_headers()
+            return
+        self._send(200, spec, {"ETag": etag})
+
+    def do_GET(self):
+        if self.path.startswith("/storage/v1/object/"):
+            return self._storage("GET")
+        if urlsplit(self.path).path.rstrip("/") == "/rest/v1":
+            return self._openapi()
+        if urlsplit(self.path).path == "/auth/v1/admin/users":
+            return self._auth_users()
+        table, params = self._route()
+        if table is None:
+            return self._send(404, {"message": "not found"})
+        try:
+            rows, offset, total = self.store.select(table, params)
+        except ValueError as e:
+            return self._send(400, {"message": str(e)})
+        headers = {}
+        if "count=exact" in (self.headers.get("Prefer") or ""):
+            end = offset + len(rows) - 1
+            headers["Content-Range"] = f"{offset}-{end}/{total}" if rows else f"*/{total}"
+        self._send(200, rows, headers)
+
+    def do_POST(self):
+        if self.path.startswith("/storage/v1/object/"):
+            return self._storage("POST")
+        if self.path.startswith("/rest/v1/rpc/"):
+            name = urlsplit(self.path).path.rsplit("/", 1)[-1]
+            return self._rpc(name, parse_qsl(urlsplit(self.path).query))
+        table, params = self._route()
+        if table is None:
+            return self._send(404, {"message": "not found"})
+        body = self._body()
+        rows = body if isinstance(body, list) else [body]
+        merge = "resolution=merge-duplicates" in (self.headers.get("Prefer") or "")
+        try:
+            self.store.upsert(table, rows, merge, dict(params).get("on_conflict", "id"))
+        except KeyError as e:
+            return self._send(409, {"message": f"duplicate key {e}"})
+        self._send(201)
+
+    def do_PATCH(self):
+        table, params = self._route()
+        if table is None:
+            return self._send(404, {"message": "not found"})
+        hits = self.store.update(table, params, self._body())
+        if "return=representation" in (self.headers.get("Prefer") or ""):
+            return self._send(200, hits)
+        self._send(204)
+
+    def do_DELETE(self):
+        table, params = self._route()
+        if table is None:
+            return self._send(404, {"message": "not found"})
+        self.store.delete(table, params)
+        self._send(204)
+
+
+def serve(tables, host="127.0.0.1", port=54321, functions=None, buckets=None, users=None):
+    """Start the stub in a background thread. Returns the server (call .shutdown() to stop)."""
+    store = Store(tables)
+    store.functions.update(functions or {})
+    store.buckets.update(buckets or {})
+    store.users.extend(users or [])
+    handler = type("StubHandler", (Handler,), {"store": store})
+    server = ThreadingHTTPServer((host, port), handler)
+    server.daemon_threads = True
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    return server
+
+
+if __name__ == "__main__":
+    from backup_database import TABLES
+
+    parser = argparse.ArgumentParser(description="Local PostgREST stand-in with synthetic data")
+    parser.add_argument("--rows", type=int, default=50000, help="Rows in businesses (other tables get rows/20)")
+    parser.add_argument("--port", type=int, default=54321)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    print(f"Generating {args.rows} business rows...")
+    server = serve(generate_tables(args.rows, TABLES, args.seed), port=args.port)
+    print(f"PostgREST stub listening on http://127.0.0.1:{args.port} (Ctrl+C to stop)")
+    try:
+        threading.Event().wait()
+    except KeyboardInterrupt:
+        server.shutdown()
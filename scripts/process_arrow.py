@@ -1,30 +1,75 @@
+import sys
+import argparse
+from pathlib import Path
+
 from PIL import Image
 
-def process_arrow():
-    input_path = "c:/Users/Nick/Downloads/hitmaker-2026/emergency-tradesmen/public/arrow-original.jpg"
-    output_path = "c:/Users/Nick/Downloads/hitmaker-2026/emergency-tradesmen/public/custom-arrow.png"
+from lib import ROOT
+from lib.recolor import GOLD, parse_color, recolor
+
+# Turns artwork on a white background into a transparent single-colour PNG
+# (white -> transparent, everything else -> gold by default).
+#
+# Usage:
+#   python scripts/process_arrow.py
+#   python scripts/process_arrow.py public/arrow-original.jpg public/custom-arrow.png
+#   python scripts/process_arrow.py --dir icons/raw --out public/icons --color "#FFFFFF"
+
+IMAGE_SUFFIXES = (".png", ".jpg", ".jpeg", ".webp")
+
+
+def process_file(input_path, output_path, color=GOLD, threshold=200):
+    with Image.open(input_path) as img:
+        out = recolor(img, color, threshold)
+    output_path.parent.mkdir(parents=True, exist_ok=True)
+    out.save(output_path, "PNG")
+
+
+def process_dir(input_dir, output_dir, color=GOLD, threshold=200):
+    count = 0
+    for path in sorted(input_dir.iterdir()):
+        if path.suffix.lower() not in IMAGE_SUFFIXES:
+            continue
+        try:
+            process_file(path, output_dir / f"{path.stem}.png", color, threshold)
+            count += 1
+        except Exception as e:
+            print(f"Error processing {path.name}: {e}")
+    return count
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Key out a white background and recolour an image")
+    parser.add_argument("input", nargs="?", default=str(ROOT / "public" / "arrow-original.jpg"))
+    parser.add_argument("output", nargs="?", default=str(ROOT / "public" / "custom-arrow.png"))
+    parser.add_argument("--dir", help="Process every image in this directory instead")
+    parser.add_argument("--out", help="Output directory for --dir (default: <dir>/processed)")
+    parser.add_argument("--color", default="#D4AF37", help="Colour for the non-background pixels")
+    parser.add_argument("--threshold", type=int, default=200,
+                        help="R, G and B all above this count as background")
+    args = parser.parse_args()
 
     try:
-        img = Image.open(input_path).convert("RGBA")
-        datas = img.getdata()
-        
-        new_data = []
-        for item in datas:
-            # item is (R, G, B, A)
-            # Check for white background (threshold 200)
-            if item[0] > 200 and item[1] > 200 and item[2] > 200:
-                new_data.append((255, 255, 255, 0)) # Transparent
-            else:
-                # Colorize to Gold (#D4AF37 -> 212, 175, 55)
-                # Keep full opacity
-                new_data.append((212, 175, 55, 255))
-        
-        img.putdata(new_data)
-        img.save(output_path, "PNG")
-        print(f"Successfully saved transparent gold arrow to {output_path}")
+        color = parse_color(args.color)
+    except ValueError as e:
+        print(f"Error: {e}")
+        return 1
 
+    if args.dir:
+        input_dir = Path(args.dir)
+        output_dir = Path(args.out) if args.out else input_dir / "processed"
+        count = process_dir(input_dir, output_dir, color, args.threshold)
+        print(f"Processed {count} images into {output_dir}")
+        return 0
+
+    try:
+        process_file(Path(args.input), Path(args.output), color, args.threshold)
+        print(f"Successfully saved transparent recoloured image to {args.output}")
     except Exception as e:
         print(f"Error processing image: {e}")
+        return 1
+    return 0
+
 
 if __name__ == "__main__":
-    process_arrow()
+    sys.exit(main())
@@ -0,0 +1,101 @@
+import sys
+import json
+import time
+import argparse
+from pathlib import Path
+
+from lib.listings import SOURCE_PATH, ListingsParseError, load_listings
+
+# Counts, coverage and lookups over the static businessListings in src/lib/businesses.ts,
+# without running node or regex-scanning the 2MB file each time.
+#
+# The parsed listings are cached in .cache/businesses.ts.pickle until the file changes,
+# so repeat queries take milliseconds.
+#
+# Usage:
+#   python scripts/query_listings.py count
+#   python scripts/query_listings.py count --city luton --trade locksmith
+#   python scripts/query_listings.py coverage
+#   python scripts/query_listings.py find --phone "01582 873354"
+#   python scripts/query_listings.py find --name "pacific heat" --json
+#   python scripts/query_listings.py get luton-plumb-25
+#   python scripts/query_listings.py duplicates --field phone
+
+
+def print_records(records, as_json, limit):
+    if as_json:
+        print(json.dumps([dict(b, _city=c, _trade=t) for c, t, b in records[:limit]], indent=2))
+        return
+    for city, trade, business in records[:limit]:
+        print(f"  {business.get('id', ''):<28} {city:<16} {trade:<18} {business.get('name', '')}  {business.get('phone', '')}")
+    if len(records) > limit:
+        print(f"  ... {len(records) - limit} more")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Query the static listings in src/lib/businesses.ts")
+    parser.add_argument("--source", default=str(SOURCE_PATH), help="Path to businesses.ts")
+    parser.add_argument("--no-cache", action="store_true", help="Re-parse and don't write the cache")
+    sub = parser.add_subparsers(dest="command", required=True)
+    output = argparse.ArgumentParser(add_help=False)
+    output.add_argument("--limit", type=int, default=50, help="Max records listed")
+    output.add_argument("--json", action="store_true", help="Print records as JSON")
+
+    count = sub.add_parser("count", help="Number of listings, optionally for one city and/or trade")
+    count.add_argument("--city")
+    count.add_argument("--trade")
+    sub.add_parser("coverage", help="Listings per city and trade")
+    find = sub.add_parser("find", parents=[output], help="Listings matching every given field")
+    for field in ("city", "trade", "phone", "name"):
+        find.add_argument(f"--{field}")
+    get = sub.add_parser("get", help="Listing by id")
+    get.add_argument("id")
+    dupes = sub.add_parser("duplicates", parents=[output],
+                           help="Ids, phones or names used by more than one listing")
+    dupes.add_argument("--field", default="id", choices=["id", "phone", "name"])
+    args = parser.parse_args(argv)
+
+    started = time.perf_counter()
+    try:
+        index = load_listings(Path(args.source), use_cache=not args.no_cache)
+    except (OSError, ListingsParseError) as e:
+        print(f"Error reading {args.source}: {e}")
+        return 1
+    loaded = time.perf_counter()
+
+    if args.command == "count":
+        print(index.count(args.city, args.trade))
+    elif args.command == "coverage":
+        coverage = index.coverage()
+        trades = sorted({t for row in coverage.values() for t in row})
+        print(f"{'city':<18}" + "".join(f"{t[:12]:>13}" for t in trades) + f"{'total':>8}")
+        for city in sorted(coverage):
+            row = coverage[city]
+            print(f"{city:<18}" + "".join(f"{row.get(t, 0):>13}" for t in trades) + f"{sum(row.values()):>8}")
+        print(f"{len(coverage)} cities, {len(index)} listings")
+    elif args.command == "find":
+        records = index.find(args.city, args.trade, args.phone, args.name)
+        if not args.json:
+            print(f"{len(records)} matches")
+        print_records(records, args.json, args.limit)
+    elif args.command == "get":
+        record = index.get(args.id)
+        if record is None:
+            print(f"No listing with id {args.id}")
+            return 1
+        city, trade, business = record
+        print(json.dumps(dict(business, _city=city, _trade=trade), indent=2))
+    elif args.command == "duplicates":
+        dupes = index.duplicates(args.field)
+        print(f"{len(dupes)} {args.field} values shared by more than one listing")
+        for key, records in sorted(dupes.items(), key=lambda kv: -len(kv[1]))[:args.limit]:
+            print(f"{key} ({len(records)})")
+            print_records(records, False, 5)
+
+    print(f"\n(loaded in {(loaded - started) * 1000:.0f} ms, query {(time.perf_counter() - loaded) * 1000:.1f} ms)",
+          file=sys.stderr)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,139 @@
+import sys
+import json
+import gzip
+import argparse
+import datetime
+from pathlib import Path
+
+from backup_database import MANIFEST_NAME, Manifest
+
+# Rebuilds a point-in-time snapshot from a backup chain written by backup_database.py.
+#
+# Starting from the given backup directory, follows each manifest's "parent" back to
+# the full backup, then replays base + deltas in order:
+#   - a full table dump replaces whatever we had for that table
+#   - a delta upserts its changed rows by id, then drops ids missing from <table>.ids.gz
+#
+# The output directory is itself a full backup (same layout and manifest fields), so
+# it can be used as the parent of later --incremental runs to compact a long chain.
+#
+# Usage:
+#   python scripts/restore_backup.py <backup or delta dir> --to <snapshot dir>
+#   python scripts/restore_backup.py <delta dir> --to <snapshot dir> --tables businesses
+
+
+def resolve_chain(backup_dir):
+    """[base, delta1, delta2, ..., backup_dir] as (dir, Manifest) pairs."""
+    chain = []
+    current = Path(backup_dir).expanduser().resolve()
+    while True:
+        manifest = Manifest.load(current / MANIFEST_NAME)
+        chain.append((current, manifest))
+        parent = manifest.data.get("parent")
+        if not parent:
+            break
+        parent_dir = Path(parent)
+        if not (parent_dir / MANIFEST_NAME).exists():
+            # Backups that were moved together: look for the parent next to this one
+            parent_dir = current.parent / parent_dir.name
+        if not (parent_dir / MANIFEST_NAME).exists():
+            raise FileNotFoundError(f"parent backup {parent} of {current} not found")
+        current = parent_dir
+    chain.reverse()
+    return chain
+
+
+def read_lines(path):
+    with gzip.open(path, "rt", encoding="utf-8") as f:
+        for line in f:
+            line = line.rstrip("\n")
+            if line:
+                yield line
+
+
+def fold_table(chain, table):
+    """Returns ({id: raw json line}, last table entry) or (None, None) if never backed up."""
+    rows = None
+    last_entry = None
+    for backup_dir, manifest in chain:
+        entry = manifest.data["tables"].get(table)
+        if not entry or entry.get("status") != "done":
+            if entry:
+                print(f"  [{table}] {backup_dir.name}: status {entry.get('status')}, skipped")
+            continue
+
+        if entry.get("full", manifest.data.get("type") != "delta") or rows is None:
+            rows = {}
+        # Keep the raw line, only the id is needed to fold
+        for line in read_lines(backup_dir / entry["file"]):
+            rows[json.loads(line)["id"]] = line
+
+        ids = entry.get("ids") or {}
+        if ids.get("status") == "done":
+            alive = set(read_lines(backup_dir / ids["file"]))
+            rows = {k: v for k, v in rows.items() if str(k) in alive}
+        last_entry = entry
+    return rows, last_entry
+
+
+def write_snapshot(chain, out_dir, tables):
+    out_dir.mkdir(parents=True, exist_ok=True)
+    target_dir, target = chain[-1]
+    manifest = Manifest(out_dir / MANIFEST_NAME, {
+        "started_at": target.data.get("started_at"),
+        "type": "full",
+        "parent": None,
+        "compacted_from": [str(d) for d, _ in chain],
+        "restored_at": datetime.datetime.now().isoformat(),
+        "url": target.data.get("url"),
+        "keyset": ["id"],
+        "page_size": target.data.get("page_size"),
+        "tables": {},
+    })
+
+    for table in tables:
+        rows, entry = fold_table(chain, table)
+        if rows is None:
+            print(f"[{table}] not present in this chain")
+            continue
+
+        file_name = f"{table}.ndjson.gz"
+        with gzip.open(out_dir / file_name, "wt", encoding="utf-8", compresslevel=6) as f:
+            for line in rows.values():
+                f.write(line + "\n")
+
+        # Carry the high-water mark over so this snapshot can parent new deltas
+        manifest.update_table(table, status="done", file=file_name, rows=len(rows), full=True,
+                              hwm_column=entry.get("hwm_column"), watermark=entry.get("watermark"),
+                              started_at=entry.get("started_at"))
+        print(f"[{table}] {len(rows)} rows")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Restore a point-in-time snapshot from a backup chain")
+    parser.add_argument("backup", help="Backup directory to restore (full or delta)")
+    parser.add_argument("--to", required=True, help="Output directory for the snapshot")
+    parser.add_argument("--tables", help="Comma separated table list (default: every table in the chain)")
+    args = parser.parse_args()
+
+    try:
+        chain = resolve_chain(args.backup)
+    except FileNotFoundError as e:
+        print(f"Error: {e}")
+        sys.exit(1)
+
+    print("Replaying chain:")
+    for backup_dir, manifest in chain:
+        print(f"  {manifest.data.get('type', 'full'):5}  {backup_dir}")
+
+    if args.tables:
+        tables = args.tables.split(",")
+    else:
+        tables = list(dict.fromkeys(t for _, m in chain for t in m.data["tables"]))
+
+    write_snapshot(chain, Path(args.to).expanduser(), tables)
+    print("\nRestore complete!")
+
+
+if __name__ == "__main__":
+    main()
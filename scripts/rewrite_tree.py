@@ -0,0 +1,140 @@
+import os
+import sys
+import json
+import time
+import argparse
+from pathlib import Path
+from concurrent.futures import ProcessPoolExecutor
+
+from lib import ROOT
+from lib.aho import Automaton
+from lib.patch import FilePatch, PatchError, commit
+
+# Replaces many literals across the whole source tree, e.g. a brand or provider rename:
+#
+#   python scripts/rewrite_tree.py --map Revolut Stripe --map revolut stripe --dry-run
+#   python scripts/rewrite_tree.py --map '/et-logo.jpg"' '/et-logo-new.png"' --diff
+#   python scripts/rewrite_tree.py --from-file renames.json        ({"old": "new", ...})
+#
+# All literals go into one Aho-Corasick automaton (lib/aho.py), so each file is scanned
+# once however many literals there are, and files are scanned and rewritten in parallel.
+# Every file under the roots with a matching extension is covered, not a hand-picked
+# list. Changed files are written atomically (lib/patch.py): all of them or none, and
+# only if each still hashes to what its worker read.
+
+DEFAULT_ROOTS = ("src",)
+DEFAULT_EXTENSIONS = (".ts", ".tsx", ".js", ".jsx", ".mjs", ".cjs", ".css", ".html", ".json", ".md")
+SKIP_DIRS = {"node_modules", "dist", "build", ".git", ".cache"}
+
+_automaton = None
+_replacements = None
+
+
+def _init_worker(mapping):
+    global _automaton, _replacements
+    _automaton = Automaton(list(mapping))
+    _replacements = list(mapping.values())
+
+
+def rewrite_file(path):
+    """
+    Worker: (path, {literal: count}, FilePatch) for one file, the patch holding the
+    original text and its hash alongside the rewrite; only when something matched.
+    Counts are None if the file isn't UTF-8 text.
+    """
+    patch = FilePatch(Path(path))
+    try:
+        patch.load()
+    except (OSError, UnicodeDecodeError):
+        return path, None, None
+    patch.result, counts = _automaton.replace(patch.original, _replacements)
+    return path, counts, patch if counts else None
+
+
+def find_files(roots, extensions):
+    for root in roots:
+        for dirpath, dirnames, filenames in os.walk(ROOT / root):
+            dirnames[:] = [d for d in dirnames if d not in SKIP_DIRS]
+            for filename in filenames:
+                if filename.endswith(extensions):
+                    yield os.path.join(dirpath, filename)
+
+
+def parse_mapping(args):
+    mapping = {}
+    if args.from_file:
+        with open(args.from_file, "r", encoding="utf-8") as f:
+            mapping.update(json.load(f))
+    for old, new in args.map:
+        mapping[old] = new
+    if "" in mapping:
+        raise ValueError("empty search literal")
+    if not mapping:
+        raise ValueError("nothing to replace: give --map OLD NEW or --from-file")
+    return mapping
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Multi-literal rewrite across the source tree in one pass per file")
+    parser.add_argument("--map", action="append", nargs=2, default=[], metavar=("OLD", "NEW"),
+                        help="Literal replacement (repeatable)")
+    parser.add_argument("--from-file", help="JSON object of {old: new} literals")
+    parser.add_argument("--root", action="append", dest="roots", help="Directory under the repo (default: src)")
+    parser.add_argument("--ext", action="append", dest="extensions", help="File extension to include (repeatable)")
+    parser.add_argument("--workers", type=int, help="Processes (default: all cores)")
+    parser.add_argument("--dry-run", action="store_true", help="Summarise what would change without writing")
+    parser.add_argument("--diff", action="store_true", help="Print a unified diff of the changes")
+    args = parser.parse_args(argv)
+
+    try:
+        mapping = parse_mapping(args)
+    except (OSError, ValueError) as e:
+        print(f"Error: {e}")
+        return 1
+    extensions = tuple(args.extensions or DEFAULT_EXTENSIONS)
+    files = list(find_files(args.roots or DEFAULT_ROOTS, extensions))
+
+    started = time.perf_counter()
+    hits, patches, skipped = {}, [], 0
+    chunksize = max(1, len(files) // ((args.workers or os.cpu_count()) * 4))
+    with ProcessPoolExecutor(max_workers=args.workers, initializer=_init_worker, initargs=(mapping,)) as pool:
+        for path, counts, patch in pool.map(rewrite_file, files, chunksize=chunksize):
+            if counts is None:
+                skipped += 1
+            elif counts:
+                hits[path] = counts
+                patches.append(patch)
+    total_bytes = sum(os.path.getsize(f) for f in files)
+    print(f"Scanned {len(files)} files ({total_bytes / 1048576:.1f} MB) for {len(mapping)} literals "
+          f"in {time.perf_counter() - started:.2f}s" + (f", {skipped} not UTF-8" if skipped else ""))
+
+    totals = {}
+    for path in sorted(hits):
+        counts = hits[path]
+        print(f"  {os.path.relpath(path, ROOT)}: " + ", ".join(f"{old!r} x{n}" for old, n in counts.items()))
+        for old, n in counts.items():
+            totals[old] = totals.get(old, 0) + n
+    for old, new in mapping.items():
+        print(f"{totals.get(old, 0):>6}  {old!r} -> {new!r}")
+    if not hits:
+        print("Nothing to change.")
+        return 0
+
+    patches.sort(key=lambda patch: patch.path)
+    if args.diff:
+        for patch in patches:
+            print(patch.diff(ROOT))
+    if args.dry_run:
+        print(f"Dry run: {len(patches)} files would change.")
+        return 0
+    try:
+        commit(patches)
+    except (OSError, PatchError) as e:
+        print(f"Error, nothing written: {e}")
+        return 1
+    print(f"Rewrote {len(patches)} files.")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
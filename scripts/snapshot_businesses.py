@@ -0,0 +1,142 @@
+import sys
+import json
+import time
+import argparse
+import datetime
+from collections import Counter
+
+from lib import PROFILES, SupabaseClient, SupabaseError
+from lib.snapshot import load_snapshot, save_table, snapshot_path
+
+# Local columnar snapshot of businesses (and business_photos) for counts and filters
+# that don't need live data: "how many premium plumbers in Luton", "which businesses
+# have no logo", breakdowns by trade/city/tier.
+#
+#   pull    page both tables from a project into .cache/snapshots/<profile>/*.npz
+#           (businesses gets a photo_count column from business_photos)
+#   count   rows matching --where filters, optionally grouped with --by
+#   rows    matching rows, with --columns, --order and --limit
+#   info    snapshot age and columns
+#
+# Filters are PostgREST expressions, as in the API: trade=eq.plumber,
+# logo_url=not.is.null, city=in.(Luton,London), name=ilike.*plumb*
+#
+# Usage:
+#   python scripts/snapshot_businesses.py pull --profile prod
+#   python scripts/snapshot_businesses.py count --where is_premium=is.true --by trade
+#   python scripts/snapshot_businesses.py count --where tier=eq.paid --by city,trade
+#   python scripts/snapshot_businesses.py rows --where logo_url=not.is.null --columns id,name,logo_url --limit 20
+#   python scripts/snapshot_businesses.py rows --any is_premium=eq.true --any tier=eq.paid --order created_at.desc
+
+TABLES = ("businesses", "business_photos")
+
+
+def pull(args):
+    client = SupabaseClient.from_profile(args.profile)
+    print(f"--- Snapshot of {', '.join(TABLES)} from {client.url} ---")
+    started = time.perf_counter()
+    # Stamped before the first page: a row updated mid-pull may be stale here, and
+    # build_search_index.py re-fetches rows updated since pulled_at
+    pulled_at = datetime.datetime.now(datetime.timezone.utc).isoformat(timespec="seconds")
+    data = {}
+    try:
+        for table in TABLES:
+            data[table] = list(client.paginate(table, page_size=args.page_size))
+            print(f"  {table}: {len(data[table])} rows")
+    except SupabaseError as e:
+        print(f"Error: {e}")
+        return 1
+
+    photos = Counter(row.get("business_id") for row in data["business_photos"])
+    for row in data["businesses"]:
+        row["photo_count"] = photos.get(row.get("id"), 0)
+
+    meta = {"profile": args.profile, "url": client.url, "pulled_at": pulled_at}
+    for table, rows in data.items():
+        save_table(snapshot_path(args.profile, table), table, rows, meta)
+    print(f"Saved in {time.perf_counter() - started:.1f}s ({client.bytes_received / 1048576:.1f} MB downloaded)")
+    return 0
+
+
+def build_query(table, args):
+    query = table.query([w.split("=", 1) for w in args.where])
+    if args.any:
+        query = query.any_of(*(w.split("=", 1) for w in args.any))
+    return query
+
+
+def main(argv=None):
+    common = argparse.ArgumentParser(add_help=False)
+    common.add_argument("--profile", default="prod", choices=sorted(PROFILES))
+    filters = argparse.ArgumentParser(add_help=False)
+    filters.add_argument("--table", default="businesses", choices=TABLES)
+    filters.add_argument("--where", action="append", default=[], metavar="COL=EXPR",
+                         help="PostgREST filter, e.g. trade=eq.plumber (repeatable, all must match)")
+    filters.add_argument("--any", action="append", default=[], metavar="COL=EXPR",
+                         help="At least one --any filter must match (like or=(...))")
+    filters.add_argument("--json", action="store_true")
+
+    parser = argparse.ArgumentParser(description="Local columnar snapshot of businesses for ad-hoc queries")
+    sub = parser.add_subparsers(dest="command", required=True)
+    p = sub.add_parser("pull", parents=[common], help="Download a fresh snapshot")
+    p.add_argument("--page-size", type=int, default=1000)
+    p = sub.add_parser("count", parents=[common, filters], help="Count matching rows")
+    p.add_argument("--by", help="Comma separated columns to group by")
+    p = sub.add_parser("rows", parents=[common, filters], help="Show matching rows")
+    p.add_argument("--columns", help="Comma separated columns (default: all)")
+    p.add_argument("--order", help="column.asc or column.desc")
+    p.add_argument("--limit", type=int, default=20)
+    p = sub.add_parser("info", parents=[common], help="Snapshot age and columns")
+    p.add_argument("--table", default="businesses", choices=TABLES)
+    args = parser.parse_args(argv)
+
+    if args.command == "pull":
+        return pull(args)
+
+    try:
+        table = load_snapshot(args.profile, args.table)
+    except FileNotFoundError as e:
+        print(f"Error: {e}")
+        return 1
+
+    if args.command == "info":
+        print(f"{table.name}: {len(table)} rows from {table.meta['url']}, pulled {table.meta['pulled_at']}")
+        for name, kind in table.kinds.items():
+            print(f"  {name:<28} {kind}")
+        return 0
+
+    started = time.perf_counter()
+    try:
+        query = build_query(table, args)
+        if args.command == "count" and args.by:
+            result = query.group_by(*args.by.split(",")).count()
+        elif args.command == "count":
+            result = query.count()
+        else:
+            result = query.rows(args.columns.split(",") if args.columns else None, args.order, args.limit)
+    except (KeyError, ValueError) as e:
+        print(f"Error: {e.args[0]}")
+        return 1
+    elapsed = time.perf_counter() - started
+
+    if args.json:
+        if args.command == "count" and args.by:
+            result = [dict(zip(args.by.split(","), key), count=n) for key, n in result]
+        print(json.dumps(result, indent=2, default=str))
+        return 0
+    if args.command == "count" and args.by:
+        for key, n in result:
+            print(f"  {n:>7}  {' / '.join('(null)' if k is None else str(k) for k in key)}")
+        print(f"{sum(n for _, n in result)} rows in {len(result)} groups")
+    elif args.command == "count":
+        print(result)
+    else:
+        for row in result:
+            print("  " + "  ".join(f"{k}={v}" for k, v in row.items()))
+        print(f"{len(result)} rows shown ({query.count()} match)")
+    print(f"({elapsed * 1000:.1f} ms, snapshot pulled {table.meta['pulled_at']})", file=sys.stderr)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
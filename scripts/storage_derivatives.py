@@ -0,0 +1,233 @@
+import io
+import sys
+import json
+import time
+import hashlib
+import argparse
+import threading
+from urllib.parse import unquote
+from concurrent.futures import ThreadPoolExecutor, ProcessPoolExecutor, as_completed
+
+from PIL import ImageOps
+
+from lib import PROFILES, ROOT, SupabaseClient, SupabaseError
+from optimize_images import QUALITY, Image, normalize_mode
+
+# Generates resized WebP derivatives for the business images in the business-assets
+# storage bucket (migration 011) and records them on the businesses rows.
+#
+#   1. List the bucket and download originals on a thread pool.
+#   2. Identify each upload by SHA-256. Identical uploads (same logo on several
+#      businesses) get one set of derivatives, stored content-addressed under
+#      _derivatives/<sha[:2]>/<sha>/{thumb,card,hero}.webp.
+#   3. Render the sizes from one decode in a process pool and upload them.
+#   4. Write businesses.image_variants (migration 024) in batched RPC calls:
+#      {"<original url>": {"thumb": url, "card": url, "hero": url}}
+#
+# .cache/storage_derivatives.json remembers each object's eTag/size -> SHA-256, so
+# later runs only download new or replaced uploads.
+#
+# Usage:
+#   python scripts/storage_derivatives.py --profile prod --dry-run
+#   python scripts/storage_derivatives.py --profile prod
+
+BUCKET = "business-assets"
+DERIVATIVE_PREFIX = "_derivatives"
+CACHE_PATH = ROOT / ".cache" / "storage_derivatives.json"
+IMAGE_COLUMNS = ("logo_url", "header_image_url", "vehicle_image_url")
+
+# name -> (width, height); a height means crop to exactly that box
+SIZES = {
+    "thumb": (160, 160),
+    "card": (640, None),
+    "hero": (1600, None),
+}
+
+
+def derivative_path(sha, size):
+    return f"{DERIVATIVE_PREFIX}/{sha[:2]}/{sha}/{size}.webp"
+
+
+def render_derivatives(data):
+    """Worker: decode once, return {size name: webp bytes}. Never upscales."""
+    out = {}
+    with Image.open(io.BytesIO(data)) as img:
+        img = normalize_mode(ImageOps.exif_transpose(img))
+        for name, (width, height) in SIZES.items():
+            if height:
+                variant = ImageOps.fit(img, (width, height), Image.Resampling.LANCZOS)
+            elif img.width > width:
+                variant = img.resize((width, round(img.height * width / img.width)), Image.Resampling.LANCZOS)
+            else:
+                variant = img
+            buf = io.BytesIO()
+            variant.save(buf, "WEBP", quality=QUALITY)
+            out[name] = buf.getvalue()
+    return out
+
+
+def load_cache(project_url):
+    if CACHE_PATH.exists():
+        with open(CACHE_PATH, "r", encoding="utf-8") as f:
+            return json.load(f).get(project_url, {})
+    return {}
+
+
+def save_cache(project_url, objects):
+    data = {}
+    if CACHE_PATH.exists():
+        with open(CACHE_PATH, "r", encoding="utf-8") as f:
+            data = json.load(f)
+    data[project_url] = objects
+    CACHE_PATH.parent.mkdir(parents=True, exist_ok=True)
+    tmp = CACHE_PATH.with_suffix(".tmp")
+    with open(tmp, "w", encoding="utf-8") as f:
+        json.dump(data, f, indent=1, sort_keys=True)
+    tmp.replace(CACHE_PATH)
+
+
+def existing_derivatives(client):
+    """SHA-256s that already have every size in the bucket."""
+    found = {}
+    for obj in client.storage_list(BUCKET, DERIVATIVE_PREFIX):
+        parts = obj["name"].split("/")
+        if len(parts) == 4:
+            found.setdefault(parts[2], set()).add(parts[3].rsplit(".", 1)[0])
+    return {sha for sha, sizes in found.items() if sizes >= set(SIZES)}
+
+
+class Generator:
+    def __init__(self, client, cache, done_shas, render_pool, dry_run=False):
+        self.client = client
+        self.cache = cache
+        self.done = done_shas
+        self.render_pool = render_pool
+        self.dry_run = dry_run
+        self.claimed = set()
+        self.lock = threading.Lock()
+        self.stats = {"downloaded": 0, "bytes_in": 0, "generated": 0, "bytes_out": 0}
+
+    def process(self, obj):
+        """Returns (path, sha). Only one thread renders each distinct sha; the rest reuse it."""
+        path = obj["name"]
+        meta = obj.get("metadata") or {}
+        cached = self.cache.get(path)
+        fingerprint = {"etag": meta.get("eTag"), "size": meta.get("size")}
+
+        data = None
+        if cached and {"etag": cached.get("etag"), "size": cached.get("size")} == fingerprint:
+            sha = cached["sha256"]
+        else:
+            data = self.client.storage_download(BUCKET, path)
+            sha = hashlib.sha256(data).hexdigest()
+            with self.lock:
+                self.stats["downloaded"] += 1
+                self.stats["bytes_in"] += len(data)
+                self.cache[path] = dict(fingerprint, sha256=sha)
+
+        with self.lock:
+            if sha in self.done or sha in self.claimed:
+                return path, sha
+            self.claimed.add(sha)
+
+        if self.dry_run:
+            return path, None
+        if data is None:
+            data = self.client.storage_download(BUCKET, path)
+        rendered = self.render_pool.submit(render_derivatives, data).result()
+        for size, blob in rendered.items():
+            self.client.storage_upload(BUCKET, derivative_path(sha, size), blob, "image/webp")
+        with self.lock:
+            self.done.add(sha)
+            self.stats["generated"] += 1
+            self.stats["bytes_out"] += sum(len(blob) for blob in rendered.values())
+        return path, sha
+
+
+def bucket_path(url):
+    """Object path inside BUCKET for a public URL, or None for anything else."""
+    marker = f"/storage/v1/object/public/{BUCKET}/"
+    if not url or marker not in url:
+        return None
+    return unquote(url.split(marker, 1)[1].split("?", 1)[0])
+
+
+def business_variants(client, row, path_to_sha, ready):
+    variants = {}
+    urls = [row.get(c) for c in IMAGE_COLUMNS] + list(row.get("photos") or [])
+    for url in urls:
+        sha = path_to_sha.get(bucket_path(url))
+        if sha and sha in ready:
+            variants[url] = {size: client.public_url(BUCKET, derivative_path(sha, size)) for size in SIZES}
+    return variants
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Generate WebP derivatives for business-assets uploads")
+    parser.add_argument("--profile", default="dev", choices=sorted(PROFILES))
+    parser.add_argument("--workers", type=int, default=8, help="Concurrent downloads/uploads")
+    parser.add_argument("--chunk-size", type=int, default=500, help="Businesses per write-back call")
+    parser.add_argument("--dry-run", action="store_true", help="Report what would be generated and written")
+    args = parser.parse_args()
+
+    client = SupabaseClient.from_profile(args.profile, pool_size=args.workers)
+    started = time.perf_counter()
+    print(f"--- Image derivatives for {BUCKET} on {client.url} ---")
+
+    try:
+        objects = [o for o in client.storage_list(BUCKET)
+                   if not o["name"].startswith(DERIVATIVE_PREFIX + "/")
+                   and str((o.get("metadata") or {}).get("mimetype", "image/")).startswith("image/")]
+        done = existing_derivatives(client)
+    except SupabaseError as e:
+        print(f"Error listing bucket: {e}")
+        return 1
+    print(f"{len(objects)} uploads, {len(done)} contents already have derivatives")
+
+    cache = load_cache(client.url)
+    path_to_sha = {}
+    failed = 0
+    with ProcessPoolExecutor() as render_pool, ThreadPoolExecutor(max_workers=args.workers) as io_pool:
+        generator = Generator(client, cache, done, render_pool, args.dry_run)
+        futures = {io_pool.submit(generator.process, obj): obj["name"] for obj in objects}
+        for future in as_completed(futures):
+            try:
+                path, sha = future.result()
+                path_to_sha[path] = sha or generator.cache[path]["sha256"]
+            except Exception as e:
+                print(f"Error processing {futures[future]}: {e}")
+                failed += 1
+    save_cache(client.url, cache)
+
+    stats = generator.stats
+    unique = len(set(path_to_sha.values()))
+    print(f"Downloaded {stats['downloaded']} originals ({stats['bytes_in'] / 1048576:.1f} MB), "
+          f"{len(path_to_sha) - unique} duplicate uploads, {unique} unique images")
+    if args.dry_run:
+        print(f"Would generate derivatives for {len(generator.claimed)} images.")
+    else:
+        print(f"Generated derivatives for {stats['generated']} images "
+              f"({stats['bytes_out'] / 1048576:.1f} MB uploaded)")
+
+    # Write-back: only rows whose variants actually change
+    updates = []
+    for row in client.paginate("businesses", select="id,photos,image_variants," + ",".join(IMAGE_COLUMNS)):
+        variants = business_variants(client, row, path_to_sha, done)
+        if variants != (row.get("image_variants") or {}):
+            updates.append({"id": row["id"], "image_variants": variants})
+
+    if args.dry_run:
+        print(f"Would update image_variants on {len(updates)} businesses.")
+        return 0
+
+    written = 0
+    for start in range(0, len(updates), args.chunk_size):
+        written += client.rpc("apply_image_variants", {"updates": updates[start:start + args.chunk_size]}) or 0
+    print(f"Updated image_variants on {written} businesses in "
+          f"{(len(updates) + args.chunk_size - 1) // args.chunk_size} calls")
+    print(f"Done in {time.perf_counter() - started:.1f}s ({failed} failed)")
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
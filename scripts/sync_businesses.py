@@ -0,0 +1,170 @@
+import sys
+import time
+import uuid
+import asyncio
+import argparse
+
+from lib import PROFILES, row_hash
+from lib.async_client import AsyncSupabaseClient, AsyncSupabaseError
+
+# Reconciles the businesses table between two projects (default dev -> prod).
+#
+#   1. Pull both tables concurrently (asyncio + httpx, keyset pagination).
+#   2. Hash the synced columns of every row and index both sides by the match key
+#      (slug by default: ids were re-minted when businesses were copied to prod).
+#   3. Rows missing on the target are inserted as batched upserts; rows whose hash
+#      differs get their synced columns PATCHed by the target row's id, one request
+#      per group of rows getting the same values. A few requests run at a time.
+#
+# Target-only rows are reported, never deleted. With --fields only rows that already
+# exist on the target are updated; missing ones are listed, not inserted.
+#
+# Usage:
+#   python scripts/sync_businesses.py --dry-run
+#   python scripts/sync_businesses.py --fields logo_url,header_image_url,vehicle_image_url,photos
+#   python scripts/sync_businesses.py --where "name=eq.nick nack plum"
+#   python scripts/sync_businesses.py --from prod --to dev
+
+TABLE = "businesses"
+
+# Never copied across projects: timestamps are maintained by triggers, and
+# owner_user_id points at auth.users, whose ids differ per project.
+EXCLUDED_COLUMNS = {"created_at", "updated_at", "owner_user_id"}
+
+
+def sync_columns(source_rows, target_rows, match, fields=None):
+    """Columns to compare and copy: the requested fields, or every column both sides have."""
+    if fields:
+        columns = [c for c in fields if c not in EXCLUDED_COLUMNS]
+    else:
+        source_cols = set(source_rows[0]) if source_rows else set()
+        target_cols = set(target_rows[0]) if target_rows else source_cols
+        missing = sorted(source_cols - target_cols)
+        if missing:
+            print(f"Columns only on the source (not synced): {', '.join(missing)}")
+        columns = sorted((source_cols & target_cols) - EXCLUDED_COLUMNS)
+    # The id is written explicitly below; hashing it would flag every re-minted row
+    return [c for c in columns if c not in ("id", match)]
+
+
+def index_rows(rows, match, columns):
+    index = {}
+    for row in rows:
+        key = row.get(match)
+        if key is None:
+            continue
+        index[key] = (row_hash(row, columns), row)
+    return index
+
+
+def plan(source_index, target_index, columns, match):
+    """
+    O(n) diff on hashes. Returns (inserts, updates, target_only): inserts are full
+    rows for an upsert, updates maps each changed key to its synced columns plus
+    the target row's id.
+    """
+    target_ids = {row["id"] for _, row in target_index.values()}
+    inserts, updates = [], {}
+    for key, (digest, row) in source_index.items():
+        payload = {c: row.get(c) for c in columns}
+        existing = target_index.get(key)
+        if existing is None:
+            payload[match] = key
+            # Keep the source id unless the target already uses it for another row
+            payload["id"] = row["id"] if row["id"] not in target_ids else str(uuid.uuid4())
+            inserts.append(payload)
+        elif existing[0] != digest:
+            # Patched onto the target's row by id, so the match column needn't be unique
+            payload["id"] = existing[1]["id"]
+            updates[key] = payload
+    target_only = [key for key in target_index if key not in source_index]
+    return inserts, updates, target_only
+
+
+def describe(source_row, target_row, columns):
+    return {c: source_row.get(c) for c in columns if source_row.get(c) != target_row.get(c)}
+
+
+async def sync(args):
+    fields = args.fields.split(",") if args.fields else None
+    filters = [tuple(w.split("=", 1)) for w in args.where]
+    select = "*" if not fields else ",".join(dict.fromkeys(["id", args.match] + fields))
+
+    async with AsyncSupabaseClient.from_profile(args.source, concurrency=args.concurrency) as source, \
+            AsyncSupabaseClient.from_profile(args.target, concurrency=args.concurrency) as target:
+        print(f"--- Syncing {TABLE}: {args.source} ({source.url}) -> {args.target} ({target.url}) ---")
+
+        started = time.perf_counter()
+        source_rows, target_rows = await asyncio.gather(
+            source.fetch_all(TABLE, select, filters),
+            target.fetch_all(TABLE, select, filters),
+        )
+        fetched = time.perf_counter()
+        print(f"Fetched {len(source_rows)} source / {len(target_rows)} target rows in {fetched - started:.1f}s")
+
+        columns = sync_columns(source_rows, target_rows, args.match, fields)
+        source_index = index_rows(source_rows, args.match, columns)
+        target_index = index_rows(target_rows, args.match, columns)
+        inserts, updates, target_only = plan(source_index, target_index, columns, args.match)
+
+        if fields and inserts:
+            # A new row needs name, trade, city etc., which a --fields sync never reads
+            print(f"{len(inserts)} businesses not found on {args.target}, skipped "
+                  f"(--fields only updates existing rows; sync without --fields to create them):")
+            for payload in inserts[:args.show]:
+                print(f"  ! {payload[args.match]}")
+            inserts = []
+
+        print(f"Compared {len(columns)} columns: {len(inserts)} to insert, {len(updates)} to update, "
+              f"{len(target_only)} only on {args.target}")
+        for key in list(updates)[:args.show]:
+            diff = describe(source_index[key][1], target_index[key][1], columns)
+            print(f"  ~ {key}: {', '.join(diff)}")
+        for payload in inserts[:args.show]:
+            print(f"  + {payload[args.match]}")
+
+        if args.dry_run or not (inserts or updates):
+            print("Dry run, nothing written." if args.dry_run else "Already in sync.")
+            return 0
+
+        # Inserts are whole rows (same keys in every payload, so one bulk upsert per
+        # chunk); updates only carry the synced columns, so they are PATCHed by the
+        # target id instead: an upsert would insert-check them against NOT NULL columns
+        # they don't include. Rows getting identical values share a request.
+        inserted, updated = await asyncio.gather(
+            target.upsert(TABLE, inserts, chunk_size=args.chunk_size) if inserts else asyncio.sleep(0, 0),
+            target.update_many(TABLE, list(updates.values())) if updates else asyncio.sleep(0, 0),
+        )
+        print(f"Inserted {inserted} and updated {updated} rows in {time.perf_counter() - fetched:.1f}s")
+    return 0
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Bulk reconcile businesses between Supabase projects")
+    parser.add_argument("--from", dest="source", default="dev", choices=sorted(PROFILES))
+    parser.add_argument("--to", dest="target", default="prod", choices=sorted(PROFILES))
+    parser.add_argument("--fields", help="Comma separated columns to sync (default: every shared column)")
+    parser.add_argument("--where", action="append", default=[],
+                        help="PostgREST filter applied to both sides, e.g. trade=eq.plumber (repeatable)")
+    parser.add_argument("--match", default="slug", help="Column that identifies the same business on both sides")
+    parser.add_argument("--chunk-size", type=int, default=500)
+    parser.add_argument("--concurrency", type=int, default=8, help="In-flight requests per project")
+    parser.add_argument("--show", type=int, default=20, help="Changes to list before writing")
+    parser.add_argument("--dry-run", action="store_true")
+    args = parser.parse_args(argv)
+    if args.source == args.target:
+        parser.error("--from and --to must be different projects")
+    return args
+
+
+def main(argv=None):
+    args = parse_args(argv)
+    try:
+        return asyncio.run(sync(args))
+    except AsyncSupabaseError as e:
+        print(f"Error: {e}")
+        return 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,35 @@
+import sys
+from pathlib import Path
+
+import pytest
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from lib.knowledge import KnowledgeIndex, build_index  # noqa: E402
+from lib.qacorpus import load_corpus  # noqa: E402
+
+# Run with: python -m pytest scripts/tests
+
+
+@pytest.fixture(scope="module")
+def index():
+    return KnowledgeIndex(build_index(load_corpus()))
+
+
+@pytest.mark.parametrize("query", ["emergency", "help", "safety", "999", "Help, is this an emergency?"])
+def test_safety_protocol_queries_get_its_tips(index, query):
+    category, hits = index.answer(query)
+    assert category == "CORE_PROTOCOL"
+    assert hits == []
+
+
+@pytest.mark.parametrize("query, expected", [
+    ("I smell gas", "PLUMBING"),
+    ("blocked drain", "DRAINAGE"),
+    ("my fuse box is buzzing", "ELECTRICAL"),
+    ("car battery flat", "VEHICLE"),
+])
+def test_category(index, query, expected):
+    category, hits = index.answer(query)
+    assert category == expected
+    assert hits and all(doc["category"] == expected for _, doc in hits)
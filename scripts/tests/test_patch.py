@@ -0,0 +1,29 @@
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from lib.patch import PatchSet  # noqa: E402
+
+# Run with: python -m pytest scripts/tests
+
+
+def test_backreference_in_pattern_next_to_literal_rule(tmp_path):
+    path = tmp_path / "a.tsx"
+    path.write_text('foo "x" \'x\' "x\'\n', encoding="utf-8")
+    patches = PatchSet(tmp_path)
+    patches.replace(path, "foo", "FOO")
+    patches.sub(path, r'(["\'])x\1', r"\1y\1")
+    report = patches.apply(quiet=True)
+    assert path.read_text(encoding="utf-8") == 'FOO "y" \'y\' "x\'\n'
+    assert [entry["hits"] for entry in report] == [1, 2]
+
+
+def test_rules_see_the_original_text(tmp_path):
+    path = tmp_path / "b.tsx"
+    path.write_text("mb-6 mt-2 mb-6\n", encoding="utf-8")
+    patches = PatchSet(tmp_path)
+    patches.replace(path, "mb-6", "mt-2")
+    patches.sub(path, r"mt-\d", "mt-4")
+    patches.apply(quiet=True)
+    assert path.read_text(encoding="utf-8") == "mt-2 mt-4 mt-2\n"
@@ -0,0 +1,73 @@
+import sys
+import time
+import argparse
+import subprocess
+from pathlib import Path
+
+from lib import ROOT
+from lib.tsx import EXTENSIONS, find_sources, validate_paths
+
+# Checks that every bracket, template string and JSX tag in the front-end sources is
+# closed, and reports the line of the first one that isn't. Replaces counting "{" and
+# "}" per file (verify_changes.py used to), which miscounts braces inside strings, JSX
+# text and comments.
+#
+# Verdicts are cached in .cache/tsx_check.json by content hash; only new or edited
+# files are lexed, in a process pool.
+#
+# Usage:
+#   python scripts/validate_tsx.py                      all of src/
+#   python scripts/validate_tsx.py --changed            files changed since the last commit
+#   python scripts/validate_tsx.py src/pages/Index.tsx src/components
+
+
+def changed_files():
+    out = subprocess.run(["git", "status", "--porcelain", "-z", "--untracked-files=all"],
+                         cwd=ROOT, capture_output=True, check=True).stdout
+    names = []
+    for entry in out.decode("utf-8").split("\0"):
+        # "XY path"; renames are followed by the old path as its own entry, which won't exist
+        if len(entry) > 3 and entry[0] != "D" and entry[1] != "D":
+            names.append(entry[3:])
+    return [str(ROOT / n) for n in names
+            if n.endswith(EXTENSIONS) and (ROOT / n).is_file()]
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Check bracket / JSX tag balance in .ts/.tsx files")
+    parser.add_argument("paths", nargs="*", help="Files or directories (default: src/)")
+    parser.add_argument("--changed", action="store_true", help="Only files changed in the working tree")
+    parser.add_argument("--workers", type=int, default=None, help="Lexer processes (default: one per CPU)")
+    parser.add_argument("--no-cache", action="store_true", help="Re-check everything, don't write the cache")
+    args = parser.parse_args(argv)
+
+    if args.changed:
+        files = changed_files()
+    else:
+        files = list(find_sources(args.paths or [ROOT / "src"]))
+
+    started = time.perf_counter()
+    results, checked = validate_paths(files, args.workers, use_cache=not args.no_cache)
+    elapsed = time.perf_counter() - started
+
+    failed = 0
+    for path in files:
+        problem = results[path]
+        if problem:
+            failed += 1
+            where = f":{problem['line']}:{problem['column']}" if problem["line"] else ""
+            print(f"  {_relative(path)}{where}: {problem['message']}")
+    print(f"{len(files)} files ({checked} lexed, {len(files) - checked} cached) in {elapsed * 1000:.0f} ms: "
+          f"{failed} unbalanced")
+    return 1 if failed else 0
+
+
+def _relative(path):
+    try:
+        return Path(path).resolve().relative_to(ROOT).as_posix()
+    except ValueError:
+        return path
+
+
+if __name__ == "__main__":
+    sys.exit(main())
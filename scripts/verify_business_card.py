@@ -1,5 +1,7 @@
 import os
 
+from lib.tsx import check_file
+
 file_path = os.path.join('..', 'src', 'components', 'BusinessCard.tsx')
 
 if not os.path.exists(file_path):
@@ -9,19 +11,14 @@ if not os.path.exists(file_path):
 with open(file_path, 'r', encoding='utf-8') as f:
     content = f.read()
 
-# Basic brace balance check
-open_braces = content.count('{')
-close_braces = content.count('}')
-open_parens = content.count('(')
-close_parens = content.count(')')
-
 print(f"--- BusinessCard.tsx Verification ---")
-print(f"Braces: {open_braces}/{close_braces}, Parens: {open_parens}/{close_parens}")
 
-if open_braces != close_braces:
-    print("WARNING: Unbalanced braces!")
-if open_parens != close_parens:
-    print("WARNING: Unbalanced parens!")
+# Bracket, template and JSX tag balance (see validate_tsx.py)
+problem = check_file(file_path)
+if problem:
+    print(f"WARNING: line {problem['line']}:{problem['column']}: {problem['message']}")
+else:
+    print("Balanced")
 
 # Check for specific strings added
 if 'isPremium' in content:
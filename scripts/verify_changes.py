@@ -1,4 +1,7 @@
 import os
+import sys
+
+from lib.tsx import validate_paths
 
 files = [
     os.path.join('..', 'src', 'components', 'admin', 'AdminLayout.tsx'),
@@ -8,26 +11,20 @@ files = [
     os.path.join('..', 'src', 'lib', 'subscriptionService.ts')
 ]
 
-for f_path in files:
-    if not os.path.exists(f_path):
-        print(f"MISSING: {f_path}")
-        continue
-    
-    with open(f_path, 'r', encoding='utf-8') as f:
-        content = f.read()
-        
-    # Basic brace balance check
-    open_braces = content.count('{')
-    close_braces = content.count('}')
-    open_parens = content.count('(')
-    close_parens = content.count(')')
-    
+missing = [f for f in files if not os.path.exists(f)]
+for f_path in missing:
+    print(f"MISSING: {f_path}")
+
+# Bracket, template and JSX tag balance (see validate_tsx.py)
+results, _ = validate_paths([f for f in files if f not in missing])
+failed = 0
+for f_path, problem in results.items():
     print(f"--- {os.path.basename(f_path)} ---")
-    print(f"Braces: {open_braces}/{close_braces}, Parens: {open_parens}/{close_parens}")
-    
-    if open_braces != close_braces:
-        print("WARNING: Unbalanced braces!")
-    if open_parens != close_parens:
-        print("WARNING: Unbalanced parens!")
+    if problem:
+        failed += 1
+        print(f"WARNING: line {problem['line']}:{problem['column']}: {problem['message']}")
+    else:
+        print("Balanced")
 
 print("Verification complete.")
+sys.exit(1 if failed or missing else 0)
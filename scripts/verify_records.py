@@ -0,0 +1,186 @@
+import csv
+import sys
+import json
+import time
+import argparse
+from pathlib import Path
+from concurrent.futures import ThreadPoolExecutor
+
+from lib import PROFILES, SupabaseClient, SupabaseError, in_filter
+
+# Checks thousands of records against expected column values in a few requests,
+# e.g. after a migration or a sync. Replaces the one-id-per-script verify_record_*.py
+# and verify_*_column.py checks.
+#
+# The expectations file has the key column plus the columns to check:
+#   .csv    header row, e.g.  id,header_image_url,city
+#   .json   a list of objects, or {"<id>": {"column": value, ...}}
+#   .jsonl  one object per line
+#   .txt    ids only, one per line: only checks that the records exist
+#
+# Records are fetched with key=in.(...) in chunks over one pooled session, a few
+# chunks in flight at a time. CSV values are text, so they are compared to the
+# text form of the stored value ("" matches null, JSON for arrays and objects).
+# A column that doesn't exist fails the first request with PostgREST's error.
+#
+# Usage:
+#   python scripts/verify_records.py expected.csv --profile prod
+#   python scripts/verify_records.py ids.txt --profile prod --anon --columns name,header_image_url
+#   python scripts/verify_records.py luton.json --key slug --out mismatches.csv
+
+TABLE = "businesses"
+
+
+def load_expectations(path, key):
+    """{key value: {column: expected}} from a .csv/.json/.jsonl/.txt file."""
+    path = Path(path)
+    suffix = path.suffix.lower()
+    with open(path, "r", encoding="utf-8-sig", newline="") as f:
+        if suffix == ".csv":
+            rows = list(csv.DictReader(f))
+        elif suffix == ".jsonl":
+            rows = [json.loads(line) for line in f if line.strip()]
+        elif suffix == ".json":
+            data = json.load(f)
+            rows = [dict(v, **{key: k}) for k, v in data.items()] if isinstance(data, dict) else data
+        else:
+            rows = [{key: line.strip()} for line in f if line.strip() and not line.startswith("#")]
+
+    expected = {}
+    for number, row in enumerate(rows, 1):
+        value = row.get(key)
+        if value in (None, ""):
+            raise ValueError(f"{path.name}: record {number} has no {key!r}")
+        expected[str(value)] = {c: v for c, v in row.items() if c != key}
+    return expected
+
+
+def as_text(value):
+    if value is None:
+        return ""
+    if isinstance(value, bool):
+        return "true" if value else "false"
+    if isinstance(value, (list, dict)):
+        return json.dumps(value, separators=(",", ":"), ensure_ascii=False)
+    return str(value)
+
+
+def matches(expected, actual):
+    if isinstance(expected, str) and not isinstance(actual, str):
+        if isinstance(actual, (list, dict)) and expected.strip()[:1] in ("[", "{"):
+            try:
+                return json.loads(expected) == actual
+            except ValueError:
+                return False
+        if isinstance(actual, (int, float)) and not isinstance(actual, bool):
+            try:
+                return float(expected) == float(actual)
+            except ValueError:
+                return False
+        return expected.strip().lower() == as_text(actual).lower()
+    if isinstance(expected, (int, float)) and isinstance(actual, (int, float)):
+        return float(expected) == float(actual)
+    return expected == actual
+
+
+def fetch_chunk(client, table, key, select, chunk):
+    return client.select(table, select=select, filters={key: in_filter(chunk)})
+
+
+def shorten(value, width):
+    text = as_text(value).replace("\n", " ")
+    return text if len(text) <= width else text[:width - 3] + "..."
+
+
+def print_table(rows, headers, width=48):
+    cells = [[shorten(v, width) for v in row] for row in rows]
+    widths = [max([len(h)] + [len(r[i]) for r in cells]) for i, h in enumerate(headers)]
+    print("  " + "  ".join(h.ljust(w) for h, w in zip(headers, widths)))
+    print("  " + "  ".join("-" * w for w in widths))
+    for row in cells:
+        print("  " + "  ".join(v.ljust(w) for v, w in zip(row, widths)))
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Verify many records against expected column values")
+    parser.add_argument("expectations", help=".csv, .json, .jsonl or .txt (ids only)")
+    parser.add_argument("--profile", default="dev", choices=sorted(PROFILES))
+    parser.add_argument("--anon", action="store_true", help="Read with the anon key (checks RLS visibility)")
+    parser.add_argument("--table", default=TABLE)
+    parser.add_argument("--key", default="id", help="Column the expectations are keyed by")
+    parser.add_argument("--columns", help="Extra comma separated columns to fetch, e.g. to prove they exist")
+    parser.add_argument("--chunk-size", type=int, default=200, help="Keys per in.(...) request (max 1000)")
+    parser.add_argument("--workers", type=int, default=4, help="Requests in flight")
+    parser.add_argument("--show", type=int, default=50, help="Mismatches to print")
+    parser.add_argument("--out", help="Write every mismatch to this CSV")
+    args = parser.parse_args(argv)
+    if not 1 <= args.chunk_size <= 1000:
+        parser.error("--chunk-size must be between 1 and 1000 (PostgREST's row cap)")
+
+    try:
+        expected = load_expectations(args.expectations, args.key)
+    except (OSError, ValueError) as e:
+        print(f"Error reading {args.expectations}: {e}")
+        return 1
+    columns = list(dict.fromkeys(c for values in expected.values() for c in values))
+    extra = [c.strip() for c in (args.columns or "").split(",") if c.strip()]
+    select = ",".join(dict.fromkeys([args.key] + columns + extra))
+
+    keys = list(expected)
+    chunks = [keys[i:i + args.chunk_size] for i in range(0, len(keys), args.chunk_size)]
+    client = SupabaseClient.from_profile(args.profile, service_role=not args.anon, pool_size=args.workers)
+    role = "anon" if args.anon else "service role"
+    print(f"--- Verifying {len(keys)} {args.table} records on {client.url} ({role}) ---")
+    print(f"Checking {', '.join(columns) or 'existence only'} in {len(chunks)} requests")
+
+    started = time.perf_counter()
+    found = {}
+    try:
+        with ThreadPoolExecutor(max_workers=args.workers) as pool:
+            for rows in pool.map(lambda chunk: fetch_chunk(client, args.table, args.key, select, chunk), chunks):
+                for row in rows:
+                    found[as_text(row.get(args.key))] = row
+    except SupabaseError as e:
+        print(f"API Error: {e.status_code}")
+        print(e.text)
+        return 1
+    elapsed = time.perf_counter() - started
+
+    missing = [k for k in keys if k not in found]
+    mismatches = []
+    for key in keys:
+        row = found.get(key)
+        if row is None:
+            continue
+        for column, value in expected[key].items():
+            if not matches(value, row.get(column)):
+                mismatches.append((key, column, value, row.get(column)))
+
+    print(f"Fetched {len(found)} records in {elapsed:.2f}s ({client.bytes_received / 1024:.0f} KB)")
+    if mismatches:
+        print(f"\n{len(mismatches)} mismatched values in {len({m[0] for m in mismatches})} records:")
+        print_table(mismatches[:args.show], [args.key, "column", "expected", "actual"])
+        if len(mismatches) > args.show:
+            print(f"  ... {len(mismatches) - args.show} more")
+    if missing:
+        print(f"\n{len(missing)} records not found:")
+        for key in missing[:args.show]:
+            print(f"  {key}")
+        if len(missing) > args.show:
+            print(f"  ... {len(missing) - args.show} more")
+
+    if args.out:
+        with open(args.out, "w", encoding="utf-8", newline="") as f:
+            writer = csv.writer(f)
+            writer.writerow([args.key, "column", "expected", "actual"])
+            writer.writerows((k, c, as_text(e), as_text(a)) for k, c, e, a in mismatches)
+            writer.writerows((k, "(record)", "present", "missing") for k in missing)
+        print(f"Wrote {len(mismatches) + len(missing)} rows to {args.out}")
+
+    ok = len(keys) - len(missing) - len({m[0] for m in mismatches})
+    print(f"\n{ok} of {len(keys)} records match")
+    return 1 if missing or mismatches else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
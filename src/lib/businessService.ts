@@ -1,6 +1,7 @@
 import { supabase } from './supabase';
 import type { Business } from './businesses';
 import { businessListings, getBusinessById } from './businesses';
+import { loadSearchIndex, searchIndex } from './searchIndex';
 
 /**
  * Helper to map Supabase business data to the Business interface
@@ -123,14 +124,75 @@ export async function fetchAllBusinesses(limit = 100): Promise<Business[]> {
     return (data || []).map(biz => mapBusinessData(biz));
 }
 
+const SEARCH_LIMIT = 20;
+
 export async function searchBusinesses(query: string): Promise<Business[]> {
+    const index = await loadSearchIndex();
+    if (index) {
+        // The index is a build-time snapshot: Supabase rows changed since index.built_at
+        // (newly verified, renamed, re-rated) come from a live query instead, which
+        // only touches the few rows updated since the build (migration 026).
+        const hits = searchIndex(index, query, SEARCH_LIMIT * 2);
+        const supabaseIds = hits.filter(hit => hit.fromSupabase).map(hit => hit.id);
+        const [indexed, recent] = await Promise.all([
+            supabaseIds.length > 0
+                ? supabase
+                    .from('businesses')
+                    .select('*, business_photos(*)')
+                    .eq('verified', true)
+                    .in('id', supabaseIds)
+                : Promise.resolve({ data: [], error: null }),
+            supabase
+                .from('businesses')
+                .select('*, business_photos(*)')
+                .eq('verified', true)
+                .gt('updated_at', index.built_at)
+                .or(`name.ilike.%${query}%,trade.ilike.%${query}%`)
+                .order('rating', { ascending: false })
+                .limit(SEARCH_LIMIT)
+        ]);
+
+        if (indexed.error) {
+            console.error('Error fetching search results:', indexed.error);
+        }
+        if (recent.error) {
+            console.error('Error searching recently updated businesses:', recent.error);
+        }
+
+        // Indexed rows updated since the build are only trusted from the live query
+        const builtAt = Date.parse(index.built_at);
+        const fetched = new Map<string, any>();
+        (indexed.data || [])
+            .filter((biz: any) => !(Date.parse(biz.updated_at) > builtAt))
+            .forEach((biz: any) => fetched.set(biz.id, biz));
+
+        const results: { business: Business; rating: number }[] = [];
+        for (const hit of hits) {
+            if (hit.fromSupabase) {
+                const biz = fetched.get(hit.id);
+                if (biz) results.push({ business: mapBusinessData(biz), rating: hit.rating });
+            } else {
+                const business = getBusinessById(hit.id)?.business;
+                if (business) results.push({ business, rating: hit.rating });
+            }
+        }
+        (recent.data || []).forEach((biz: any) => results.push({ business: mapBusinessData(biz), rating: Number(biz.rating) || 0 }));
+
+        // Stable, so equal ratings keep the index's order
+        return results
+            .sort((a, b) => b.rating - a.rating)
+            .slice(0, SEARCH_LIMIT)
+            .map(result => result.business);
+    }
+
+    // No index built: fall back to the (sequential scan) ilike query
     const { data, error } = await supabase
         .from('businesses')
         .select('*, business_photos(*)')
         .eq('verified', true)
         .or(`name.ilike.%${query}%,trade.ilike.%${query}%`)
         .order('rating', { ascending: false })
-        .limit(20);
+        .limit(SEARCH_LIMIT);
 
     if (error) {
         console.error('Error searching businesses:', error);
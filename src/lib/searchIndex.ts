@@ -0,0 +1,108 @@
+/**
+ * Business search over the prebuilt trigram index in public/search-index.v1.json
+ * (written by scripts/build_search_index.py, which documents the format).
+ *
+ * Docs are stored best rated first and every trigram maps to the docs containing
+ * it, so a search walks the shortest posting list and stops once it has `limit`
+ * real matches, however large the directory grows.
+ */
+
+const INDEX_VERSION = 1;
+const INDEX_URL = `/search-index.v${INDEX_VERSION}.json`;
+
+// [id, name, trade no, city no, rating, from supabase 0/1]
+type SearchDoc = [string, string, number, number, number, number];
+
+interface SearchIndexAsset {
+    version: number;
+    built_at: string;
+    trades: string[];
+    cities: string[];
+    docs: SearchDoc[];
+    grams: Record<string, number[]>;
+}
+
+export interface SearchHit {
+    id: string;
+    name: string;
+    trade: string;
+    city: string;
+    rating: number;
+    fromSupabase: boolean;
+}
+
+let indexPromise: Promise<SearchIndexAsset | null> | null = null;
+const decoded = new Map<string, number[]>();
+
+/** The index, fetched once; null when it hasn't been built or is an old format. */
+export function loadSearchIndex(): Promise<SearchIndexAsset | null> {
+    if (!indexPromise) {
+        indexPromise = fetch(INDEX_URL)
+            .then(res => (res.ok ? res.json() : null))
+            .then((asset: SearchIndexAsset | null) => (asset && asset.version === INDEX_VERSION ? asset : null))
+            .catch(() => null);
+    }
+    return indexPromise;
+}
+
+function trigrams(text: string): Set<string> {
+    const grams = new Set<string>();
+    for (let i = 0; i + 3 <= text.length; i++) grams.add(text.slice(i, i + 3));
+    return grams;
+}
+
+function postings(index: SearchIndexAsset, gram: string): number[] {
+    let numbers = decoded.get(gram);
+    if (!numbers) {
+        numbers = [];
+        let total = 0;
+        for (const delta of index.grams[gram] || []) {
+            total += delta;
+            numbers.push(total);
+        }
+        decoded.set(gram, numbers);
+    }
+    return numbers;
+}
+
+function contains(numbers: number[], n: number): boolean {
+    let lo = 0;
+    let hi = numbers.length;
+    while (lo < hi) {
+        const mid = (lo + hi) >> 1;
+        if (numbers[mid] < n) lo = mid + 1;
+        else hi = mid;
+    }
+    return lo < numbers.length && numbers[lo] === n;
+}
+
+/** Same matches and order as name/trade ilike '%query%' ordered by rating. */
+export function searchIndex(index: SearchIndexAsset, query: string, limit = 20): SearchHit[] {
+    const q = query.trim().toLowerCase();
+    if (!q) return [];
+
+    const matches = (n: number) => {
+        const doc = index.docs[n];
+        return doc[1].toLowerCase().includes(q) || index.trades[doc[2]].toLowerCase().includes(q);
+    };
+
+    const hits: SearchHit[] = [];
+    const take = (n: number) => {
+        const [id, name, trade, city, rating, fromSupabase] = index.docs[n];
+        hits.push({ id, name, trade: index.trades[trade], city: index.cities[city], rating, fromSupabase: fromSupabase === 1 });
+        return hits.length >= limit;
+    };
+
+    if (q.length < 3) {
+        for (let n = 0; n < index.docs.length; n++) {
+            if (matches(n) && take(n)) break;
+        }
+        return hits;
+    }
+
+    const [shortest, ...rest] = [...trigrams(q)].map(g => postings(index, g)).sort((a, b) => a.length - b.length);
+    for (const n of shortest) {
+        if (rest.every(numbers => contains(numbers, n)) && matches(n) && take(n)) break;
+    }
+    return hits;
+}
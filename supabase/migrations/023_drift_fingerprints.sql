@@ -0,0 +1,57 @@
+-- Migration: Fingerprint functions for dev/prod drift detection
+-- Used by scripts/drift_check.py, which compares these hashes between projects and
+-- only drills into (trade, city) buckets, then slug shards, whose hashes differ.
+-- `cols` is the list of columns both projects share, so hashes are comparable even
+-- while the schemas are out of step.
+
+-- Hash of one row restricted to `cols` (jsonb text output has a canonical key order)
+CREATE OR REPLACE FUNCTION business_row_digest(b businesses, cols TEXT[])
+RETURNS TEXT
+LANGUAGE sql STABLE AS $$
+    SELECT md5(COALESCE(
+        (SELECT jsonb_object_agg(key, value) FROM jsonb_each(to_jsonb(b)) WHERE key = ANY(cols))::text,
+        ''
+    ));
+$$;
+
+-- Shard of a business inside its bucket: first hex digit of md5(slug), 16 shards
+CREATE OR REPLACE FUNCTION business_slug_shard(slug TEXT)
+RETURNS TEXT
+LANGUAGE sql IMMUTABLE AS $$
+    SELECT left(md5(slug), 1);
+$$;
+
+-- Level 1: one hash per (trade, city) bucket over the slug-ordered row hashes
+CREATE OR REPLACE FUNCTION business_bucket_fingerprints(cols TEXT[])
+RETURNS TABLE (trade TEXT, city TEXT, row_count BIGINT, digest TEXT)
+LANGUAGE sql STABLE AS $$
+    SELECT b.trade, b.city, count(*),
+           md5(string_agg(b.slug || ':' || business_row_digest(b, cols), ',' ORDER BY b.slug COLLATE "C"))
+    FROM businesses b
+    GROUP BY b.trade, b.city
+    ORDER BY b.trade, b.city;
+$$;
+
+-- Level 2: one hash per slug shard inside a bucket
+CREATE OR REPLACE FUNCTION business_shard_fingerprints(cols TEXT[], p_trade TEXT, p_city TEXT)
+RETURNS TABLE (shard TEXT, row_count BIGINT, digest TEXT)
+LANGUAGE sql STABLE AS $$
+    SELECT business_slug_shard(b.slug), count(*),
+           md5(string_agg(b.slug || ':' || business_row_digest(b, cols), ',' ORDER BY b.slug COLLATE "C"))
+    FROM businesses b
+    WHERE b.trade = p_trade AND b.city = p_city
+    GROUP BY 1
+    ORDER BY 1;
+$$;
+
+-- Level 3: row hashes inside one shard
+CREATE OR REPLACE FUNCTION business_row_fingerprints(cols TEXT[], p_trade TEXT, p_city TEXT, p_shard TEXT)
+RETURNS TABLE (slug TEXT, digest TEXT)
+LANGUAGE sql STABLE AS $$
+    SELECT b.slug, business_row_digest(b, cols)
+    FROM businesses b
+    WHERE b.trade = p_trade AND b.city = p_city AND business_slug_shard(b.slug) = p_shard
+    ORDER BY b.slug COLLATE "C";
+$$;
+
+SELECT 'Migration 023 completed: drift fingerprint functions' AS status;
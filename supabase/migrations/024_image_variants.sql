@@ -0,0 +1,28 @@
+-- Migration: Resized image variants for business images
+-- Filled in by scripts/storage_derivatives.py. Maps each original image URL used by a
+-- business (logo_url, header_image_url, vehicle_image_url, photos) to its WebP
+-- derivatives, so listing pages can load a thumbnail/card instead of the upload:
+--   {"<original url>": {"thumb": "<url>", "card": "<url>", "hero": "<url>"}}
+
+ALTER TABLE businesses ADD COLUMN IF NOT EXISTS image_variants JSONB DEFAULT '{}'::jsonb;
+
+-- Batched write-back: one call updates many businesses.
+-- updates = [{"id": "...", "image_variants": {...}}, ...]
+CREATE OR REPLACE FUNCTION apply_image_variants(updates JSONB)
+RETURNS INTEGER
+LANGUAGE sql AS $$
+    WITH changed AS (
+        UPDATE businesses b
+        SET image_variants = u.image_variants
+        FROM jsonb_to_recordset(updates) AS u(id TEXT, image_variants JSONB)
+        WHERE b.id = u.id
+          AND b.image_variants IS DISTINCT FROM u.image_variants
+        RETURNING 1
+    )
+    SELECT count(*)::INTEGER FROM changed;
+$$;
+
+-- Service role only: the script runs with the service key
+REVOKE EXECUTE ON FUNCTION apply_image_variants(JSONB) FROM PUBLIC, anon, authenticated;
+
+SELECT 'Migration 024 completed: image_variants column and apply_image_variants()' AS status;
@@ -0,0 +1,35 @@
+-- Migration: Offline geocoding of business addresses
+-- Filled in by scripts/geocode_businesses.py, which resolves each business's address
+-- against a local postcode centroid dataset and writes latitude/longitude back in
+-- batches. geocode_precision records how exact the position is:
+--   'postcode' (postcode centroid), 'district' (outward code centroid) or 'city'.
+-- NULL means the coordinates were set by hand (or not at all); the script never
+-- overwrites hand-set coordinates.
+
+ALTER TABLE businesses ADD COLUMN IF NOT EXISTS geocode_precision TEXT;
+
+-- Batched write-back: one call updates many businesses.
+-- updates = [{"id": "...", "latitude": 51.88, "longitude": -0.41, "geocode_precision": "postcode"}, ...]
+CREATE OR REPLACE FUNCTION apply_business_coordinates(updates JSONB)
+RETURNS INTEGER
+LANGUAGE sql AS $$
+    WITH changed AS (
+        UPDATE businesses b
+        SET latitude = u.latitude,
+            longitude = u.longitude,
+            geocode_precision = u.geocode_precision
+        FROM jsonb_to_recordset(updates) AS u(id TEXT, latitude DECIMAL, longitude DECIMAL, geocode_precision TEXT)
+        WHERE b.id = u.id
+          AND (b.geocode_precision IS NOT NULL OR b.latitude IS NULL OR b.longitude IS NULL)
+          AND (b.latitude IS DISTINCT FROM u.latitude
+               OR b.longitude IS DISTINCT FROM u.longitude
+               OR b.geocode_precision IS DISTINCT FROM u.geocode_precision)
+        RETURNING 1
+    )
+    SELECT count(*)::INTEGER FROM changed;
+$$;
+
+-- Service role only: the script runs with the service key
+REVOKE EXECUTE ON FUNCTION apply_business_coordinates(JSONB) FROM PUBLIC, anon, authenticated;
+
+SELECT 'Migration 025 completed: geocode_precision column and apply_business_coordinates()' AS status;
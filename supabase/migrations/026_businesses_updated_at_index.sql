@@ -0,0 +1,10 @@
+-- Migration: Index businesses by updated_at
+-- searchBusinesses() answers searches from the prebuilt index in
+-- public/search-index.v1.json (scripts/build_search_index.py) and asks the database
+-- only for verified businesses updated since that index was built
+-- (updated_at > built_at). This index keeps that query to the recently updated rows
+-- instead of a scan of the table.
+
+CREATE INDEX IF NOT EXISTS idx_businesses_updated_at ON businesses(updated_at);
+
+SELECT 'Migration 026 completed: businesses updated_at index' AS status;